@@ -0,0 +1,107 @@
+"""
+Бенчмарк списка справочников с фильтром по дате.
+
+Сравнивает время ответа /api/refbooks/?date=... при росте числа версий
+на справочник с прежним запросом (JOIN с версиями + DISTINCT + prefetch).
+
+Запуск:
+    python benchmarks/bench_handbook_list.py [--handbooks 200] [--repeat 20]
+"""
+
+import argparse
+import os
+import sys
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "terminology_api.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.db import connection  # noqa: E402
+from django.test import Client  # noqa: E402
+from django.test.utils import setup_test_environment  # noqa: E402
+
+from handbook.models import Handbook, HandbookVersion  # noqa: E402
+
+VERSIONS_PER_HANDBOOK = [1, 10, 50, 100, 300]
+FILTER_DATE = "2020-06-01"
+
+
+def populate(handbooks: int, versions: int) -> None:
+    """
+    Заполняет базу справочниками с заданным числом версий.
+    """
+    HandbookVersion.objects.all().delete()
+    Handbook.objects.all().delete()
+    created = Handbook.objects.bulk_create(
+        Handbook(code=f"HB{index}", name=f"Handbook {index}")
+        for index in range(handbooks)
+    )
+    start = date(2000, 1, 1)
+    HandbookVersion.objects.bulk_create(
+        HandbookVersion(
+            handbook=handbook,
+            version=str(number),
+            start_date=start + timedelta(days=number * 30),
+        )
+        for handbook in created
+        for number in range(versions)
+    )
+
+
+def measure(func, repeat: int) -> float:
+    """
+    Возвращает медианное время выполнения функции в миллисекундах.
+    """
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - started) * 1000)
+    timings.sort()
+    return timings[len(timings) // 2]
+
+
+def legacy_list() -> None:
+    """
+    Прежний запрос списка: JOIN с версиями, DISTINCT и prefetch всех версий.
+    """
+    queryset = (
+        Handbook.objects.prefetch_related("versions")
+        .distinct()
+        .filter(versions__start_date__lte=FILTER_DATE)
+    )
+    list(queryset.values("id", "code", "name"))
+    list(queryset)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--handbooks", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0)
+    client = Client()
+    try:
+        print(f"{'versions':>9} {'api, ms':>10} {'legacy query, ms':>17}")
+        for versions in VERSIONS_PER_HANDBOOK:
+            populate(args.handbooks, versions)
+            api = measure(
+                lambda: client.get("/api/refbooks/", {"date": FILTER_DATE}),
+                args.repeat,
+            )
+            legacy = measure(legacy_list, args.repeat)
+            print(f"{versions:>9} {api:>10.2f} {legacy:>17.2f}")
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+if __name__ == "__main__":
+    main()
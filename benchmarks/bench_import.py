@@ -0,0 +1,77 @@
+"""
+Бенчмарк импорта элементов из CSV с разным количеством процессов проверки.
+
+Генерирует файл с заданным числом строк и для каждого количества процессов
+импортирует его в новый черновик версии в тестовой базе, выводя время
+и пропускную способность.
+
+Запуск:
+    python benchmarks/bench_import.py [--rows 200000] [--processes 0 1 2 4]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "terminology_api.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.db import connection  # noqa: E402
+from django.test.utils import setup_test_environment  # noqa: E402
+
+from handbook.importers import import_elements  # noqa: E402
+from handbook.models import Handbook, HandbookVersion  # noqa: E402
+
+
+def write_file(path: Path, rows: int) -> None:
+    """
+    Записывает файл импорта с иерархией из двух уровней.
+    """
+    with path.open("w", encoding="utf-8") as target:
+        target.write("code,value,parent_code\n")
+        for index in range(rows):
+            parent = f"C{index // 100 * 100}" if index % 100 else ""
+            target.write(f"C{index},Значение элемента {index},{parent}\n")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=200000)
+    parser.add_argument("--processes", type=int, nargs="+", default=[0, 1, 2, 4])
+    args = parser.parse_args()
+
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0)
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / "elements.csv"
+            write_file(path, args.rows)
+            handbook = Handbook.objects.create(code="BENCH", name="Benchmark")
+            for index, processes in enumerate(args.processes):
+                version = HandbookVersion.objects.create(
+                    handbook=handbook,
+                    version=str(index),
+                    start_date=date(2000, 1, 1) + timedelta(days=index),
+                    status=HandbookVersion.Status.DRAFT,
+                )
+                started = time.perf_counter()
+                result = import_elements(version, path, processes=processes)
+                elapsed = time.perf_counter() - started
+                print(
+                    f"processes={processes}: {elapsed:.2f} s, "
+                    f"{result.imported / elapsed:>10,.0f} rows/s"
+                )
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+if __name__ == "__main__":
+    main()
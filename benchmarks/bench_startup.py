@@ -0,0 +1,93 @@
+"""
+Отчёт о времени холодного старта и памяти воркера.
+
+Для каждого профиля развёртывания (полный и API_ONLY) запускает отдельный
+процесс с `python -X importtime`, который загружает WSGI-приложение и URLconf,
+и выводит время старта, пиковый RSS и самые тяжёлые по импорту пакеты.
+
+Запуск:
+    python benchmarks/bench_startup.py [--top 10] [--repeat 3]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+PROFILES = {
+    "full": {},
+    "api-only": {"API_ONLY": "1"},
+}
+
+STARTUP_CODE = """
+import json, os, resource, time
+started = time.perf_counter()
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "terminology_api.settings")
+from terminology_api.wsgi import application
+from django.urls import get_resolver
+get_resolver().url_patterns
+print(json.dumps({
+    "seconds": time.perf_counter() - started,
+    "maxrss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+}))
+"""
+
+
+def run_profile(env: Dict[str, str]) -> Tuple[Dict, str]:
+    """
+    Запускает процесс старта приложения и возвращает его метрики и отчёт importtime.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", STARTUP_CODE],
+        cwd=BASE_DIR,
+        env={**os.environ, **env},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1]), result.stderr
+
+
+def parse_importtime(report: str) -> Dict[str, int]:
+    """
+    Суммирует собственное время импорта модулей по пакетам верхнего уровня.
+
+    :return: Словарь {пакет: время в микросекундах}.
+    """
+    packages: Dict[str, int] = defaultdict(int)
+    for line in report.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, _, name = line.removeprefix("import time:").split("|")
+        packages[name.strip().split(".")[0]] += int(self_us)
+    return packages
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    for profile, env in PROFILES.items():
+        runs: List[Tuple[Dict, str]] = [run_profile(env) for _ in range(args.repeat)]
+        best, report = min(runs, key=lambda run: run[0]["seconds"])
+        packages = parse_importtime(report)
+        print(f"== {profile}")
+        print(f"startup: {best['seconds'] * 1000:.1f} ms")
+        print(f"peak RSS: {best['maxrss_kb'] / 1024:.1f} MiB")
+        print(f"imports: {sum(packages.values()) / 1000:.1f} ms")
+        for name, self_us in sorted(packages.items(), key=lambda item: -item[1])[
+            : args.top
+        ]:
+            print(f"  {name:<24} {self_us / 1000:>8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Бенчмарк проверки элементов по скомпилированной версии справочника.
+
+Создаёт в тестовой базе версию с заданным числом элементов и сравнивает:
+- время компиляции версии;
+- пропускную способность проверок VersionMatcher (точных и по подстроке);
+- время одной проверки прежним способом (FilterSet и запрос к базе).
+
+Запуск:
+    python benchmarks/bench_validation.py [--elements 100000] [--checks 1000000]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import date
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "terminology_api.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.db import connection  # noqa: E402
+from django.test.utils import setup_test_environment  # noqa: E402
+
+from handbook.models import Handbook, HandbookElement, HandbookVersion  # noqa: E402
+from handbook.validation import compile_version  # noqa: E402
+
+LEGACY_CHECKS = 2000
+
+
+def populate(elements: int) -> HandbookVersion:
+    """
+    Создаёт справочник с одной версией и заданным числом элементов.
+    """
+    handbook = Handbook.objects.create(code="BENCH", name="Benchmark")
+    version = HandbookVersion.objects.create(
+        handbook=handbook, version="1", start_date=date(2000, 1, 1)
+    )
+    HandbookElement.objects.bulk_create(
+        (
+            HandbookElement(version=version, code=f"C{index}", value=f"Value {index}")
+            for index in range(elements)
+        ),
+        batch_size=10000,
+    )
+    return version
+
+
+def make_checks(elements: int, count: int) -> list:
+    """
+    Готовит пары (код, значение): половина существует, половина нет.
+    """
+    checks = []
+    for _ in range(count):
+        index = random.randrange(elements * 2)
+        checks.append((f"c{index}", f"value {index}"))
+    return checks
+
+
+def legacy_check(version: HandbookVersion, code: str, value: str) -> bool:
+    """
+    Прежняя проверка: запрос к базе с iexact по коду и icontains по значению.
+    """
+    return version.elements.filter(code__iexact=code, value__icontains=value).exists()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--elements", type=int, default=100000)
+    parser.add_argument("--checks", type=int, default=1000000)
+    args = parser.parse_args()
+
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0)
+    try:
+        version = populate(args.elements)
+
+        started = time.perf_counter()
+        matcher = compile_version(version.pk, version.content_hash)
+        print(
+            f"compile {args.elements} elements: {time.perf_counter() - started:.3f} s"
+        )
+
+        checks = make_checks(args.elements, args.checks)
+        for exact in (True, False):
+            started = time.perf_counter()
+            for code, value in checks:
+                matcher.check(code, value, exact)
+            elapsed = time.perf_counter() - started
+            mode = "exact" if exact else "substring"
+            print(f"matcher, {mode:>9}: {args.checks / elapsed:>12,.0f} checks/s")
+
+        started = time.perf_counter()
+        for code, value in checks[:LEGACY_CHECKS]:
+            legacy_check(version, code, value)
+        elapsed = time.perf_counter() - started
+        print(f"legacy query:        {LEGACY_CHECKS / elapsed:>12,.0f} checks/s")
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+if __name__ == "__main__":
+    main()
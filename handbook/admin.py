@@ -1,8 +1,68 @@
+from typing import Optional
+
 from django.contrib import admin
 from django.contrib.auth.models import Group, User
+from django.forms.models import BaseInlineFormSet
 from django.utils.translation import gettext_lazy as _
 
-from .models import Handbook, HandbookElement, HandbookVersion
+from .models import (
+    Handbook,
+    HandbookElement,
+    HandbookElementTranslation,
+    HandbookJob,
+    HandbookVersion,
+)
+from .paginators import EstimatedCountPaginator
+
+
+class PaginatedInlineFormSet(BaseInlineFormSet):
+    """
+    Формсет встраиваемой модели, который показывает только одну страницу
+    связанных объектов, а не все объекты сразу.
+    """
+
+    per_page = 50
+    page_number: Optional[str] = None
+
+    def get_queryset(self):
+        """
+        Возвращает объекты текущей страницы.
+        Номер страницы берётся из атрибута page_number,
+        который задаётся в HandbookElementInline.get_formset.
+        """
+        if not hasattr(self, "page"):
+            self.paginator = EstimatedCountPaginator(
+                super().get_queryset(),
+                self.per_page,
+                known_count=self.get_known_count(),
+            )
+            self.page = self.paginator.get_page(self.page_number)
+            self.page_range = self.paginator.get_elided_page_range(self.page.number)
+            self._queryset = self.page.object_list
+        return self._queryset
+
+    def get_known_count(self) -> Optional[int]:
+        """
+        Получить заранее известное количество объектов, чтобы не делать COUNT(*).
+        """
+        return None
+
+
+class HandbookElementInlineFormSet(PaginatedInlineFormSet):
+    """
+    Постраничный формсет элементов версии.
+    Количество элементов берётся из статистики версии, если она достоверна.
+    """
+
+    def get_known_count(self) -> Optional[int]:
+        """
+        Получить количество элементов из статистики версии.
+        Если статистика не пересчитывалась или количество равно нулю,
+        возвращает None, и количество считается запросом COUNT(*).
+        """
+        if self.instance.stats_valid and self.instance.element_count:
+            return self.instance.element_count
+        return None
 
 
 class HandbookVersionInline(admin.TabularInline):
@@ -14,7 +74,7 @@ class HandbookVersionInline(admin.TabularInline):
 
     model = HandbookVersion
     extra = 1
-    fields = ["version", "start_date"]
+    fields = ["version", "start_date", "status"]
 
 
 @admin.register(Handbook)
@@ -24,11 +84,26 @@ class HandbookAdmin(admin.ModelAdmin):
     Управляет отображением справочников в админке.
     """
 
-    list_display = ["get_id", "code", "name", "current_version", "current_version_date"]
+    list_display = [
+        "get_id",
+        "code",
+        "name",
+        "current_version",
+        "current_version_date",
+        "element_count",
+    ]
     search_fields = ["code", "name"]
     list_display_links = ["code"]
+    readonly_fields = ["element_count", "content_hash", "modified_at"]
     inlines = [HandbookVersionInline]
 
+    def get_queryset(self, request):
+        """
+        Аннотирует справочники текущей версией,
+        чтобы не выполнять отдельный запрос для каждой строки списка.
+        """
+        return super().get_queryset(request).with_current_version()
+
     @admin.display(description=_("ID"))
     def get_id(self, obj: Handbook) -> int:
         """
@@ -36,30 +111,46 @@ class HandbookAdmin(admin.ModelAdmin):
         """
         return obj.id
 
-    @admin.display(description=_("Current Version"))
-    def current_version(self, obj: Handbook) -> str:
+    @admin.display(description=_("Current Version"), ordering="current_version_value")
+    def current_version(self, obj: Handbook) -> Optional[str]:
         """
         Получить текущую версию справочника.
         """
-        return obj.get_current_version()
+        return obj.current_version_value
 
-    @admin.display(description=_("Current Version Date"))
-    def current_version_date(self, obj: Handbook) -> str:
+    @admin.display(
+        description=_("Current Version Date"), ordering="current_version_start_date"
+    )
+    def current_version_date(self, obj: Handbook) -> Optional[str]:
         """
         Получить дату начала текущей версии справочника.
         """
-        return obj.get_current_version_date()
+        return obj.current_version_start_date
 
 
 class HandbookElementInline(admin.TabularInline):
     """
     Встраиваемая модель для элементов справочника в админке.
     Используется для отображения и редактирования элементов справочников.
+    Элементы выводятся постранично, так как версия может содержать
+    сотни тысяч элементов.
     """
 
     model = HandbookElement
+    formset = HandbookElementInlineFormSet
+    template = "admin/handbook/edit_inline/paginated_tabular.html"
     extra = 1
-    fields = ["code", "value"]
+    fields = ["code", "value", "parent_code"]
+    page_param = "elements_page"
+
+    def get_formset(self, request, obj=None, **kwargs):
+        """
+        Передаёт в формсет номер страницы из параметров запроса.
+        """
+        formset = super().get_formset(request, obj, **kwargs)
+        formset.page_number = request.GET.get(self.page_param)
+        formset.page_param = self.page_param
+        return formset
 
 
 @admin.register(HandbookVersion)
@@ -69,18 +160,28 @@ class HandbookVersionAdmin(admin.ModelAdmin):
     Управляет отображением версий справочников в админке.
     """
 
-    list_display = ["handbook_code", "handbook_name", "version", "start_date"]
+    list_display = [
+        "handbook_code",
+        "handbook_name",
+        "version",
+        "start_date",
+        "status",
+        "element_count",
+    ]
+    list_filter = ["status"]
+    list_select_related = ["handbook"]
+    readonly_fields = ["element_count", "content_hash", "modified_at"]
     search_fields = ["handbook__code", "handbook__name", "version"]
     inlines = [HandbookElementInline]
 
-    @admin.display(description=_("Handbook code"))
+    @admin.display(description=_("Handbook code"), ordering="handbook__code")
     def handbook_code(self, obj: HandbookVersion) -> str:
         """
         Получить код справочника для данной версии.
         """
         return obj.handbook.code
 
-    @admin.display(description=_("Handbook name"))
+    @admin.display(description=_("Handbook name"), ordering="handbook__name")
     def handbook_name(self, obj: HandbookVersion) -> str:
         """
         Получить название справочника для данной версии.
@@ -88,6 +189,16 @@ class HandbookVersionAdmin(admin.ModelAdmin):
         return obj.handbook.name
 
 
+class HandbookElementTranslationInline(admin.TabularInline):
+    """
+    Встраиваемая модель для отображения переводов значения элемента
+    внутри формы элемента справочника.
+    """
+
+    model = HandbookElementTranslation
+    extra = 1
+
+
 @admin.register(HandbookElement)
 class HandbookElementAdmin(admin.ModelAdmin):
     """
@@ -95,7 +206,47 @@ class HandbookElementAdmin(admin.ModelAdmin):
     Управляет отображением элементов справочников в админке.
     """
 
-    list_display = ["version", "code", "value"]
+    list_display = ["version", "code", "value", "parent_code"]
+    list_select_related = ["version__handbook"]
+    # Точное совпадение по коду использует индекс handbook_element_code_idx.
+    search_fields = ["code__exact"]
+    raw_id_fields = ["version"]
+    readonly_fields = ["path", "depth"]
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    inlines = [HandbookElementTranslationInline]
+
+
+@admin.register(HandbookJob)
+class HandbookJobAdmin(admin.ModelAdmin):
+    """
+    Админ-класс для модели HandbookJob (Фоновая задача).
+    Задачи только просматриваются: их ставят в очередь через API или код.
+    """
+
+    list_display = [
+        "id",
+        "kind",
+        "handbook",
+        "status",
+        "progress",
+        "total",
+        "created_at",
+    ]
+    list_filter = ["status", "kind"]
+    list_select_related = ["handbook"]
+
+    def has_add_permission(self, request) -> bool:
+        """
+        Запрещает создание задач из админки.
+        """
+        return False
+
+    def has_change_permission(self, request, obj: Optional[HandbookJob] = None) -> bool:
+        """
+        Запрещает изменение задач из админки.
+        """
+        return False
 
 
 # Убираем модели User и Group из админки.
@@ -0,0 +1,145 @@
+"""
+Выборочный журнал запросов к API справочников для аналитики нагрузки.
+
+Для доли запросов HANDBOOK_ANALYTICS_SAMPLE_RATE в журнал в формате JSON Lines
+записываются справочник, версия, количество элементов, размер ответа,
+время работы с базой данных и общее время обработки. Запись в файл выполняется
+в отдельном потоке QueueListener, поэтому поток запроса только кладёт
+запись в очередь и не ждёт ввода-вывода.
+
+Журнал агрегируется командой hot_handbooks.
+"""
+
+import atexit
+import json
+import logging
+import os
+import queue
+import random
+import threading
+import time
+from logging.handlers import QueueHandler, QueueListener
+from pathlib import Path
+from typing import Dict, Optional
+
+from django.conf import settings
+from django.http import HttpRequest, HttpResponse
+from django.utils import timezone
+
+logger = logging.getLogger("handbook.analytics")
+logger.propagate = False
+logger.setLevel(logging.INFO)
+
+_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+_lock = threading.Lock()
+_listener: Optional[QueueListener] = None
+
+
+class JSONLinesFormatter(logging.Formatter):
+    """
+    Форматирует данные запроса из атрибута записи analytics в строку JSON.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        return json.dumps(record.analytics, ensure_ascii=False)
+
+
+class QueryTimer:
+    """
+    Обёртка выполнения запросов к базе (connection.execute_wrapper),
+    которая суммирует время их выполнения.
+    """
+
+    def __init__(self) -> None:
+        self.seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.seconds += time.perf_counter() - started
+
+
+def should_sample() -> bool:
+    """
+    Решает, записывать ли текущий запрос в журнал.
+    """
+    rate = settings.HANDBOOK_ANALYTICS_SAMPLE_RATE
+    return rate > 0 and random.random() < rate
+
+
+def start_analytics() -> None:
+    """
+    Запускает поток записи журнала в файл HANDBOOK_ANALYTICS_LOG.
+    Повторный вызов ничего не делает, пока путь к файлу не изменился.
+    """
+    global _listener
+    path = Path(settings.HANDBOOK_ANALYTICS_LOG)
+    with _lock:
+        if _listener is not None:
+            if _listener.handlers[0].baseFilename == os.path.abspath(path):
+                return
+            _stop_listener()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        handler = logging.FileHandler(path, encoding="utf-8", delay=True)
+        handler.setFormatter(JSONLinesFormatter())
+        _listener = QueueListener(_queue, handler)
+        _listener.start()
+        if not logger.handlers:
+            logger.addHandler(QueueHandler(_queue))
+
+
+def stop_analytics() -> None:
+    """
+    Останавливает поток записи, дописав все записи из очереди в файл.
+    """
+    with _lock:
+        _stop_listener()
+
+
+def _stop_listener() -> None:
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+
+
+atexit.register(stop_analytics)
+
+
+def log_request(
+    request: HttpRequest,
+    response: HttpResponse,
+    data: Dict,
+    db_seconds: float,
+    started: float,
+) -> None:
+    """
+    Кладёт в очередь запись о выполненном запросе.
+
+    :param request: Объект запроса.
+    :param response: Объект ответа.
+    :param data: Данные, собранные представлением (справочник, версия, элементы).
+    :param db_seconds: Время выполнения запросов к базе данных.
+    :param started: Время начала обработки запроса (time.perf_counter).
+    """
+    start_analytics()
+    logger.info(
+        "request",
+        extra={
+            "analytics": {
+                "ts": timezone.now().isoformat(),
+                "method": request.method,
+                "path": request.path,
+                "status": response.status_code,
+                **data,
+                "bytes": 0 if response.streaming else len(response.content),
+                "db_ms": round(db_seconds * 1000, 3),
+                "total_ms": round((time.perf_counter() - started) * 1000, 3),
+                "sample_rate": settings.HANDBOOK_ANALYTICS_SAMPLE_RATE,
+            }
+        },
+    )
@@ -6,3 +6,9 @@ class HandbookConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "handbook"
     verbose_name = _("Handbook")
+
+    def ready(self) -> None:
+        """
+        Подключает обработчики сигналов приложения.
+        """
+        from . import signals  # noqa: F401
@@ -0,0 +1,240 @@
+"""
+Массовая загрузка версий справочников через API.
+
+Новая версия создаётся черновиком, её элементы загружаются пакетами
+через bulk_create с обновлением при конфликте, а статистика версии
+поддерживается инкрементально по каждому пакету, как и записи журнала
+изменений для созданных и изменённых элементов. Поэтому публикация
+сводится к построению индекса иерархии элементов, смене статуса версии
+и пересчёту статистики справочника по строкам версий.
+
+Черновик можно создать полной копией базовой версии на стороне сервера
+и затем загрузить только изменённые элементы и коды удалённых.
+"""
+
+from typing import Callable, Dict, Iterable, List, Optional
+
+from django.db import transaction
+from django.utils import timezone
+
+from .changes import record_change, record_changes
+from .models import (
+    HandbookChange,
+    HandbookElement,
+    HandbookElementTranslation,
+    HandbookVersion,
+)
+from .stats import apply_element_changes, refresh_handbook_stats
+from .tree import rebuild_tree_index
+
+# Максимальное количество элементов в одном пакете загрузки.
+MAX_CHUNK_SIZE = 5000
+
+
+def upsert_elements(
+    version: HandbookVersion,
+    values: Dict[str, str],
+    parents: Optional[Dict[str, str]] = None,
+) -> None:
+    """
+    Добавляет элементы в версию или обновляет значения существующих.
+    Сигналы элементов не отправляются: статистика версии обновляется
+    одним вызовом для всего пакета, созданные и изменённые элементы
+    записываются в журнал изменений одним запросом на тысячу записей,
+    а индекс иерархии строится при публикации.
+
+    :param version: Объект версии справочника.
+    :param values: Словарь {код элемента: значение}.
+    :param parents: Словарь {код элемента: код родителя}.
+    """
+    parents = parents or {}
+    with transaction.atomic():
+        # Блокировка версии упорядочивает параллельную загрузку пакетов,
+        # чтобы прежние значения элементов не устарели до записи.
+        HandbookVersion.objects.select_for_update().filter(pk=version.pk).exists()
+        elements = version.elements.filter(code__in=list(values))
+        previous = {
+            code: (value, parent_code)
+            for code, value, parent_code in elements.values_list(
+                "code", "value", "parent_code"
+            )
+        }
+        HandbookElement.objects.bulk_create(
+            [
+                HandbookElement(
+                    version=version,
+                    code=code,
+                    value=value,
+                    parent_code=parents.get(code, ""),
+                )
+                for code, value in values.items()
+            ],
+            update_conflicts=True,
+            unique_fields=["version", "code"],
+            update_fields=["value", "parent_code"],
+        )
+        apply_element_changes(
+            version.pk,
+            added=[
+                (code, value, parents.get(code, "")) for code, value in values.items()
+            ],
+            removed=[
+                (code, value, parent_code)
+                for code, (value, parent_code) in previous.items()
+            ],
+        )
+        created, updated = [], []
+        for pk, code, value, parent_code in elements.values_list(
+            "pk", "code", "value", "parent_code"
+        ):
+            element = HandbookElement(
+                pk=pk,
+                version_id=version.pk,
+                code=code,
+                value=value,
+                parent_code=parent_code,
+            )
+            if code not in previous:
+                created.append(element)
+            elif previous[code] != (value, parent_code):
+                updated.append(element)
+        record_changes(created, HandbookChange.Action.CREATED, version.handbook_id)
+        record_changes(updated, HandbookChange.Action.UPDATED, version.handbook_id)
+
+
+def remove_elements(version: HandbookVersion, codes: Iterable[str]) -> None:
+    """
+    Удаляет элементы черновика по кодам вместе с их переводами.
+    Элементы удаляются методом delete их QuerySet, который одним вызовом
+    обновляет статистику версии и записывает удаления в журнал изменений.
+
+    :param version: Объект версии справочника.
+    :param codes: Коды удаляемых элементов.
+    """
+    with transaction.atomic():
+        HandbookVersion.objects.select_for_update().filter(pk=version.pk).exists()
+        version.elements.filter(code__in=list(codes)).delete()
+
+
+def copy_elements(
+    source: HandbookVersion,
+    target: HandbookVersion,
+    progress: Optional[Callable[[int], None]] = None,
+) -> int:
+    """
+    Копирует элементы и переводы базовой версии в черновик на стороне сервера,
+    чтобы клиент загружал только изменённые элементы. Элементы копируются
+    целиком: версии хранятся независимо, без ссылок на базовую версию.
+
+    Элементы копируются пакетами по MAX_CHUNK_SIZE в порядке идентификаторов,
+    и каждый пакет фиксируется отдельной транзакцией вместе с переводами,
+    статистикой черновика и записями журнала изменений. Поэтому записи
+    журнала не ждут фиксации всей копии дольше HANDBOOK_CHANGE_FEED_SETTLE_TIME,
+    а прерванное копирование продолжается с первого нескопированного элемента.
+    Копирование большой версии выполняется фоновой задачей copy_elements.
+
+    :param source: Базовая версия.
+    :param target: Черновик версии.
+    :param progress: Функция, которой передаётся количество элементов,
+        скопированных после каждого пакета.
+    :return: Количество скопированных элементов.
+    """
+    last_code = target.elements.order_by("-pk").values_list("code", flat=True).first()
+    last_pk = 0
+    if last_code is not None:
+        last_pk = source.elements.values_list("pk", flat=True).get(code=last_code)
+    copied = 0
+    while True:
+        rows = list(
+            source.elements.filter(pk__gt=last_pk)
+            .order_by("pk")
+            .values_list("pk", "code", "value", "parent_code")[:MAX_CHUNK_SIZE]
+        )
+        if not rows:
+            return copied
+        with transaction.atomic():
+            copy_chunk(source, target, rows)
+        last_pk = rows[-1][0]
+        copied += len(rows)
+        if progress is not None:
+            progress(copied)
+
+
+def copy_chunk(
+    source: HandbookVersion, target: HandbookVersion, rows: List[tuple]
+) -> None:
+    """
+    Копирует пакет элементов базовой версии и их переводы в черновик,
+    обновляет статистику черновика и записывает созданные объекты
+    в журнал изменений.
+
+    :param source: Базовая версия.
+    :param target: Черновик версии.
+    :param rows: Кортежи (идентификатор, код, значение, код родителя)
+        элементов базовой версии.
+    """
+    HandbookElement.objects.bulk_create(
+        HandbookElement(version=target, code=code, value=value, parent_code=parent_code)
+        for _, code, value, parent_code in rows
+    )
+    codes = {pk: code for pk, code, *_ in rows}
+    elements = list(
+        target.elements.filter(code__in=list(codes.values())).values_list(
+            "pk", "code", "value", "parent_code"
+        )
+    )
+    ids = {code: pk for pk, code, *_ in elements}
+    source_translations = HandbookElementTranslation.objects.filter(
+        element_id__in=list(codes)
+    ).values_list("element_id", "language", "value")
+    HandbookElementTranslation.objects.bulk_create(
+        HandbookElementTranslation(
+            element_id=ids[codes[element_id]], language=language, value=value
+        )
+        for element_id, language, value in source_translations
+    )
+    apply_element_changes(target.pk, added=[row[1:] for row in rows])
+    record_changes(
+        (
+            HandbookElement(
+                pk=pk,
+                version_id=target.pk,
+                code=code,
+                value=value,
+                parent_code=parent_code,
+            )
+            for pk, code, value, parent_code in elements
+        ),
+        HandbookChange.Action.CREATED,
+        target.handbook_id,
+    )
+    record_changes(
+        HandbookElementTranslation.objects.filter(element_id__in=list(ids.values())),
+        HandbookChange.Action.CREATED,
+        target.handbook_id,
+    )
+
+
+def publish_version(version: HandbookVersion) -> bool:
+    """
+    Публикует черновик версии одной транзакцией.
+
+    :param version: Объект версии справочника.
+    :return: True, если версия опубликована, и False,
+        если она уже была опубликована другим запросом.
+    """
+    with transaction.atomic():
+        rebuild_tree_index(version.pk)
+        published = (
+            HandbookVersion.objects.filter(
+                pk=version.pk, status=HandbookVersion.Status.DRAFT
+            ).update(
+                status=HandbookVersion.Status.PUBLISHED, modified_at=timezone.now()
+            )
+            > 0
+        )
+        if published:
+            refresh_handbook_stats(version.handbook_id)
+            version.refresh_from_db()
+            record_change(version, HandbookChange.Action.UPDATED)
+    return published
@@ -0,0 +1,174 @@
+"""
+Запись журнала изменений справочников для дифференциальной синхронизации реплик.
+
+Токен синхронизации — идентификатор записи журнала. Идентификаторы выделяются
+при вставке, а видны читателям после фиксации транзакции, поэтому на
+PostgreSQL запись с меньшим идентификатором может появиться позже записи
+с большим. Читатель, который уже получил больший токен, такую запись
+пропустил бы. Поэтому записи выдаются только до первого пропуска
+в идентификаторах, пока запись после пропуска моложе
+HANDBOOK_CHANGE_FEED_SETTLE_TIME: пропуск может означать ещё не
+зафиксированную транзакцию. Более старый пропуск считается откатом.
+Время записи — время вставки, а не фиксации, поэтому транзакции, которые
+пишут в журнал, должны быть короче HANDBOOK_CHANGE_FEED_SETTLE_TIME:
+массовые операции (загрузка пакетов, импорт и копирование версии)
+фиксируют элементы и записи журнала пакетами в отдельных транзакциях.
+"""
+
+from datetime import timedelta
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+from django.conf import settings
+from django.utils import timezone
+
+from .models import (
+    Handbook,
+    HandbookChange,
+    HandbookElement,
+    HandbookElementTranslation,
+    HandbookVersion,
+)
+
+# Количество записей журнала в одном запросе INSERT при массовой записи.
+CHANGE_BATCH_SIZE = 1000
+
+TrackedObject = Union[
+    Handbook, HandbookVersion, HandbookElement, HandbookElementTranslation
+]
+
+
+def get_change_data(instance: TrackedObject) -> Dict:
+    """
+    Получить снимок полей объекта, который передаётся репликам.
+
+    :param instance: Справочник, версия, элемент или перевод элемента.
+    :return: Словарь с данными объекта.
+    """
+    if isinstance(instance, Handbook):
+        return {
+            "code": instance.code,
+            "name": instance.name,
+            "description": instance.description,
+        }
+    if isinstance(instance, HandbookVersion):
+        return {
+            "handbook_id": instance.handbook_id,
+            "version": instance.version,
+            "start_date": HandbookVersion._meta.get_field("start_date")
+            .to_python(instance.start_date)
+            .isoformat(),
+            "status": instance.status,
+        }
+    if isinstance(instance, HandbookElementTranslation):
+        return {
+            "element_id": instance.element_id,
+            "language": instance.language,
+            "value": instance.value,
+        }
+    return {
+        "version_id": instance.version_id,
+        "code": instance.code,
+        "value": instance.value,
+        "parent_code": instance.parent_code,
+    }
+
+
+def build_change(
+    instance: TrackedObject, action: str, handbook_id: Optional[int] = None
+) -> HandbookChange:
+    """
+    Создаёт несохранённую запись журнала для объекта.
+    Используется также для массовой записи через bulk_create (record_changes).
+
+    :param instance: Справочник, версия, элемент или перевод элемента.
+    :param action: Действие из HandbookChange.Action.
+    :param handbook_id: Идентификатор справочника объекта, если он известен,
+        чтобы не запрашивать его для элемента или перевода.
+    :return: Объект HandbookChange.
+    """
+    if isinstance(instance, Handbook):
+        kind, handbook_id = HandbookChange.Kind.HANDBOOK, instance.pk
+    elif isinstance(instance, HandbookVersion):
+        kind, handbook_id = HandbookChange.Kind.VERSION, instance.handbook_id
+    elif isinstance(instance, HandbookElementTranslation):
+        kind = HandbookChange.Kind.TRANSLATION
+        if handbook_id is None:
+            handbook_id = (
+                HandbookElement.objects.filter(pk=instance.element_id)
+                .values_list("version__handbook_id", flat=True)
+                .get()
+            )
+    else:
+        kind = HandbookChange.Kind.ELEMENT
+        if handbook_id is None:
+            handbook_id = (
+                HandbookVersion.objects.filter(pk=instance.version_id)
+                .values_list("handbook_id", flat=True)
+                .get()
+            )
+    return HandbookChange(
+        kind=kind,
+        action=action,
+        object_id=instance.pk,
+        handbook_id=handbook_id,
+        data=get_change_data(instance),
+    )
+
+
+def record_change(instance: TrackedObject, action: str) -> HandbookChange:
+    """
+    Записывает изменение объекта в журнал.
+
+    :param instance: Справочник, версия, элемент или перевод элемента.
+    :param action: Действие из HandbookChange.Action.
+    :return: Сохранённый объект HandbookChange.
+    """
+    change = build_change(instance, action)
+    change.save()
+    return change
+
+
+def record_changes(
+    instances: Iterable[TrackedObject], action: str, handbook_id: int
+) -> None:
+    """
+    Записывает изменения объектов одного справочника в журнал пакетами
+    через bulk_create. Используется массовыми операциями с элементами,
+    которые не отправляют сигналы.
+
+    :param instances: Элементы или переводы элементов.
+    :param action: Действие из HandbookChange.Action.
+    :param handbook_id: Идентификатор справочника объектов.
+    """
+    HandbookChange.objects.bulk_create(
+        (build_change(instance, action, handbook_id) for instance in instances),
+        batch_size=CHANGE_BATCH_SIZE,
+    )
+
+
+def read_changes(since: int, limit: int) -> Tuple[List[HandbookChange], int, bool]:
+    """
+    Получить записи журнала после токена, которые можно выдать читателю,
+    не рискуя пропустить ещё не зафиксированные записи с меньшими токенами.
+
+    :param since: Токен последней полученной записи.
+    :param limit: Максимальное количество записей.
+    :return: Записи, токен для следующего запроса и признак того,
+        что следующие записи можно запросить сразу.
+    """
+    changes = list(HandbookChange.objects.filter(pk__gt=since)[: limit + 1])
+    settled_before = timezone.now() - timedelta(
+        seconds=settings.HANDBOOK_CHANGE_FEED_SETTLE_TIME
+    )
+    expected = since + 1
+    for index, change in enumerate(changes):
+        if change.pk != expected and change.created_at > settled_before:
+            changes = changes[:index]
+            has_more = False
+            break
+        expected = change.pk + 1
+    else:
+        has_more = len(changes) > limit
+        changes = changes[:limit]
+    next_token = changes[-1].pk if changes else since
+    return changes, next_token, has_more
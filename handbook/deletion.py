@@ -0,0 +1,116 @@
+"""
+Обработка удаления элементов справочника и переводов их значений.
+
+Для элементов и переводов нет обработчиков сигналов удаления: с ними Django
+при удалении версии или справочника загружает каждый дочерний объект
+и отправляет сигнал на каждую строку. Поэтому элементы и переводы удаляются
+методами delete их QuerySet (их же вызывают методы delete моделей, админка
+и формсеты), которые после удаления строк вызывают функции этого модуля.
+При каскадном удалении версии или справочника эти функции не вызываются:
+статистику справочника пересчитывает обработчик удаления версии,
+а реплики удаляют дочерние объекты сами.
+"""
+
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+from .changes import record_changes
+from .models import HandbookChange, HandbookElement, HandbookElementTranslation
+from .stats import apply_element_changes, touch_version
+from .tree import detach_children, get_depth
+
+# Поля удаляемых элементов, которые нужны для обновления статистики,
+# индекса иерархии и журнала изменений.
+DELETED_ELEMENT_FIELDS = (
+    "pk",
+    "version_id",
+    "code",
+    "value",
+    "parent_code",
+    "path",
+    "version__handbook_id",
+)
+
+# Поля удаляемых переводов.
+DELETED_TRANSLATION_FIELDS = (
+    "pk",
+    "element_id",
+    "language",
+    "value",
+    "element__version_id",
+    "element__version__handbook_id",
+)
+
+
+def handle_deleted_elements(rows: List[Tuple]) -> None:
+    """
+    Обновляет статистику версий, индекс иерархии и журнал изменений
+    после удаления элементов.
+
+    :param rows: Значения полей DELETED_ELEMENT_FIELDS удалённых элементов.
+    """
+    by_version: Dict[int, List[Tuple]] = defaultdict(list)
+    by_handbook: Dict[int, List[HandbookElement]] = defaultdict(list)
+    for row in rows:
+        pk, version_id, code, value, parent_code, _, handbook_id = row
+        by_version[version_id].append(row)
+        by_handbook[handbook_id].append(
+            HandbookElement(
+                pk=pk,
+                version_id=version_id,
+                code=code,
+                value=value,
+                parent_code=parent_code,
+            )
+        )
+    for version_id, version_rows in by_version.items():
+        apply_element_changes(
+            version_id,
+            removed=[
+                (code, value, parent_code)
+                for _, _, code, value, parent_code, *_ in version_rows
+            ],
+        )
+        update_tree_after_delete(version_id, version_rows)
+    for handbook_id, elements in by_handbook.items():
+        record_changes(elements, HandbookChange.Action.DELETED, handbook_id)
+
+
+def update_tree_after_delete(version_id: int, rows: List[Tuple]) -> None:
+    """
+    Делает корневыми оставшиеся дочерние элементы удалённых элементов.
+    Поддеревья обрабатываются от глубоких элементов к корню, чтобы пути
+    вложенных удалённых элементов ещё совпадали с путями их потомков.
+
+    :param version_id: Идентификатор версии.
+    :param rows: Значения полей DELETED_ELEMENT_FIELDS удалённых элементов версии.
+    """
+    paths = {code: path for _, _, code, _, _, path, _ in rows if path}
+    if not paths:
+        return
+    parents = set(
+        HandbookElement.objects.filter(
+            version_id=version_id, parent_code__in=list(paths)
+        ).values_list("parent_code", flat=True)
+    )
+    for path in sorted((paths[code] for code in parents), key=get_depth, reverse=True):
+        detach_children(version_id, path)
+
+
+def handle_deleted_translations(rows: List[Tuple]) -> None:
+    """
+    Обновляет время изменения версий и журнал изменений после удаления переводов.
+
+    :param rows: Значения полей DELETED_TRANSLATION_FIELDS удалённых переводов.
+    """
+    by_handbook: Dict[int, List[HandbookElementTranslation]] = defaultdict(list)
+    for pk, element_id, language, value, _, handbook_id in rows:
+        by_handbook[handbook_id].append(
+            HandbookElementTranslation(
+                pk=pk, element_id=element_id, language=language, value=value
+            )
+        )
+    for version_id in {row[4] for row in rows}:
+        touch_version(version_id)
+    for handbook_id, translations in by_handbook.items():
+        record_changes(translations, HandbookChange.Action.DELETED, handbook_id)
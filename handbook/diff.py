@@ -0,0 +1,84 @@
+"""
+Сравнение версий справочника.
+
+Хеш содержимого версии не зависит от порядка элементов и поддерживается
+модулем stats при каждой записи, поэтому совпадающие версии с достоверной
+статистикой (stats_valid) распознаются сравнением хешей без чтения элементов.
+Если статистика хотя бы одной версии не пересчитана, версии всегда
+сравниваются по элементам. Добавленные, удалённые и изменённые элементы
+выбираются на стороне базы данных подзапросами по уникальному индексу
+(версия, код), так что неизменённые элементы из базы не передаются.
+Изменённым считается элемент с другим значением или кодом родителя.
+"""
+
+from dataclasses import dataclass, field
+from typing import List, Tuple
+
+from django.db.models import Exists, F, OuterRef, Q, Subquery
+
+from .models import HandbookVersion
+
+
+@dataclass
+class VersionDiff:
+    """
+    Разница между двумя версиями справочника.
+    """
+
+    identical: bool = False
+    added: List[Tuple[str, str]] = field(default_factory=list)
+    removed: List[Tuple[str, str]] = field(default_factory=list)
+    changed: List[Tuple[str, str, str, str, str]] = field(default_factory=list)
+
+
+def is_same_content(base: HandbookVersion, target: HandbookVersion) -> bool:
+    """
+    Проверяет совпадение содержимого версий по их статистике.
+    Статистика, которая не пересчитывалась, не позволяет судить о содержимом.
+    """
+    return (
+        base.stats_valid
+        and target.stats_valid
+        and base.content_hash == target.content_hash
+        and base.element_count == target.element_count
+    )
+
+
+def diff_versions(base: HandbookVersion, target: HandbookVersion) -> VersionDiff:
+    """
+    Сравнивает две версии справочника.
+
+    :param base: Исходная версия.
+    :param target: Новая версия.
+    :return: Добавленные и удалённые пары (код, значение) и изменённые
+        элементы (код, прежнее значение, новое значение, прежний код родителя,
+        новый код родителя).
+    """
+    if is_same_content(base, target):
+        return VersionDiff(identical=True)
+    base_elements = base.elements.filter(code=OuterRef("code"))
+    target_elements = target.elements.filter(code=OuterRef("code"))
+    added = target.elements.exclude(Exists(base_elements)).values_list("code", "value")
+    removed = base.elements.exclude(Exists(target_elements)).values_list(
+        "code", "value"
+    )
+    changed = (
+        target.elements.annotate(
+            previous_value=Subquery(base_elements.values("value")[:1]),
+            previous_parent_code=Subquery(base_elements.values("parent_code")[:1]),
+        )
+        .exclude(previous_value=None)
+        .filter(
+            ~Q(previous_value=F("value")) | ~Q(previous_parent_code=F("parent_code"))
+        )
+        .values_list(
+            "code", "previous_value", "value", "previous_parent_code", "parent_code"
+        )
+    )
+    diff = VersionDiff(
+        added=list(added.order_by("code")),
+        removed=list(removed.order_by("code")),
+        changed=list(changed.order_by("code")),
+    )
+    diff.identical = not (diff.added or diff.removed or diff.changed)
+    return diff
@@ -0,0 +1,107 @@
+"""
+Ленивое подключение документации Swagger.
+
+drf_yasg и схемы операций из модуля schema импортируются и строятся только
+при первом запросе документации, а не при запуске процесса.
+Поэтому воркеры, которые обслуживают только API, не тратят на них время и память.
+
+Готовый документ OpenAPI генерируется один раз (командой generate_openapi
+при деплое или при первом запросе) и отдаётся из памяти с ETag.
+"""
+
+from functools import cache
+from hashlib import sha256
+from pathlib import Path
+from typing import Callable, List, Tuple
+
+from django.conf import settings
+from django.http import HttpRequest, HttpResponse
+from django.utils.cache import get_conditional_response
+
+_lazy_schemas: List[Tuple[Callable, str]] = []
+
+
+def lazy_swagger_auto_schema(schema_name: str) -> Callable:
+    """
+    Декоратор, который откладывает применение swagger_auto_schema
+    до первого запроса документации.
+
+    :param schema_name: Имя словаря с параметрами схемы в модуле schema.
+    :return: Декоратор метода представления.
+    """
+
+    def decorator(view_method: Callable) -> Callable:
+        _lazy_schemas.append((view_method, schema_name))
+        return view_method
+
+    return decorator
+
+
+@cache
+def apply_lazy_schemas() -> None:
+    """
+    Применяет отложенные схемы операций к методам представлений.
+    """
+    from drf_yasg.utils import swagger_auto_schema
+
+    from . import schema
+
+    for view_method, schema_name in _lazy_schemas:
+        swagger_auto_schema(**getattr(schema, schema_name))(view_method)
+
+
+@cache
+def get_swagger_view() -> Callable:
+    """
+    Создаёт представление Swagger UI при первом обращении.
+    Документ схемы кэшируется на SWAGGER_CACHE_TIMEOUT секунд.
+    """
+    apply_lazy_schemas()
+    from .schema import schema_view
+
+    return schema_view.with_ui("swagger", cache_timeout=settings.SWAGGER_CACHE_TIMEOUT)
+
+
+def swagger_view(request: HttpRequest, *args, **kwargs) -> HttpResponse:
+    """
+    Отдаёт Swagger UI и документ схемы OpenAPI.
+    """
+    return get_swagger_view()(request, *args, **kwargs)
+
+
+def generate_openapi_document() -> bytes:
+    """
+    Генерирует документ OpenAPI по текущим представлениям и схемам операций.
+
+    :return: Документ в формате JSON.
+    """
+    apply_lazy_schemas()
+    from drf_yasg.codecs import OpenAPICodecJson
+
+    from .schema import api_info, schema_view
+
+    generator = schema_view.generator_class(info=api_info)
+    document = generator.get_schema(request=None, public=True)
+    return OpenAPICodecJson(validators=[], pretty=True).encode(document)
+
+
+@cache
+def get_openapi_document() -> Tuple[bytes, str]:
+    """
+    Возвращает готовый документ OpenAPI и его ETag.
+    Документ читается из файла OPENAPI_SCHEMA_PATH, если он создан
+    командой generate_openapi, иначе генерируется при первом обращении.
+    """
+    path = Path(settings.OPENAPI_SCHEMA_PATH)
+    content = path.read_bytes() if path.exists() else generate_openapi_document()
+    return content, f'"{sha256(content).hexdigest()}"'
+
+
+def openapi_view(request: HttpRequest) -> HttpResponse:
+    """
+    Отдаёт готовый документ OpenAPI с поддержкой If-None-Match.
+    """
+    content, etag = get_openapi_document()
+    response = HttpResponse(content, content_type="application/json")
+    response["ETag"] = etag
+    return get_conditional_response(request, etag=etag, response=response)
@@ -1,11 +1,13 @@
+from datetime import date
+
 from django.core.exceptions import ValidationError
-from django.db.models import QuerySet
+from django.db.models import Exists, OuterRef, QuerySet
 from django.utils.dateparse import parse_date
 from django.utils.translation import gettext_lazy as _
 from django_filters import Filter
 from django_filters import rest_framework as filters
 
-from .models import Handbook, HandbookElement
+from .models import Handbook, HandbookVersion
 
 
 class DateFilter(Filter):
@@ -34,39 +36,52 @@ class DateFilter(Filter):
                 raise ValidationError(
                     _("Invalid date format. Use 'YYYY-MM-DD'."), code="invalid_date"
                 )
-            return super().filter(qs, parsed_date)
+            return self.filter_date(qs, parsed_date)
         except ValidationError as e:
             self.field.error_messages.update({"invalid": e})
             raise e
 
+    def filter_date(self, qs, value: date) -> QuerySet:
+        """
+        Фильтрует QuerySet по уже проверенной дате.
 
-class HandbookFilter(filters.FilterSet):
+        :param qs: QuerySet для фильтрации
+        :param value: дата
+        :return: отфильтрованный QuerySet
+        """
+        return super().filter(qs, value)
+
+
+class VersionStartDateFilter(DateFilter):
     """
-    Фильтр для модели Handbook.
+    Фильтр справочников, у которых есть опубликованная версия,
+    начавшая действовать не позже указанной даты.
+
+    Использует подзапрос EXISTS вместо JOIN с версиями,
+    поэтому не размножает строки справочников и не требует DISTINCT.
     """
 
-    date = DateFilter(
-        field_name="versions__start_date", lookup_expr="lte", label="Date (YYYY-MM-DD)"
-    )
+    def filter_date(self, qs, value: date) -> QuerySet[Handbook]:
+        """
+        Оставляет справочники с версией, начавшей действовать к указанной дате.
 
-    class Meta:
-        model = Handbook
-        fields = ["date"]
+        :param qs: QuerySet справочников
+        :param value: дата
+        :return: отфильтрованный QuerySet
+        """
+        versions = HandbookVersion.objects.published().filter(
+            handbook=OuterRef("pk"), start_date__lte=value
+        )
+        return qs.filter(Exists(versions))
 
 
-class HandbookElementFilter(filters.FilterSet):
+class HandbookFilter(filters.FilterSet):
     """
-    Фильтр для модели HandbookElement,
-    который позволяет фильтровать элементы справочников
-    по коду, значению и версии.
+    Фильтр для модели Handbook.
     """
 
-    code = filters.CharFilter(lookup_expr="iexact", required=True)
-    value = filters.CharFilter(lookup_expr="icontains", required=True)
-    version = filters.CharFilter(
-        field_name="version__version", lookup_expr="exact", required=False
-    )
+    date = VersionStartDateFilter(label="Date (YYYY-MM-DD)")
 
     class Meta:
-        model = HandbookElement
-        fields = ["code", "value", "version"]
+        model = Handbook
+        fields = ["date"]
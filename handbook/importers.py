@@ -0,0 +1,280 @@
+"""
+Параллельный импорт элементов версии справочника из CSV.
+
+Главный процесс разбирает файл модулем csv и делит его на пакеты целых
+записей, поэтому значение в кавычках с переводом строки не разрывается
+между пакетами. Проверка пакетов (число колонок, пустые значения, длина полей
+по max_length модели, повторы кодов внутри пакета) выполняется в пуле
+процессов. Проверенные пакеты
+принимает один писатель в порядке их следования в файле: он отсеивает коды,
+уже встречавшиеся в предыдущих пакетах, и записывает пакет в черновик версии
+через upsert_elements отдельной транзакцией. В той же транзакции созданные
+и изменённые элементы пакета записываются в журнал изменений, поэтому
+импортированные элементы доходят до реплик так же, как загруженные через API.
+
+Записи с ошибками не записываются, а возвращаются с номером строки файла,
+на которой начинается запись. Формат файла — CSV в UTF-8 с колонками code,
+value и необязательной parent_code, по одному элементу на запись; строка
+заголовка пропускается.
+"""
+
+import csv
+import multiprocessing
+import os
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import (
+    Callable,
+    Deque,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    TextIO,
+    Tuple,
+)
+
+import django
+from django.conf import settings
+
+from .bulk import MAX_CHUNK_SIZE, upsert_elements
+from .models import HandbookElement, HandbookVersion
+
+# Количество записей файла в одном пакете.
+CHUNK_ROWS = MAX_CHUNK_SIZE
+# Количество ошибок, возвращаемых в результате импорта.
+MAX_REPORTED_ERRORS = 1000
+# Колонки файла импорта.
+COLUMNS = ("code", "value", "parent_code")
+
+# Запись файла: (номер первой строки записи, поля).
+ImportRecord = Tuple[int, List[str]]
+
+# Проверенная запись: (номер строки, код, значение, код родителя).
+ImportRow = Tuple[int, str, str, str]
+
+
+@dataclass(frozen=True)
+class RowError:
+    """
+    Ошибка в строке файла импорта.
+    """
+
+    row: int
+    code: str
+    message: str
+
+
+@dataclass
+class ImportResult:
+    """
+    Итог импорта: количество прочитанных и записанных строк и ошибки.
+    """
+
+    rows: int = 0
+    imported: int = 0
+    error_count: int = 0
+    errors: List[RowError] = field(default_factory=list)
+
+    def add_errors(self, errors: Iterable[RowError]) -> None:
+        """
+        Учитывает ошибки, сохраняя первые MAX_REPORTED_ERRORS из них.
+        """
+        for error in errors:
+            self.error_count += 1
+            if len(self.errors) < MAX_REPORTED_ERRORS:
+                self.errors.append(error)
+
+    def as_dict(self) -> Dict:
+        """
+        Возвращает итог в виде, пригодном для JSON.
+        """
+        return asdict(self)
+
+
+def get_limits() -> Dict[str, int]:
+    """
+    Получить максимальную длину колонок по полям модели HandbookElement.
+    """
+    return {name: HandbookElement._meta.get_field(name).max_length for name in COLUMNS}
+
+
+def validate_chunk(
+    records: List[ImportRecord], limits: Dict[str, int]
+) -> Tuple[List[ImportRow], List[RowError]]:
+    """
+    Проверяет пакет записей файла.
+    Выполняется в процессе пула, поэтому не обращается к базе.
+
+    :param records: Записи пакета с номерами строк.
+    :param limits: Максимальная длина колонок.
+    :return: Корректные строки и ошибки.
+    """
+    rows: List[ImportRow] = []
+    errors: List[RowError] = []
+    seen: Dict[str, int] = {}
+    for row, fields in records:
+        if not fields:
+            continue
+        fields = [value.strip() for value in fields]
+        code = fields[0]
+        if len(fields) not in (2, 3):
+            message = f"Expected 2 or 3 columns, got {len(fields)}."
+        elif not code:
+            message = "Code is empty."
+        elif not fields[1]:
+            message = "Value is empty."
+        elif code in seen:
+            message = f"Duplicate code, first seen in row {seen[code]}."
+        else:
+            message = next(
+                (
+                    f"Column '{name}' is longer than {limits[name]} characters."
+                    for name, value in zip(COLUMNS, fields)
+                    if len(value) > limits[name]
+                ),
+                "",
+            )
+        if message:
+            errors.append(RowError(row, code, message))
+            continue
+        seen[code] = row
+        rows.append((row, code, fields[1], fields[2] if len(fields) == 3 else ""))
+    return rows, errors
+
+
+def read_chunks(source: TextIO, chunk_rows: int) -> Iterator[List[ImportRecord]]:
+    """
+    Читает файл пакетами записей CSV, пропуская строку заголовка.
+    Запись может занимать несколько строк файла (перевод строки внутри
+    значения в кавычках), поэтому номера строк берутся из line_num.
+
+    :param source: Файл, открытый с newline="".
+    :param chunk_rows: Количество записей в пакете.
+    :return: Итератор пакетов записей с номерами их первых строк.
+    """
+    reader = csv.reader(source)
+    chunk: List[ImportRecord] = []
+    line = 0
+    for fields in reader:
+        row, line = line + 1, reader.line_num
+        if row == 1 and fields and fields[0].strip().lower() == COLUMNS[0]:
+            continue
+        chunk.append((row, fields))
+        if len(chunk) == chunk_rows:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def count_rows(path: Path) -> int:
+    """
+    Быстро подсчитывает количество строк файла для отображения хода импорта.
+    """
+    with path.open("rb") as source:
+        return sum(
+            block.count(b"\n") for block in iter(lambda: source.read(2**20), b"")
+        )
+
+
+def validate_chunks(
+    chunks: Iterable[List[ImportRecord]], processes: int
+) -> Iterator[Tuple[List[ImportRow], List[RowError]]]:
+    """
+    Проверяет пакеты в пуле процессов и возвращает результаты в порядке пакетов.
+    В работе одновременно не больше двух пакетов на процесс,
+    поэтому файл не читается в память целиком.
+
+    :param chunks: Пакеты записей.
+    :param processes: Количество процессов. 0 — проверять в текущем процессе.
+    :return: Итератор проверенных пакетов.
+    """
+    limits = get_limits()
+    if processes <= 0:
+        for records in chunks:
+            yield validate_chunk(records, limits)
+        return
+    with ProcessPoolExecutor(
+        max_workers=processes,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=django.setup,
+    ) as pool:
+        pending: Deque[Future] = deque()
+        for records in chunks:
+            pending.append(pool.submit(validate_chunk, records, limits))
+            if len(pending) >= processes * 2:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def import_elements(
+    version: HandbookVersion,
+    path: Path,
+    processes: Optional[int] = None,
+    chunk_rows: int = CHUNK_ROWS,
+    progress: Optional[Callable[[int], None]] = None,
+) -> ImportResult:
+    """
+    Импортирует элементы из файла CSV в черновик версии.
+    Элементы с существующими кодами обновляются.
+
+    :param version: Черновик версии справочника.
+    :param path: Путь к файлу.
+    :param processes: Количество процессов проверки (по умолчанию — число ядер).
+    :param chunk_rows: Количество записей в пакете.
+    :param progress: Функция, получающая количество обработанных записей
+        после записи каждого пакета.
+    :return: Итог импорта.
+    :raises ValueError: Если версия уже опубликована.
+    """
+    if version.status != HandbookVersion.Status.DRAFT:
+        raise ValueError(f"Version '{version.version}' is already published.")
+    if processes is None:
+        processes = os.cpu_count() or 1
+    chunk_rows = min(chunk_rows, MAX_CHUNK_SIZE)
+    result = ImportResult()
+    first_seen: Dict[str, int] = {}
+    with Path(path).open(newline="", encoding="utf-8-sig") as source:
+        chunks = read_chunks(source, chunk_rows)
+        for rows, errors in validate_chunks(chunks, processes):
+            result.rows += len(rows) + len(errors)
+            values: Dict[str, str] = {}
+            parents: Dict[str, str] = {}
+            for row, code, value, parent_code in rows:
+                if code in first_seen:
+                    message = f"Duplicate code, first seen in row {first_seen[code]}."
+                    errors.append(RowError(row, code, message))
+                    continue
+                first_seen[code] = row
+                values[code] = value
+                if parent_code:
+                    parents[code] = parent_code
+            if values:
+                upsert_elements(version, values, parents)
+            result.imported += len(values)
+            result.add_errors(sorted(errors, key=lambda error: error.row))
+            if progress:
+                progress(result.rows)
+    return result
+
+
+def resolve_import_path(name: str) -> Path:
+    """
+    Получить путь к файлу импорта в каталоге HANDBOOK_IMPORT_DIR.
+    Файлы вне каталога не принимаются, чтобы через API
+    нельзя было прочитать произвольный файл сервера.
+
+    :param name: Имя файла относительно каталога импорта.
+    :return: Абсолютный путь к файлу.
+    :raises ValueError: Если путь ведёт за пределы каталога импорта.
+    """
+    directory = Path(settings.HANDBOOK_IMPORT_DIR).resolve()
+    path = (directory / name).resolve()
+    if directory not in path.parents:
+        raise ValueError(f"Import file must be inside {directory}.")
+    return path
@@ -0,0 +1,299 @@
+"""
+Фоновые задачи справочников.
+
+Задача — строка таблицы HandbookJob с типом и параметрами. Типы задач
+регистрируются декоратором register_job, ставятся в очередь функцией
+enqueue_job (или через API) и выполняются командой run_handbook_worker
+в пуле процессов. Внешний брокер не нужен: воркер забирает задачу
+условным обновлением статуса, поэтому одну задачу не выполнят
+два процесса одновременно.
+
+Обработчик получает объект задачи, может сообщать о ходе выполнения
+через report_progress и возвращает результат в виде словаря:
+
+    @register_job("rebuild_tree_index", params=("version_id",))
+    def rebuild_tree_index_job(job):
+        return {"updated": rebuild_tree_index(job.params["version_id"])}
+"""
+
+import traceback
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+from django.conf import settings
+from django.contrib.auth.models import AbstractBaseUser
+from django.utils import timezone
+
+from .bulk import copy_elements, publish_version
+from .importers import count_rows, import_elements, resolve_import_path
+from .models import Handbook, HandbookJob, HandbookVersion
+from .stats import refresh_handbook_stats
+from .tree import rebuild_tree_index
+
+JobHandler = Callable[[HandbookJob], Optional[Dict]]
+
+
+@dataclass(frozen=True)
+class JobType:
+    """
+    Зарегистрированный тип задачи.
+    """
+
+    handler: JobHandler
+    params: Tuple[str, ...]
+
+
+JOB_TYPES: Dict[str, JobType] = {}
+
+
+def register_job(kind: str, params: Tuple[str, ...] = ()) -> Callable:
+    """
+    Декоратор, регистрирующий обработчик задач указанного типа.
+
+    :param kind: Тип задачи.
+    :param params: Обязательные параметры задачи.
+    :return: Декоратор обработчика.
+    """
+
+    def decorator(handler: JobHandler) -> JobHandler:
+        JOB_TYPES[kind] = JobType(handler, params)
+        return handler
+
+    return decorator
+
+
+def enqueue_job(
+    kind: str,
+    params: Optional[Dict] = None,
+    handbook: Optional[Handbook] = None,
+    user: Optional[AbstractBaseUser] = None,
+) -> HandbookJob:
+    """
+    Ставит задачу в очередь.
+
+    :param kind: Тип задачи.
+    :param params: Параметры задачи.
+    :param handbook: Справочник, к которому относится задача.
+    :param user: Пользователь, поставивший задачу.
+    :return: Созданная задача.
+    :raises ValueError: Если тип задачи неизвестен или не хватает параметров.
+    """
+    params = params or {}
+    if kind not in JOB_TYPES:
+        raise ValueError(f"Unknown job kind '{kind}'.")
+    missing = [name for name in JOB_TYPES[kind].params if name not in params]
+    if missing:
+        raise ValueError(f"Missing job parameters: {', '.join(missing)}.")
+    return HandbookJob.objects.create(
+        kind=kind, params=params, handbook=handbook, created_by=user
+    )
+
+
+def has_active_job(kind: str, **params) -> bool:
+    """
+    Проверяет, есть ли в очереди или в работе задача указанного типа
+    с указанными значениями параметров.
+
+    :param kind: Тип задачи.
+    :param params: Значения параметров задачи.
+    :return: True, если такая задача ещё не завершена.
+    """
+    return HandbookJob.objects.filter(
+        kind=kind,
+        status__in=[HandbookJob.Status.PENDING, HandbookJob.Status.RUNNING],
+        **{f"params__{name}": value for name, value in params.items()},
+    ).exists()
+
+
+def claim_job(worker: str) -> Optional[HandbookJob]:
+    """
+    Забирает самую старую задачу из очереди.
+    Задача переводится в статус RUNNING условным обновлением, поэтому
+    при гонке нескольких воркеров её получит только один из них.
+
+    :param worker: Имя воркера.
+    :return: Задача или None, если очередь пуста.
+    """
+    pending = HandbookJob.objects.filter(status=HandbookJob.Status.PENDING)
+    while True:
+        job_id = pending.order_by("id").values_list("pk", flat=True).first()
+        if job_id is None:
+            return None
+        now = timezone.now()
+        claimed = pending.filter(pk=job_id).update(
+            status=HandbookJob.Status.RUNNING,
+            worker=worker,
+            started_at=now,
+            heartbeat_at=now,
+        )
+        if claimed:
+            return HandbookJob.objects.get(pk=job_id)
+
+
+def report_progress(
+    job: HandbookJob, progress: int, total: Optional[int] = None
+) -> None:
+    """
+    Сохраняет ход выполнения задачи.
+
+    :param job: Выполняемая задача.
+    :param progress: Количество обработанных единиц.
+    :param total: Общее количество единиц (если известно).
+    """
+    job.progress = progress
+    fields = {"progress": progress, "heartbeat_at": timezone.now()}
+    if total is not None:
+        job.total = fields["total"] = total
+    HandbookJob.objects.filter(pk=job.pk).update(**fields)
+
+
+def run_job(job_id: int) -> str:
+    """
+    Выполняет полученную воркером задачу и сохраняет результат или ошибку.
+    Вызывается в процессе пула воркера.
+    Результат сохраняется, только если задачу за время выполнения
+    не вернули в очередь и не забрал другой воркер.
+
+    :param job_id: Идентификатор задачи.
+    :return: Итоговый статус задачи.
+    """
+    job = HandbookJob.objects.get(pk=job_id)
+    try:
+        job_type = JOB_TYPES.get(job.kind)
+        if job_type is None:
+            raise ValueError(f"Unknown job kind '{job.kind}'.")
+        result = job_type.handler(job)
+    except Exception:
+        return finish_job(job, HandbookJob.Status.FAILED, error=traceback.format_exc())
+    return finish_job(job, HandbookJob.Status.SUCCEEDED, result=result)
+
+
+def finish_job(job: HandbookJob, status: str, **fields) -> str:
+    """
+    Сохраняет итог задачи условным обновлением: статус, воркер и время
+    начала должны остаться такими же, как при запуске задачи.
+
+    :param job: Задача в состоянии на момент запуска.
+    :param status: Итоговый статус.
+    :param fields: Результат или текст ошибки.
+    :return: Итоговый статус или текущий статус задачи, если её уже
+        вернули в очередь или забрал другой воркер.
+    """
+    jobs = HandbookJob.objects.filter(pk=job.pk)
+    finished = jobs.filter(
+        status=job.status, worker=job.worker, started_at=job.started_at
+    ).update(status=status, finished_at=timezone.now(), **fields)
+    if finished:
+        return status
+    return jobs.values_list("status", flat=True).get()
+
+
+def fail_job(job_id: int, error: str, worker: Optional[str] = None) -> str:
+    """
+    Помечает задачу как завершившуюся ошибкой.
+
+    :param job_id: Идентификатор задачи.
+    :param error: Текст ошибки.
+    :param worker: Воркер, который выполнял задачу. Если указан, задача
+        помечается, только пока она выполняется этим воркером.
+    :return: Итоговый статус задачи.
+    """
+    jobs = HandbookJob.objects.filter(pk=job_id)
+    if worker is not None:
+        jobs = jobs.filter(status=HandbookJob.Status.RUNNING, worker=worker)
+    if jobs.update(
+        status=HandbookJob.Status.FAILED, error=error, finished_at=timezone.now()
+    ):
+        return HandbookJob.Status.FAILED
+    return HandbookJob.objects.filter(pk=job_id).values_list("status", flat=True).get()
+
+
+def touch_jobs(job_ids: Iterable[int]) -> None:
+    """
+    Обновляет отметку активности выполняемых задач.
+
+    :param job_ids: Идентификаторы задач.
+    """
+    HandbookJob.objects.filter(
+        pk__in=job_ids, status=HandbookJob.Status.RUNNING
+    ).update(heartbeat_at=timezone.now())
+
+
+def requeue_stale_jobs(stale_after: Optional[timedelta] = None) -> int:
+    """
+    Возвращает в очередь задачи, воркер которых перестал отвечать.
+
+    :param stale_after: Время без отклика, после которого задача считается
+        брошенной. По умолчанию HANDBOOK_JOB_STALE_AFTER секунд.
+    :return: Количество возвращённых задач.
+    """
+    if stale_after is None:
+        stale_after = timedelta(seconds=settings.HANDBOOK_JOB_STALE_AFTER)
+    return HandbookJob.objects.filter(
+        status=HandbookJob.Status.RUNNING,
+        heartbeat_at__lt=timezone.now() - stale_after,
+    ).update(status=HandbookJob.Status.PENDING, worker="")
+
+
+@register_job("rebuild_tree_index", params=("version_id",))
+def rebuild_tree_index_job(job: HandbookJob) -> Dict:
+    """
+    Перестраивает индекс иерархии элементов версии.
+    """
+    return {"updated": rebuild_tree_index(job.params["version_id"])}
+
+
+@register_job("refresh_handbook_stats", params=("handbook_id",))
+def refresh_handbook_stats_job(job: HandbookJob) -> Dict:
+    """
+    Пересчитывает статистику справочника.
+    """
+    refresh_handbook_stats(job.params["handbook_id"])
+    return {}
+
+
+@register_job("publish_version", params=("version_id",))
+def publish_version_job(job: HandbookJob) -> Dict:
+    """
+    Публикует черновик версии.
+    """
+    version = HandbookVersion.objects.get(pk=job.params["version_id"])
+    return {"published": publish_version(version)}
+
+
+@register_job("copy_elements", params=("version_id", "base_version_id"))
+def copy_elements_job(job: HandbookJob) -> Dict:
+    """
+    Копирует элементы и переводы базовой версии в черновик.
+    Если задача была прервана, копирование продолжается
+    с первого нескопированного элемента.
+    """
+    version = HandbookVersion.objects.get(pk=job.params["version_id"])
+    base = HandbookVersion.objects.get(pk=job.params["base_version_id"])
+    if version.status != HandbookVersion.Status.DRAFT:
+        raise ValueError(f"Version '{version.version}' is not a draft.")
+    report_progress(job, 0, base.element_count)
+    copied = copy_elements(
+        base, version, progress=lambda elements: report_progress(job, elements)
+    )
+    return {"copied": copied}
+
+
+@register_job("import_elements", params=("version_id", "path"))
+def import_elements_job(job: HandbookJob) -> Dict:
+    """
+    Импортирует элементы из файла CSV в черновик версии.
+    Путь к файлу указывается относительно каталога HANDBOOK_IMPORT_DIR,
+    а необязательный параметр processes задаёт количество процессов проверки.
+    """
+    version = HandbookVersion.objects.get(pk=job.params["version_id"])
+    path = resolve_import_path(job.params["path"])
+    report_progress(job, 0, count_rows(path))
+    result = import_elements(
+        version,
+        path,
+        processes=job.params.get("processes"),
+        progress=lambda rows: report_progress(job, rows),
+    )
+    return result.as_dict()
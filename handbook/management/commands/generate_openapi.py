@@ -0,0 +1,41 @@
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from ...docs import generate_openapi_document
+
+
+class Command(BaseCommand):
+    """
+    Команда для генерации готового документа OpenAPI.
+    С флагом --check проверяет, что сохранённый документ
+    совпадает с текущими схемами операций.
+    """
+
+    help = "Generate the OpenAPI document served at /api/docs/openapi.json."
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument(
+            "--output",
+            default=settings.OPENAPI_SCHEMA_PATH,
+            help="Path of the generated document.",
+        )
+        parser.add_argument(
+            "--check",
+            action="store_true",
+            help="Fail if the saved document differs from the generated one.",
+        )
+
+    def handle(self, *args, **options) -> None:
+        path = Path(options["output"])
+        document = generate_openapi_document()
+        if options["check"]:
+            if not path.exists() or path.read_bytes() != document:
+                raise CommandError(
+                    f"{path} is out of date. Run 'manage.py generate_openapi'."
+                )
+            self.stdout.write(self.style.SUCCESS(f"{path} is up to date."))
+            return
+        path.write_bytes(document)
+        self.stdout.write(self.style.SUCCESS(f"Written {path}."))
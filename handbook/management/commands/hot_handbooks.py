@@ -0,0 +1,110 @@
+import json
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, Iterable
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Показатели, по которым можно сортировать отчёт.
+ORDERINGS = {
+    "requests": "requests",
+    "elements": "elements",
+    "bytes": "bytes",
+    "db-time": "db_ms",
+    "total-time": "total_ms",
+}
+
+
+class Command(BaseCommand):
+    """
+    Команда для построения отчёта о самых нагруженных справочниках
+    по журналу аналитики запросов (модуль analytics).
+    Количество запросов и суммы оцениваются с учётом доли выборки.
+    """
+
+    help = "Report the most requested and most expensive handbooks."
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument(
+            "--log",
+            action="append",
+            help="Analytics log file. Can be repeated. Defaults to HANDBOOK_ANALYTICS_LOG.",
+        )
+        parser.add_argument(
+            "--top", type=int, default=10, help="Number of handbooks to show."
+        )
+        parser.add_argument(
+            "--by",
+            choices=ORDERINGS,
+            default="requests",
+            help="Metric to order the report by.",
+        )
+
+    def handle(self, *args, **options) -> None:
+        paths = [
+            Path(path) for path in options["log"] or [settings.HANDBOOK_ANALYTICS_LOG]
+        ]
+        missing = [str(path) for path in paths if not path.exists()]
+        if missing:
+            raise CommandError(f"Log file not found: {', '.join(missing)}.")
+
+        stats = aggregate(read_records(paths))
+        key = ORDERINGS[options["by"]]
+        rows = sorted(stats.items(), key=lambda item: -item[1][key])[: options["top"]]
+        self.stdout.write(
+            f"{'handbook':<24} {'requests':>10} {'MiB':>10} "
+            f"{'db ms':>12} {'total ms':>12} {'avg ms':>8} {'elements':>10}"
+        )
+        for handbook, row in rows:
+            self.stdout.write(
+                f"{handbook:<24} {row['requests']:>10.0f} "
+                f"{row['bytes'] / 2**20:>10.1f} {row['db_ms']:>12.0f} "
+                f"{row['total_ms']:>12.0f} "
+                f"{row['total_ms'] / row['requests']:>8.1f} "
+                f"{row['elements']:>10.0f}"
+            )
+
+
+def read_records(paths: Iterable[Path]) -> Iterable[Dict]:
+    """
+    Читает записи журнала, пропуская повреждённые строки.
+    """
+    for path in paths:
+        with path.open(encoding="utf-8") as log:
+            for line in log:
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+
+
+def aggregate(records: Iterable[Dict]) -> Dict[str, Dict]:
+    """
+    Суммирует показатели по справочникам.
+    Каждая запись учитывается с весом 1 / sample_rate,
+    чтобы получить оценку полного трафика.
+
+    :return: Словарь {справочник: показатели}.
+    """
+    stats: Dict[str, Dict] = defaultdict(
+        lambda: {
+            "requests": 0.0,
+            "elements": 0.0,
+            "bytes": 0.0,
+            "db_ms": 0.0,
+            "total_ms": 0.0,
+        }
+    )
+    for record in records:
+        if "handbook_id" not in record:
+            continue
+        weight = 1 / (record.get("sample_rate") or 1)
+        handbook = record.get("handbook_code") or str(record["handbook_id"])
+        row = stats[handbook]
+        row["requests"] += weight
+        row["bytes"] += record.get("bytes", 0) * weight
+        row["db_ms"] += record.get("db_ms", 0) * weight
+        row["total_ms"] += record.get("total_ms", 0) * weight
+        row["elements"] += (record.get("elements") or 0) * weight
+    return stats
@@ -0,0 +1,69 @@
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from ...importers import CHUNK_ROWS, import_elements
+from ...models import HandbookVersion
+
+# Количество ошибок, выводимых командой.
+SHOWN_ERRORS = 20
+
+
+class Command(BaseCommand):
+    """
+    Команда для импорта элементов из файла CSV в черновик версии справочника.
+    Строки файла проверяются параллельно в пуле процессов (модуль importers).
+    """
+
+    help = "Import handbook elements from a CSV file into a draft version."
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument("handbook", help="Handbook code.")
+        parser.add_argument("version", help="Draft version number.")
+        parser.add_argument(
+            "path", type=Path, help="CSV file: code,value[,parent_code]."
+        )
+        parser.add_argument(
+            "--processes",
+            type=int,
+            help="Number of validation processes. Defaults to the number of CPUs.",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=CHUNK_ROWS,
+            help="Rows per validated and committed chunk.",
+        )
+
+    def handle(self, *args, **options) -> None:
+        try:
+            version = HandbookVersion.objects.get(
+                handbook__code=options["handbook"], version=options["version"]
+            )
+        except HandbookVersion.DoesNotExist:
+            raise CommandError(
+                f"Version '{options['version']}' of handbook "
+                f"'{options['handbook']}' not found."
+            )
+        if not options["path"].exists():
+            raise CommandError(f"File not found: {options['path']}.")
+        try:
+            result = import_elements(
+                version,
+                options["path"],
+                processes=options["processes"],
+                chunk_rows=options["chunk_size"],
+            )
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        for error in result.errors[:SHOWN_ERRORS]:
+            self.stderr.write(f"Row {error.row} ({error.code}): {error.message}")
+        if result.error_count > SHOWN_ERRORS:
+            self.stderr.write(f"... and {result.error_count - SHOWN_ERRORS} more.")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Imported {result.imported} of {result.rows} rows, "
+                f"{result.error_count} errors."
+            )
+        )
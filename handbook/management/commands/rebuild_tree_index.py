@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+
+from ...models import HandbookVersion
+from ...tree import rebuild_tree_index
+
+
+class Command(BaseCommand):
+    """
+    Команда для построения индекса иерархии элементов версий.
+    Нужна после загрузки фикстур и массовых операций в обход сигналов.
+    """
+
+    help = "Rebuild materialized paths of handbook elements."
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument(
+            "--handbook",
+            help="Code of the handbook to rebuild. All handbooks by default.",
+        )
+
+    def handle(self, *args, **options) -> None:
+        versions = HandbookVersion.objects.all()
+        if options["handbook"]:
+            versions = versions.filter(handbook__code=options["handbook"])
+        count = 0
+        for version_id in versions.values_list("pk", flat=True).iterator():
+            count += rebuild_tree_index(version_id)
+        self.stdout.write(self.style.SUCCESS(f"Updated {count} elements."))
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+
+from ...models import HandbookVersion
+from ...stats import recompute_version_stats
+
+
+class Command(BaseCommand):
+    """
+    Команда для полного пересчёта статистики версий и справочников.
+    Нужна после загрузки фикстур и массовых операций в обход сигналов.
+    """
+
+    help = "Recompute element counts and content hashes of handbook versions."
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument(
+            "--handbook",
+            help="Code of the handbook to refresh. All handbooks by default.",
+        )
+
+    def handle(self, *args, **options) -> None:
+        versions = HandbookVersion.objects.select_related("handbook")
+        if options["handbook"]:
+            versions = versions.filter(handbook__code=options["handbook"])
+        count = 0
+        for version in versions.iterator():
+            recompute_version_stats(version)
+            count += 1
+        self.stdout.write(self.style.SUCCESS(f"Refreshed {count} versions."))
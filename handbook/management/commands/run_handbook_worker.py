@@ -0,0 +1,145 @@
+import multiprocessing
+import os
+import socket
+import threading
+import time
+import traceback
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from contextlib import contextmanager
+from typing import Dict, Iterator, Tuple
+
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from ...jobs import claim_job, fail_job, requeue_stale_jobs, run_job, touch_jobs
+
+
+class Command(BaseCommand):
+    """
+    Команда для выполнения фоновых задач справочников (модуль jobs).
+    Главный процесс забирает задачи из очереди и передаёт их в пул процессов,
+    а пока они выполняются, обновляет их отметку активности.
+    """
+
+    help = "Run background handbook jobs in a pool of worker processes."
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument(
+            "--processes",
+            type=int,
+            default=settings.HANDBOOK_JOB_PROCESSES or os.cpu_count(),
+            help="Number of worker processes. 0 runs jobs in the main process.",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Exit when the queue is empty instead of waiting for new jobs.",
+        )
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=settings.HANDBOOK_JOB_POLL_INTERVAL,
+            help="Seconds between queue polls.",
+        )
+
+    def handle(self, *args, **options) -> None:
+        self.worker = f"{socket.gethostname()}:{os.getpid()}"
+        self.once = options["once"]
+        self.poll_interval = options["poll_interval"]
+        if options["processes"] <= 0:
+            self.run_inline()
+            return
+        # Процессы пула запускаются заново (spawn), а не копируются из главного,
+        # чтобы не унаследовать его соединения с базой.
+        with ProcessPoolExecutor(
+            max_workers=options["processes"],
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=django.setup,
+        ) as pool:
+            self.run_pool(pool, options["processes"])
+
+    def run_inline(self) -> None:
+        """
+        Выполняет задачи по одной в главном процессе.
+        Пока задача выполняется, её отметку активности обновляет
+        отдельный поток (heartbeat).
+        """
+        while True:
+            requeue_stale_jobs()
+            job = claim_job(self.worker)
+            if job is None:
+                if self.once:
+                    return
+                time.sleep(self.poll_interval)
+                continue
+            with self.heartbeat(job.pk):
+                status = run_job(job.pk)
+            self.report(job.pk, job.kind, status)
+
+    @contextmanager
+    def heartbeat(self, job_id: int) -> Iterator[None]:
+        """
+        Обновляет отметку активности задачи в отдельном потоке
+        с интервалом опроса очереди, чтобы другие воркеры не вернули
+        долгую задачу в очередь как брошенную.
+
+        :param job_id: Идентификатор выполняемой задачи.
+        """
+        stop = threading.Event()
+
+        def beat() -> None:
+            try:
+                while not stop.wait(self.poll_interval):
+                    touch_jobs([job_id])
+            finally:
+                connections.close_all()
+
+        thread = threading.Thread(target=beat, name=f"job-{job_id}-heartbeat")
+        thread.start()
+        try:
+            yield
+        finally:
+            stop.set()
+            thread.join()
+
+    def run_pool(self, pool: ProcessPoolExecutor, processes: int) -> None:
+        """
+        Держит пул процессов занятым задачами из очереди.
+
+        :param pool: Пул процессов.
+        :param processes: Количество процессов пула.
+        """
+        running: Dict[Future, Tuple[int, str]] = {}
+        while True:
+            requeue_stale_jobs()
+            while len(running) < processes:
+                job = claim_job(self.worker)
+                if job is None:
+                    break
+                running[pool.submit(run_job, job.pk)] = (job.pk, job.kind)
+            if not running:
+                if self.once:
+                    return
+                time.sleep(self.poll_interval)
+                continue
+            done, _ = wait(
+                running, timeout=self.poll_interval, return_when=FIRST_COMPLETED
+            )
+            for future in done:
+                job_id, kind = running.pop(future)
+                try:
+                    status = future.result()
+                except Exception:
+                    # Процесс пула завершился аварийно, не сохранив результат.
+                    status = fail_job(job_id, traceback.format_exc(), self.worker)
+                self.report(job_id, kind, status)
+            if running:
+                touch_jobs([job_id for job_id, _ in running.values()])
+
+    def report(self, job_id: int, kind: str, status: str) -> None:
+        """
+        Выводит итог выполнения задачи.
+        """
+        self.stdout.write(f"Job #{job_id} {kind}: {status}")
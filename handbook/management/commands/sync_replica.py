@@ -0,0 +1,44 @@
+import sqlite3
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from ...routers import get_change_position
+
+
+class Command(BaseCommand):
+    """
+    Команда для копирования основной базы SQLite в локальную реплику.
+    Используется для проверки чтения с реплик при локальной разработке;
+    в production реплики поддерживаются средствами СУБД.
+    """
+
+    help = "Copy the primary SQLite database into a replica database."
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument(
+            "--database",
+            default="replica",
+            help="Alias of the replica database. Defaults to 'replica'.",
+        )
+
+    def handle(self, *args, **options) -> None:
+        alias = options["database"]
+        if alias not in connections.settings or alias == DEFAULT_DB_ALIAS:
+            raise CommandError(f"Unknown replica database '{alias}'.")
+        for name in (DEFAULT_DB_ALIAS, alias):
+            if connections[name].vendor != "sqlite":
+                raise CommandError("Only SQLite databases can be synced locally.")
+
+        primary = connections[DEFAULT_DB_ALIAS]
+        primary.ensure_connection()
+        connections[alias].close()
+        target = sqlite3.connect(connections[alias].settings_dict["NAME"])
+        try:
+            primary.connection.backup(target)
+        finally:
+            target.close()
+        position = get_change_position(alias)
+        self.stdout.write(
+            self.style.SUCCESS(f"Synced '{alias}' up to change {position}.")
+        )
@@ -1,16 +1,49 @@
 from django.conf import settings
+from django.middleware import locale
 from django.utils import translation
 
 
+def skips_language_activation(request) -> bool:
+    """
+    Проверяет, что запрос обрабатывается без активации языка.
+
+    :param request: HTTP-запрос.
+    :return: True, если путь запроса начинается с одного из
+        SKIP_LANGUAGE_ACTIVATION_PATHS.
+    """
+    return request.path_info.startswith(tuple(settings.SKIP_LANGUAGE_ACTIVATION_PATHS))
+
+
+class LocaleMiddleware(locale.LocaleMiddleware):
+    """
+    LocaleMiddleware, не выбирающий язык по Accept-Language для путей
+    из SKIP_LANGUAGE_ACTIVATION_PATHS.
+    """
+
+    def process_request(self, request):
+        if not skips_language_activation(request):
+            super().process_request(request)
+
+    def process_response(self, request, response):
+        if skips_language_activation(request):
+            return response
+        return super().process_response(request, response)
+
+
 class ForceDefaultLanguageMiddleware:
     """
     Middleware для принудительной установки языка по умолчанию.
+
+    Для путей из SKIP_LANGUAGE_ACTIVATION_PATHS язык не активируется:
+    остальные запросы оставляют активным язык по умолчанию, поэтому
+    сообщения API выводятся на нём без переключения на каждый запрос.
     """
 
     def __init__(self, get_response):
         self.get_response = get_response
 
     def __call__(self, request):
-        translation.activate(settings.LANGUAGE_CODE)
+        if not skips_language_activation(request):
+            translation.activate(settings.LANGUAGE_CODE)
         response = self.get_response(request)
         return response
@@ -1,11 +1,78 @@
-from typing import Optional
+import time
+from contextlib import ExitStack
+from typing import Dict, Optional
 
+from django.db import connections
 from django.db.models import QuerySet
 from django.http import Http404
 from django.shortcuts import get_object_or_404
-from rest_framework.exceptions import NotFound
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.response import Response
 
-from .models import Handbook, HandbookVersion
+from . import analytics, jobs
+from .models import Handbook, HandbookElement, HandbookVersion
+from .routers import read_from_replica
+from .timeline import get_timeline
+
+
+class RequestAnalyticsMixin:
+    """
+    Миксин, записывающий выборку запросов в журнал аналитики (модуль analytics).
+    Представление дополняет запись данными через note_analytics.
+    """
+
+    analytics_data: Optional[Dict] = None
+
+    def dispatch(self, request, *args, **kwargs):
+        """
+        Измеряет время обработки запроса и время работы с базой данных.
+        Запись журнала делается после рендеринга ответа.
+        """
+        if not analytics.should_sample():
+            return super().dispatch(request, *args, **kwargs)
+        started = time.perf_counter()
+        timer = analytics.QueryTimer()
+        self.analytics_data = {}
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(timer))
+            response = super().dispatch(request, *args, **kwargs)
+        self.note_analytics(action=self.action)
+
+        def log(response):
+            analytics.log_request(
+                request, response, self.analytics_data, timer.seconds, started
+            )
+
+        if isinstance(response, Response) and not response.is_rendered:
+            response.add_post_render_callback(log)
+        else:
+            log(response)
+        return response
+
+    def note_analytics(self, **data) -> None:
+        """
+        Добавляет данные в запись журнала, если запрос попал в выборку.
+        """
+        if self.analytics_data is not None:
+            self.analytics_data.update(data)
+
+
+class ReadReplicaMixin:
+    """
+    Миксин для представлений, которые обрабатывают читающие запросы
+    (GET, HEAD, OPTIONS) на реплике базы данных.
+    """
+
+    def dispatch(self, request, *args, **kwargs):
+        """
+        Обрабатывает читающий запрос внутри контекста read_from_replica.
+        """
+        if request.method not in SAFE_METHODS:
+            return super().dispatch(request, *args, **kwargs)
+        with read_from_replica():
+            return super().dispatch(request, *args, **kwargs)
 
 
 class HandbookMixin:
@@ -34,7 +101,8 @@ class HandbookMixin:
         self, handbook: Handbook, version_param: Optional[str]
     ) -> HandbookVersion:
         """
-        Возвращает указанную версию справочника или текущую версию.
+        Возвращает указанную опубликованную версию справочника или текущую версию.
+        Версия берётся из расписания версий в памяти процесса без запроса к базе.
 
         :param handbook: Объект справочника.
         :param version_param: Версия справочника (если указана).
@@ -42,12 +110,12 @@ class HandbookMixin:
         :raises NotFound: Если указанная версия не найдена.
         """
         if version_param:
-            try:
-                return handbook.versions.get(version=version_param)
-            except HandbookVersion.DoesNotExist:
+            version = get_timeline(handbook).get(version_param)
+            if not version:
                 raise NotFound(
                     {"error": f"Version '{version_param}' not found for this handbook."}
                 )
+            return version
         else:
             version = handbook.get_latest_version()
             if not version:
@@ -55,3 +123,59 @@ class HandbookMixin:
                     {"error": "No valid current version found for this handbook."}
                 )
             return version
+
+    def get_draft_version_or_404(
+        self, handbook: Handbook, version_param: str
+    ) -> HandbookVersion:
+        """
+        Возвращает черновик версии справочника для загрузки элементов или публикации.
+
+        :param handbook: Объект справочника.
+        :param version_param: Версия справочника.
+        :return: Объект HandbookVersion.
+        :raises NotFound: Если версия не найдена.
+        :raises ValidationError: Если версия уже опубликована или в неё ещё
+            копируются элементы базовой версии.
+        """
+        try:
+            version = handbook.versions.get(version=version_param)
+        except HandbookVersion.DoesNotExist:
+            raise NotFound(
+                {"error": f"Version '{version_param}' not found for this handbook."}
+            )
+        if version.status != HandbookVersion.Status.DRAFT:
+            raise ValidationError(
+                {"error": f"Version '{version_param}' is already published."}
+            )
+        if jobs.has_active_job("copy_elements", version_id=version.pk):
+            raise ValidationError(
+                {"error": f"Version '{version_param}' is still being copied."}
+            )
+        return version
+
+    def get_element_or_404(
+        self, version: HandbookVersion, param: str = "code"
+    ) -> HandbookElement:
+        """
+        Возвращает элемент версии по коду из параметра запроса
+        для запросов к иерархии.
+
+        :param version: Объект версии справочника.
+        :param param: Имя параметра запроса с кодом элемента.
+        :return: Объект HandbookElement.
+        :raises ValidationError: Если код не указан
+            или индекс иерархии версии ещё не построен.
+        :raises NotFound: Если элемент не найден.
+        """
+        code = self.request.query_params.get(param)  # type: ignore[attr-defined]
+        if not code:
+            raise ValidationError({"error": f"Parameter '{param}' is required."})
+        try:
+            element = version.elements.only("path").get(code=code)
+        except HandbookElement.DoesNotExist:
+            raise NotFound({"error": f"Element '{code}' not found in this version."})
+        if not element.path:
+            raise ValidationError(
+                {"error": "Tree index is not built for this version."}
+            )
+        return element
@@ -1,19 +1,67 @@
-from datetime import date
-from typing import Optional
+from typing import Dict, Optional, Tuple
 
-from django.db import models
+from django.conf import settings
+from django.db import models, router, transaction
+from django.db.models import OuterRef, Subquery
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
+# Хеш содержимого пустого набора элементов.
+EMPTY_CONTENT_HASH = "0" * 64
+
+
+class HandbookQuerySet(models.QuerySet):
+    """
+    QuerySet для модели Handbook.
+    """
+
+    def with_current_version(self) -> "HandbookQuerySet":
+        """
+        Аннотирует справочники текущей версией, датой её начала, идентификатором
+        и количеством элементов одним запросом с подзапросами
+        вместо отдельного запроса на каждый объект.
+        """
+        current_versions = (
+            HandbookVersion.objects.published()
+            .filter(handbook=OuterRef("pk"), start_date__lte=timezone.localdate())
+            .order_by("-start_date")
+        )
+        return self.annotate(
+            current_version_id=Subquery(current_versions.values("pk")[:1]),
+            current_version_value=Subquery(current_versions.values("version")[:1]),
+            current_version_start_date=Subquery(
+                current_versions.values("start_date")[:1]
+            ),
+            current_version_element_count=Subquery(
+                current_versions.values("element_count")[:1]
+            ),
+        )
+
 
 class Handbook(models.Model):
     """
     Модель для справочника (Handbook).
-    Хранит информацию о справочниках, такую как код, наименование и описание.
+    Хранит информацию о справочниках, такую как код, наименование и описание,
+    а также статистику по всем версиям, которая поддерживается модулем stats.
     """
 
     code = models.CharField(verbose_name=_("Code"), max_length=100, unique=True)
     name = models.CharField(verbose_name=_("Name"), max_length=300)
     description = models.TextField(verbose_name=_("Description"), blank=True)
+    element_count = models.PositiveIntegerField(
+        verbose_name=_("Element count"), default=0, editable=False
+    )
+    content_hash = models.CharField(
+        verbose_name=_("Content hash"),
+        max_length=64,
+        default=EMPTY_CONTENT_HASH,
+        editable=False,
+    )
+    modified_at = models.DateTimeField(
+        verbose_name=_("Last modified"), null=True, blank=True, editable=False
+    )
+
+    objects = HandbookQuerySet.as_manager()
 
     class Meta:
         verbose_name = _("Handbook")
@@ -22,15 +70,16 @@ class Handbook(models.Model):
     def get_latest_version(self) -> Optional["HandbookVersion"]:
         """
         Получить последнюю версию справочника, которая действительна на сегодняшний день.
-        Кэширует результат, чтобы избежать повторных запросов.
+        Версия определяется по расписанию версий в памяти процесса (модуль timeline)
+        с учётом часового пояса TIME_ZONE. Кэширует результат в объекте.
         """
         if not hasattr(self, "_cached_latest_version"):
             if hasattr(self, "prefetched_versions"):
                 self._cached_latest_version = self.prefetched_versions[0]
             else:
-                self._cached_latest_version = self.versions.filter(
-                    start_date__lte=date.today()
-                ).first()
+                from .timeline import get_timeline
+
+                self._cached_latest_version = get_timeline(self).current()
         return self._cached_latest_version
 
     def get_current_version(self) -> Optional[str]:
@@ -54,12 +103,33 @@ class Handbook(models.Model):
         return f"{self.code} - {self.name}"
 
 
+class HandbookVersionQuerySet(models.QuerySet):
+    """
+    QuerySet для модели HandbookVersion.
+    """
+
+    def published(self) -> "HandbookVersionQuerySet":
+        """
+        Оставляет только опубликованные версии, доступные читателям API.
+        """
+        return self.filter(status=HandbookVersion.Status.PUBLISHED)
+
+
 class HandbookVersion(models.Model):
     """
     Модель для версии справочника (HandbookVersion).
-    Хранит информацию о версии справочника, включая дату начала действия.
+    Хранит информацию о версии справочника, включая дату начала действия,
+    статус публикации и статистику элементов: количество, хеш содержимого,
+    признак её достоверности и время изменения.
+
+    Версии, загружаемые через API, создаются черновиками и становятся
+    видны читателям только после публикации.
     """
 
+    class Status(models.TextChoices):
+        DRAFT = "draft", _("Draft")
+        PUBLISHED = "published", _("Published")
+
     handbook = models.ForeignKey(
         Handbook,
         on_delete=models.CASCADE,
@@ -68,6 +138,32 @@ class HandbookVersion(models.Model):
     )
     version = models.CharField(verbose_name=_("Handbook Version"), max_length=50)
     start_date = models.DateField(verbose_name=_("Start date"))
+    status = models.CharField(
+        verbose_name=_("Status"),
+        max_length=20,
+        choices=Status.choices,
+        default=Status.PUBLISHED,
+    )
+    element_count = models.PositiveIntegerField(
+        verbose_name=_("Element count"), default=0, editable=False
+    )
+    content_hash = models.CharField(
+        verbose_name=_("Content hash"),
+        max_length=64,
+        default=EMPTY_CONTENT_HASH,
+        editable=False,
+    )
+    # Признак того, что количество элементов и хеш содержимого соответствуют
+    # элементам версии. Не установлен у версий, загруженных из фикстур,
+    # до пересчёта статистики командой refresh_handbook_stats.
+    stats_valid = models.BooleanField(
+        verbose_name=_("Statistics are valid"), default=False, editable=False
+    )
+    modified_at = models.DateTimeField(
+        verbose_name=_("Last modified"), null=True, blank=True, editable=False
+    )
+
+    objects = HandbookVersionQuerySet.as_manager()
 
     class Meta:
         ordering = ("-start_date",)
@@ -87,11 +183,32 @@ class HandbookVersion(models.Model):
         return f"{self.handbook.name} - v{self.version}"
 
 
+class HandbookElementQuerySet(models.QuerySet):
+    """
+    QuerySet для модели HandbookElement.
+    """
+
+    def delete(self) -> Tuple[int, Dict[str, int]]:
+        """
+        Удаляет элементы и затем обновляет статистику версий, индекс иерархии
+        и журнал изменений (модуль deletion). Обработчики сигналов удаления
+        для элементов не используются, чтобы каскадное удаление версии
+        не загружало её элементы по одному.
+        """
+        from .deletion import DELETED_ELEMENT_FIELDS, handle_deleted_elements
+
+        with transaction.atomic(using=self.db):
+            rows = list(self.values_list(*DELETED_ELEMENT_FIELDS))
+            result = super().delete()
+            handle_deleted_elements(rows)
+        return result
+
+
 class HandbookElement(models.Model):
     """
     Модель для элемента справочника (HandbookElement).
     Хранит информацию об элементах справочника для каждой версии,
-    включая код и значение.
+    включая код, значение и необязательную ссылку на родительский элемент.
     """
 
     version = models.ForeignKey(
@@ -102,9 +219,36 @@ class HandbookElement(models.Model):
     )
     code = models.CharField(verbose_name=_("Element code"), max_length=100)
     value = models.CharField(verbose_name=_("Element value"), max_length=300)
+    parent_code = models.CharField(
+        verbose_name=_("Parent element code"), max_length=100, blank=True, default=""
+    )
+    # Материализованный путь и глубина в иерархии поддерживаются модулем tree.
+    path = models.CharField(
+        verbose_name=_("Element path"),
+        max_length=1000,
+        blank=True,
+        default="",
+        editable=False,
+    )
+    depth = models.PositiveSmallIntegerField(
+        verbose_name=_("Depth"), default=0, editable=False
+    )
+
+    objects = HandbookElementQuerySet.as_manager()
 
     class Meta:
         unique_together = ("version", "code")
+        indexes = [
+            # Индекс для поиска элементов по коду в админке без учёта версии.
+            models.Index(fields=["code"], name="handbook_element_code_idx"),
+            # Индекс для выборки поддерева по префиксу пути. Классы операторов
+            # нужны PostgreSQL для LIKE 'префикс%', другие СУБД их игнорируют.
+            models.Index(
+                fields=["version", "path"],
+                name="handbook_element_path_idx",
+                opclasses=["int8_ops", "varchar_pattern_ops"],
+            ),
+        ]
         verbose_name = _("Handbook Element")
         verbose_name_plural = _("Handbook Elements")
 
@@ -113,3 +257,188 @@ class HandbookElement(models.Model):
         Возвращает строковое представление элемента справочника.
         """
         return f"{self.code} - {self.value}"
+
+    def delete(
+        self, using: Optional[str] = None, keep_parents: bool = False
+    ) -> Tuple[int, Dict[str, int]]:
+        """
+        Удаляет элемент через HandbookElementQuerySet.delete.
+        """
+        using = using or router.db_for_write(type(self), instance=self)
+        result = HandbookElement.objects.using(using).filter(pk=self.pk).delete()
+        self.pk = None
+        return result
+
+
+class HandbookElementTranslationQuerySet(models.QuerySet):
+    """
+    QuerySet для модели HandbookElementTranslation.
+    """
+
+    def delete(self) -> Tuple[int, Dict[str, int]]:
+        """
+        Удаляет переводы и затем обновляет время изменения версий
+        и журнал изменений (модуль deletion).
+        """
+        from .deletion import DELETED_TRANSLATION_FIELDS, handle_deleted_translations
+
+        with transaction.atomic(using=self.db):
+            rows = list(self.values_list(*DELETED_TRANSLATION_FIELDS))
+            result = super().delete()
+            handle_deleted_translations(rows)
+        return result
+
+
+class HandbookElementTranslation(models.Model):
+    """
+    Модель для перевода значения элемента справочника (HandbookElementTranslation).
+    Хранит значение элемента на языке, отличном от языка по умолчанию.
+    """
+
+    element = models.ForeignKey(
+        HandbookElement,
+        on_delete=models.CASCADE,
+        related_name="translations",
+        verbose_name=_("Handbook Element"),
+    )
+    language = models.CharField(
+        verbose_name=_("Language"), max_length=10, choices=settings.LANGUAGES
+    )
+    value = models.CharField(verbose_name=_("Element value"), max_length=300)
+
+    objects = HandbookElementTranslationQuerySet.as_manager()
+
+    class Meta:
+        unique_together = ("element", "language")
+        verbose_name = _("Element Translation")
+        verbose_name_plural = _("Element Translations")
+
+    def __str__(self) -> str:
+        """
+        Возвращает строковое представление перевода элемента.
+        """
+        return f"{self.language}: {self.value}"
+
+    def delete(
+        self, using: Optional[str] = None, keep_parents: bool = False
+    ) -> Tuple[int, Dict[str, int]]:
+        """
+        Удаляет перевод через HandbookElementTranslationQuerySet.delete.
+        """
+        using = using or router.db_for_write(type(self), instance=self)
+        result = (
+            HandbookElementTranslation.objects.using(using).filter(pk=self.pk).delete()
+        )
+        self.pk = None
+        return result
+
+
+class HandbookChange(models.Model):
+    """
+    Модель для журнала изменений справочников (HandbookChange).
+    Каждая запись фиксирует создание, изменение или удаление справочника,
+    версии или элемента. Идентификатор записи монотонно возрастает и служит
+    токеном синхронизации для реплик.
+    """
+
+    class Kind(models.TextChoices):
+        HANDBOOK = "handbook", _("Handbook")
+        VERSION = "version", _("Handbook Version")
+        ELEMENT = "element", _("Handbook Element")
+        TRANSLATION = "translation", _("Element Translation")
+
+    class Action(models.TextChoices):
+        CREATED = "created", _("Created")
+        UPDATED = "updated", _("Updated")
+        DELETED = "deleted", _("Deleted")
+
+    kind = models.CharField(
+        verbose_name=_("Object kind"), max_length=20, choices=Kind.choices
+    )
+    action = models.CharField(
+        verbose_name=_("Action"), max_length=20, choices=Action.choices
+    )
+    object_id = models.BigIntegerField(verbose_name=_("Object ID"))
+    handbook_id = models.BigIntegerField(verbose_name=_("Handbook ID"))
+    data = models.JSONField(verbose_name=_("Object data"))
+    created_at = models.DateTimeField(verbose_name=_("Created at"), auto_now_add=True)
+
+    class Meta:
+        ordering = ("id",)
+        verbose_name = _("Handbook Change")
+        verbose_name_plural = _("Handbook Changes")
+
+    def __str__(self) -> str:
+        """
+        Возвращает строковое представление записи журнала изменений.
+        """
+        return f"#{self.pk} {self.kind} {self.object_id} {self.action}"
+
+
+class HandbookJob(models.Model):
+    """
+    Модель для фоновой задачи (HandbookJob).
+    Задачи ставятся в очередь API или кодом (модуль jobs) и выполняются
+    отдельным процессом run_handbook_worker, поэтому долгие операции
+    не занимают веб-воркеры. Таблица задач служит очередью без внешнего брокера.
+    """
+
+    class Status(models.TextChoices):
+        PENDING = "pending", _("Pending")
+        RUNNING = "running", _("Running")
+        SUCCEEDED = "succeeded", _("Succeeded")
+        FAILED = "failed", _("Failed")
+
+    kind = models.CharField(verbose_name=_("Job kind"), max_length=50)
+    status = models.CharField(
+        verbose_name=_("Status"),
+        max_length=20,
+        choices=Status.choices,
+        default=Status.PENDING,
+    )
+    handbook = models.ForeignKey(
+        Handbook,
+        verbose_name=_("Handbook"),
+        on_delete=models.CASCADE,
+        related_name="jobs",
+        null=True,
+        blank=True,
+    )
+    params = models.JSONField(verbose_name=_("Parameters"), default=dict, blank=True)
+    result = models.JSONField(verbose_name=_("Result"), null=True, blank=True)
+    error = models.TextField(verbose_name=_("Error"), blank=True)
+    progress = models.PositiveIntegerField(verbose_name=_("Progress"), default=0)
+    total = models.PositiveIntegerField(verbose_name=_("Total"), null=True, blank=True)
+    worker = models.CharField(verbose_name=_("Worker"), max_length=100, blank=True)
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        verbose_name=_("Created by"),
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+    )
+    created_at = models.DateTimeField(verbose_name=_("Created at"), auto_now_add=True)
+    started_at = models.DateTimeField(
+        verbose_name=_("Started at"), null=True, blank=True
+    )
+    heartbeat_at = models.DateTimeField(
+        verbose_name=_("Heartbeat at"), null=True, blank=True
+    )
+    finished_at = models.DateTimeField(
+        verbose_name=_("Finished at"), null=True, blank=True
+    )
+
+    class Meta:
+        ordering = ("-id",)
+        verbose_name = _("Background Job")
+        verbose_name_plural = _("Background Jobs")
+        indexes = [
+            # Выбор следующей задачи из очереди.
+            models.Index(fields=["status", "id"], name="handbook_job_status_idx"),
+        ]
+
+    def __str__(self) -> str:
+        """
+        Возвращает строковое представление задачи.
+        """
+        return f"#{self.pk} {self.kind} ({self.status})"
@@ -0,0 +1,59 @@
+from typing import Optional
+
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Пагинатор для больших таблиц в админке.
+
+    Для нефильтрованного QuerySet на PostgreSQL берёт оценку количества строк
+    из статистики планировщика (pg_class.reltuples) вместо полного COUNT(*).
+    Если оценка недоступна или QuerySet отфильтрован, выполняется обычный подсчёт.
+    Также можно передать заранее известное количество через known_count.
+    """
+
+    # Ниже этого порога оценка слишком неточна, и дешевле посчитать строки.
+    exact_count_threshold = 10000
+
+    def __init__(self, *args, known_count: Optional[int] = None, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.known_count = known_count
+
+    @cached_property
+    def count(self) -> int:
+        """
+        Возвращает точное, известное заранее или оценочное количество объектов.
+        """
+        if self.known_count is not None:
+            return self.known_count
+        estimate = self.get_estimated_count()
+        if estimate is not None:
+            return estimate
+        return super().count
+
+    def get_estimated_count(self) -> Optional[int]:
+        """
+        Получить оценку количества строк из статистики СУБД.
+
+        :return: Оценка или None, если её нельзя использовать.
+        """
+        query = getattr(self.object_list, "query", None)
+        if query is None or query.where:
+            return None
+        connection = connections[self.object_list.db]
+        if connection.vendor != "postgresql":
+            return None
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+                [query.model._meta.db_table],
+            )
+            row = cursor.fetchone()
+        # reltuples равен -1, если таблица ещё ни разу не анализировалась,
+        # а для небольших таблиц точный подсчёт обходится дешевле.
+        if not row or row[0] < self.exact_count_threshold:
+            return None
+        return int(row[0])
@@ -0,0 +1,189 @@
+"""
+Кэширование готовых тел ответов с элементами версий справочников.
+
+Содержимое версии меняется только вместе с её статистикой (хеш содержимого
+и время изменения), поэтому отрендеренное и сжатое тело ответа можно
+вычислить один раз и отдавать из кэша, пока статистика версии не изменится.
+Для каждого языка значений элементов кэшируется отдельное тело ответа.
+"""
+
+import gzip
+from dataclasses import dataclass
+from hashlib import sha256
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import F, FilteredRelation, Q, QuerySet
+from django.db.models.functions import Coalesce
+from django.http import HttpRequest, HttpResponse
+from django.middleware.gzip import re_accepts_gzip
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+
+from .models import HandbookVersion
+from .renderers import ElementRowsRenderer
+
+# Короткие ответы не сжимаются, как и в GZipMiddleware.
+MIN_COMPRESS_LENGTH = 200
+
+# Рендереры, ответы которых можно кэшировать целиком.
+CACHEABLE_RENDERERS = (JSONRenderer, ElementRowsRenderer)
+
+
+@dataclass(frozen=True)
+class CachedPayload:
+    """
+    Отрендеренное тело ответа вместе с его сжатой копией
+    и количеством элементов в нём.
+    """
+
+    content: bytes
+    gzip_content: bytes
+    content_type: str
+    etag: str
+    element_count: int = 0
+
+    @property
+    def gzip_etag(self) -> str:
+        """
+        ETag сжатой копии. Сильный валидатор должен отличаться
+        для каждого представления ответа, поэтому он не совпадает с etag.
+        """
+        return f'{self.etag[:-1]}-gzip"'
+
+
+def is_cacheable(renderer: BaseRenderer) -> bool:
+    """
+    Проверяет, можно ли отдать ответ для рендерера из кэша готовых тел.
+    """
+    return isinstance(renderer, CACHEABLE_RENDERERS)
+
+
+def localize_rows(elements: QuerySet, language: str, *fields: str) -> QuerySet:
+    """
+    Получить кортежи (*fields, код, значение) элементов на указанном языке.
+    Значения на языке по умолчанию хранятся в самих элементах,
+    для остальных языков берётся перевод, а при его отсутствии — исходное значение.
+
+    :param elements: QuerySet элементов.
+    :param language: Код языка.
+    :param fields: Дополнительные поля в начале кортежа.
+    :return: QuerySet кортежей.
+    """
+    if language == settings.LANGUAGE_CODE:
+        return elements.values_list(*fields, "code", "value")
+    return (
+        elements.alias(
+            translation=FilteredRelation(
+                "translations", condition=Q(translations__language=language)
+            )
+        )
+        .annotate(localized_value=Coalesce(F("translation__value"), F("value")))
+        .values_list(*fields, "code", "localized_value")
+    )
+
+
+def get_element_rows(version: HandbookVersion, language: str) -> QuerySet:
+    """
+    Получить пары (код, значение) элементов версии на указанном языке.
+
+    :param version: Объект версии справочника.
+    :param language: Код языка.
+    :return: QuerySet кортежей (код, значение).
+    """
+    return localize_rows(version.elements.all(), language)
+
+
+def get_payload_key(
+    version: HandbookVersion, renderer: BaseRenderer, language: str
+) -> str:
+    """
+    Формирует ключ кэша, который меняется при любом изменении версии.
+
+    :param version: Объект версии справочника.
+    :param renderer: Выбранный рендерер ответа.
+    :param language: Код языка значений элементов.
+    :return: Ключ кэша.
+    """
+    modified_at = version.modified_at.timestamp() if version.modified_at else 0
+    return (
+        f"handbook:elements:{version.pk}:{version.content_hash}:"
+        f"{modified_at}:{renderer.format}:{language}"
+    )
+
+
+def build_elements_payload(
+    version: HandbookVersion, renderer: BaseRenderer, language: str, key: str
+) -> CachedPayload:
+    """
+    Рендерит элементы версии и сжимает результат.
+
+    :param version: Объект версии справочника.
+    :param renderer: Рендерер ответа.
+    :param language: Код языка значений элементов.
+    :param key: Ключ кэша, из которого вычисляется ETag.
+    :return: Готовое тело ответа.
+    """
+    rows = list(get_element_rows(version, language))
+    if isinstance(renderer, ElementRowsRenderer):
+        data = rows
+    else:
+        data = {"elements": [{"code": code, "value": value} for code, value in rows]}
+    content = renderer.render(data, renderer.media_type)
+    gzip_content = b""
+    if len(content) >= MIN_COMPRESS_LENGTH:
+        gzip_content = gzip.compress(content, mtime=0)
+    content_type = renderer.media_type
+    if renderer.charset:
+        content_type = f"{content_type}; charset={renderer.charset}"
+    return CachedPayload(
+        content=content,
+        gzip_content=gzip_content,
+        content_type=content_type,
+        etag=f'"{sha256(key.encode()).hexdigest()}"',
+        element_count=len(rows),
+    )
+
+
+def get_elements_payload(
+    version: HandbookVersion, renderer: BaseRenderer, language: str
+) -> CachedPayload:
+    """
+    Возвращает тело ответа с элементами версии из кэша или рендерит его.
+
+    :param version: Объект версии справочника.
+    :param renderer: Выбранный рендерер ответа.
+    :param language: Код языка значений элементов.
+    :return: Готовое тело ответа.
+    """
+    key = get_payload_key(version, renderer, language)
+    payload = cache.get(key)
+    if payload is None:
+        payload = build_elements_payload(version, renderer, language, key)
+        cache.set(key, payload, settings.HANDBOOK_PAYLOAD_CACHE_TIMEOUT)
+    return payload
+
+
+def payload_response(request: HttpRequest, payload: CachedPayload) -> HttpResponse:
+    """
+    Формирует ответ из готового тела.
+    Сжатая копия отдаётся, если клиент принимает gzip,
+    а при совпадении If-None-Match с ETag отдаваемого представления
+    возвращается 304.
+
+    :param request: Объект запроса.
+    :param payload: Готовое тело ответа.
+    :return: Объект ответа.
+    """
+    response = HttpResponse(content_type=payload.content_type)
+    accept_encoding = request.META.get("HTTP_ACCEPT_ENCODING", "")
+    if payload.gzip_content and re_accepts_gzip.search(accept_encoding):
+        response.content = payload.gzip_content
+        response["Content-Encoding"] = "gzip"
+        etag = payload.gzip_etag
+    else:
+        response.content = payload.content
+        etag = payload.etag
+    response["ETag"] = etag
+    patch_vary_headers(response, ("Accept", "Accept-Encoding", "Accept-Language"))
+    return get_conditional_response(request, etag=etag, response=response)
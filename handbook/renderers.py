@@ -0,0 +1,70 @@
+import json
+from abc import ABC, abstractmethod
+from typing import Any
+
+from rest_framework.renderers import BaseRenderer
+
+
+class ElementRowsRenderer(BaseRenderer, ABC):
+    """
+    Базовый рендерер для элементов справочника в компактном виде.
+    Получает элементы списком кортежей (код, значение) прямо из values_list,
+    без промежуточных словарей и сериализатора.
+    Остальные данные (например, ошибки) рендерит как обычный JSON.
+    """
+
+    charset = "utf-8"
+
+    def render(
+        self, data: Any, accepted_media_type=None, renderer_context=None
+    ) -> bytes:
+        """
+        Рендерит список элементов или произвольные данные в байты.
+        """
+        if isinstance(data, list):
+            return self.render_rows(data)
+        return self.dumps(data).encode()
+
+    @abstractmethod
+    def render_rows(self, rows: list) -> bytes:
+        """
+        Рендерит список кортежей (код, значение).
+        """
+
+    @staticmethod
+    def dumps(data: Any) -> str:
+        """
+        Сериализует данные в компактный JSON.
+        """
+        return json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+
+
+class NDJSONRenderer(ElementRowsRenderer):
+    """
+    Рендерер элементов в формате NDJSON: по одному объекту JSON на строку.
+    Позволяет клиентам разбирать ответ построчно, не загружая его целиком.
+    """
+
+    media_type = "application/x-ndjson"
+    format = "ndjson"
+
+    def render_rows(self, rows: list) -> bytes:
+        dumps = self.dumps
+        return "".join(
+            f"{dumps({'code': code, 'value': value})}\n" for code, value in rows
+        ).encode()
+
+
+class ColumnarJSONRenderer(ElementRowsRenderer):
+    """
+    Рендерер элементов в колоночном виде: {"codes": [...], "values": [...]}.
+    Ключи "code" и "value" не повторяются для каждого элемента.
+    """
+
+    media_type = "application/vnd.handbook.columnar+json"
+    format = "columnar"
+
+    def render_rows(self, rows: list) -> bytes:
+        codes = [code for code, _ in rows]
+        values = [value for _, value in rows]
+        return self.dumps({"codes": codes, "values": values}).encode()
@@ -0,0 +1,133 @@
+"""
+Маршрутизация читающих запросов API на реплики базы данных.
+
+Чтение направляется на реплику только внутри контекста read_from_replica,
+который открывают читающие представления API. Админка, запись и любые
+запросы вне этого контекста идут в основную базу. Реплика выбирается
+один раз на весь запрос, чтобы все его запросы видели одно состояние данных.
+
+Отставание реплики определяется по журналу изменений: реплика считается
+актуальной, если её последний токен HandbookChange отстаёт от основной
+базы не больше чем на HANDBOOK_REPLICA_MAX_LAG изменений.
+Результат проверки кэшируется на HANDBOOK_REPLICA_CHECK_INTERVAL секунд.
+"""
+
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, DatabaseError
+from django.db.models import Max
+
+# Псевдоним базы, выбранной для читающих запросов текущего запроса API.
+_read_alias: ContextVar[Optional[str]] = ContextVar("handbook_read_alias", default=None)
+
+# Результаты проверки реплик: {псевдоним: (время проверки, актуальна ли)}.
+_replica_state: Dict[str, Tuple[float, bool]] = {}
+
+
+def get_change_position(alias: str) -> int:
+    """
+    Получить последний токен журнала изменений в базе.
+
+    :param alias: Псевдоним базы данных.
+    :return: Идентификатор последней записи журнала или 0.
+    """
+    from .models import HandbookChange
+
+    position = HandbookChange.objects.using(alias).aggregate(position=Max("id"))
+    return position["position"] or 0
+
+
+def is_replica_fresh(alias: str) -> bool:
+    """
+    Проверяет, что реплика доступна и отстаёт от основной базы не сильнее допустимого.
+    Результат проверки кэшируется в процессе.
+
+    :param alias: Псевдоним реплики.
+    :return: True, если реплику можно использовать для чтения.
+    """
+    now = time.monotonic()
+    checked_at, fresh = _replica_state.get(alias, (None, False))
+    if (
+        checked_at is not None
+        and now - checked_at < settings.HANDBOOK_REPLICA_CHECK_INTERVAL
+    ):
+        return fresh
+    try:
+        lag = get_change_position(DEFAULT_DB_ALIAS) - get_change_position(alias)
+        fresh = lag <= settings.HANDBOOK_REPLICA_MAX_LAG
+    except DatabaseError:
+        fresh = False
+    _replica_state[alias] = (now, fresh)
+    return fresh
+
+
+def choose_read_alias() -> str:
+    """
+    Выбирает случайную актуальную реплику или основную базу,
+    если актуальных реплик нет.
+
+    :return: Псевдоним базы данных для чтения.
+    """
+    replicas: List[str] = list(settings.HANDBOOK_READ_REPLICAS)
+    random.shuffle(replicas)
+    for alias in replicas:
+        if is_replica_fresh(alias):
+            return alias
+    return DEFAULT_DB_ALIAS
+
+
+@contextmanager
+def read_from_replica() -> Iterator[str]:
+    """
+    Контекст, внутри которого чтение идёт с выбранной реплики.
+
+    :return: Псевдоним выбранной базы данных.
+    """
+    alias = choose_read_alias()
+    token = _read_alias.set(alias)
+    try:
+        yield alias
+    finally:
+        _read_alias.reset(token)
+
+
+class ReadReplicaRouter:
+    """
+    Маршрутизатор баз данных, направляющий чтение в контексте
+    read_from_replica на реплику, а всё остальное — в основную базу.
+    """
+
+    def db_for_read(self, model, **hints) -> Optional[str]:
+        """
+        Возвращает реплику, выбранную для текущего запроса API.
+        """
+        return _read_alias.get()
+
+    def db_for_write(self, model, **hints) -> Optional[str]:
+        """
+        Запись всегда идёт в основную базу.
+        """
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints) -> Optional[bool]:
+        """
+        Разрешает связи между объектами основной базы и реплик,
+        так как реплики содержат те же данные.
+        """
+        aliases = {DEFAULT_DB_ALIAS, *settings.HANDBOOK_READ_REPLICAS}
+        if obj1._state.db in aliases and obj2._state.db in aliases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints) -> Optional[bool]:
+        """
+        Реплики заполняются копированием основной базы, а не миграциями.
+        """
+        if db in settings.HANDBOOK_READ_REPLICAS:
+            return False
+        return None
@@ -1,16 +1,24 @@
+"""
+Схемы операций API для документации Swagger.
+Модуль импортируется лениво, при первом запросе документации (см. модуль docs).
+"""
+
 from typing import Dict
 
 from drf_yasg import openapi
+from drf_yasg.utils import no_body
 from drf_yasg.views import get_schema_view
 from rest_framework import permissions
 
+api_info = openapi.Info(
+    title="Handbook API",
+    default_version="v1",
+    description="API для работы со справочниками.",
+    contact=openapi.Contact(email="contact@example.com"),
+)
+
 schema_view = get_schema_view(
-    openapi.Info(
-        title="Handbook API",
-        default_version="v1",
-        description="API для работы со справочниками.",
-        contact=openapi.Contact(email="contact@example.com"),
-    ),
+    api_info,
     public=True,
     permission_classes=[
         permissions.AllowAny,
@@ -42,19 +50,119 @@ common_parameters = {
         description="Код элемента справочника",
         type=openapi.TYPE_STRING,
     ),
+    "since": openapi.Parameter(
+        "since",
+        openapi.IN_QUERY,
+        description="Токен последней синхронизации",
+        type=openapi.TYPE_STRING,
+    ),
+    "limit": openapi.Parameter(
+        "limit",
+        openapi.IN_QUERY,
+        description="Максимальное количество изменений в ответе",
+        type=openapi.TYPE_INTEGER,
+        minimum=1,
+    ),
     "value": openapi.Parameter(
         "value",
         openapi.IN_QUERY,
         description="Значение элемента",
         type=openapi.TYPE_STRING,
     ),
+    "exact": openapi.Parameter(
+        "exact",
+        openapi.IN_QUERY,
+        description="Сравнивать значение элемента целиком, а не искать подстроку",
+        type=openapi.TYPE_BOOLEAN,
+    ),
+    "ancestor": openapi.Parameter(
+        "ancestor",
+        openapi.IN_QUERY,
+        description="Код предполагаемого предка элемента",
+        type=openapi.TYPE_STRING,
+    ),
+    "include": openapi.Parameter(
+        "include",
+        openapi.IN_QUERY,
+        description="Дополнительные данные в списке: current_elements — "
+        "текущая версия и её элементы",
+        type=openapi.TYPE_STRING,
+        enum=["current_elements"],
+    ),
+    "job_id": openapi.Parameter(
+        "id",
+        openapi.IN_PATH,
+        description="Идентификатор задачи",
+        type=openapi.TYPE_STRING,
+    ),
+    "job_status": openapi.Parameter(
+        "status",
+        openapi.IN_QUERY,
+        description="Статус задачи",
+        type=openapi.TYPE_STRING,
+        enum=["pending", "running", "succeeded", "failed"],
+    ),
+    "from": openapi.Parameter(
+        "from",
+        openapi.IN_QUERY,
+        description="Исходная версия для сравнения",
+        type=openapi.TYPE_STRING,
+        required=True,
+    ),
+    "to": openapi.Parameter(
+        "to",
+        openapi.IN_QUERY,
+        description="Версия для сравнения (по умолчанию текущая)",
+        type=openapi.TYPE_STRING,
+    ),
+    "offset": openapi.Parameter(
+        "offset",
+        openapi.IN_QUERY,
+        description="Смещение от начала списка",
+        type=openapi.TYPE_INTEGER,
+    ),
+}
+
+# Схема элемента справочника с его положением в иерархии
+tree_element_schema = openapi.Schema(
+    type=openapi.TYPE_OBJECT,
+    properties={
+        "code": openapi.Schema(type=openapi.TYPE_STRING),
+        "value": openapi.Schema(type=openapi.TYPE_STRING),
+        "parent_code": openapi.Schema(type=openapi.TYPE_STRING),
+        "depth": openapi.Schema(type=openapi.TYPE_INTEGER),
+    },
+)
+
+# Ответы с ошибками запросов к иерархии элементов
+tree_error_responses = {
+    400: openapi.Response(
+        description="Не указан код элемента или не построен индекс иерархии",
+        examples={
+            "application/json": [
+                {"error": "Parameter 'code' is required."},
+                {"error": "Tree index is not built for this version."},
+            ]
+        },
+    ),
+    404: openapi.Response(
+        description="Справочник, версия или элемент не найдены",
+        examples={
+            "application/json": {"error": "Element 'A00' not found in this version."}
+        },
+    ),
 }
 
+# Схема для методов, исключённых из документации
+exclude_schema: Dict = {"auto_schema": None}
+
 # Схема для получения списка справочников
 list_handbooks_schema: Dict = {
     "operation_description": "Возвращает список всех справочников, "
     "с возможностью фильтрации "
-    "по дате начала действия версии.",
+    "по дате начала действия версии. "
+    "С параметром include=current_elements для каждого справочника "
+    "возвращаются текущая версия и её элементы одним потоковым ответом.",
     "operation_id": "list_handbooks",
     "responses": {
         200: openapi.Response(
@@ -70,6 +178,48 @@ list_handbooks_schema: Dict = {
                                 "id": openapi.Schema(type=openapi.TYPE_INTEGER),
                                 "code": openapi.Schema(type=openapi.TYPE_STRING),
                                 "name": openapi.Schema(type=openapi.TYPE_STRING),
+                                "element_count": openapi.Schema(
+                                    type=openapi.TYPE_INTEGER
+                                ),
+                                "content_hash": openapi.Schema(
+                                    type=openapi.TYPE_STRING
+                                ),
+                                "modified_at": openapi.Schema(
+                                    type=openapi.TYPE_STRING,
+                                    format=openapi.FORMAT_DATETIME,
+                                ),
+                                "current_version": openapi.Schema(
+                                    type=openapi.TYPE_OBJECT,
+                                    x_nullable=True,
+                                    description="Только с include=current_elements",
+                                    properties={
+                                        "version": openapi.Schema(
+                                            type=openapi.TYPE_STRING
+                                        ),
+                                        "start_date": openapi.Schema(
+                                            type=openapi.TYPE_STRING,
+                                            format=openapi.FORMAT_DATE,
+                                        ),
+                                        "element_count": openapi.Schema(
+                                            type=openapi.TYPE_INTEGER
+                                        ),
+                                    },
+                                ),
+                                "elements": openapi.Schema(
+                                    type=openapi.TYPE_ARRAY,
+                                    description="Только с include=current_elements",
+                                    items=openapi.Schema(
+                                        type=openapi.TYPE_OBJECT,
+                                        properties={
+                                            "code": openapi.Schema(
+                                                type=openapi.TYPE_STRING
+                                            ),
+                                            "value": openapi.Schema(
+                                                type=openapi.TYPE_STRING
+                                            ),
+                                        },
+                                    ),
+                                ),
                             },
                         ),
                     )
@@ -82,32 +232,53 @@ list_handbooks_schema: Dict = {
                             "id": 1,
                             "code": "Код справочника 1",
                             "name": "Наименование справочника 1",
+                            "element_count": 3,
+                            "content_hash": "2d711642b726b04401627ca9fbac32f5c8530fb1903cc4db02258717921a4881",
+                            "modified_at": "2024-12-03T13:10:00+03:00",
                         },
                         {
                             "id": 2,
                             "code": "Код справочника 2",
                             "name": "Наименование справочника 2",
+                            "element_count": 0,
+                            "content_hash": "0000000000000000000000000000000000000000000000000000000000000000",
+                            "modified_at": None,
                         },
                     ]
                 }
             },
         ),
         400: openapi.Response(
-            description="Неверный формат даты",
+            description="Неверный формат даты, неизвестное значение include "
+            "или слишком много элементов для include=current_elements",
             examples={
                 "application/json": {"error": "Invalid date format. Use 'YYYY-MM-DD'."}
             },
         ),
+        429: openapi.Response(
+            description="Превышен лимит запросов или одновременных выгрузок "
+            "(для include=current_elements). Через сколько секунд повторить "
+            "запрос, указано в заголовке Retry-After.",
+            examples={
+                "application/json": {
+                    "detail": "Request was throttled. Expected available in 1 second."
+                }
+            },
+        ),
     },
     "manual_parameters": [
         common_parameters["date"],
+        common_parameters["include"],
     ],
 }
 
 # Схема для получения элементов справочника
 get_handbook_elements_schema: Dict = {
     "operation_description": "Возвращает элементы справочника по "
-    "указанной версии или текущей версии.",
+    "указанной версии или текущей версии. "
+    "Формат ответа выбирается заголовком Accept: JSON, NDJSON "
+    "или колоночный JSON. Язык значений элементов выбирается "
+    "заголовком Accept-Language.",
     "operation_id": "get_handbook_elements",
     "responses": {
         200: openapi.Response(
@@ -133,7 +304,13 @@ get_handbook_elements_schema: Dict = {
                         {"code": "element_1", "value": "Значение 1"},
                         {"code": "element_2", "value": "Значение 2"},
                     ]
-                }
+                },
+                "application/x-ndjson": '{"code":"element_1","value":"Значение 1"}\n'
+                '{"code":"element_2","value":"Значение 2"}\n',
+                "application/vnd.handbook.columnar+json": {
+                    "codes": ["element_1", "element_2"],
+                    "values": ["Значение 1", "Значение 2"],
+                },
             },
         ),
         404: openapi.Response(
@@ -145,6 +322,15 @@ get_handbook_elements_schema: Dict = {
                 ]
             },
         ),
+        429: openapi.Response(
+            description="Превышен лимит запросов или одновременных выгрузок. "
+            "Через сколько секунд повторить запрос, указано в заголовке Retry-After.",
+            examples={
+                "application/json": {
+                    "detail": "Request was throttled. Expected available in 1 second."
+                }
+            },
+        ),
     },
     "manual_parameters": [
         common_parameters["id"],
@@ -155,7 +341,8 @@ get_handbook_elements_schema: Dict = {
 # Схема для проверки существования элемента
 check_element_schema: Dict = {
     "operation_description": "Проверяет наличие элемента "
-    "с указанным кодом и значением в указанной версии.",
+    "с указанным кодом и значением в указанной версии. "
+    "Код и значение сравниваются без учёта регистра.",
     "operation_id": "check_element_exists",
     "responses": {
         200: openapi.Response(
@@ -189,6 +376,584 @@ check_element_schema: Dict = {
         common_parameters["id"],
         common_parameters["code"],
         common_parameters["value"],
+        common_parameters["exact"],
         common_parameters["version"],
     ],
 }
+
+# Схема для получения поддерева элемента
+subtree_schema: Dict = {
+    "operation_description": "Возвращает элемент и всех его потомков "
+    "в указанной или текущей версии в порядке обхода в глубину. "
+    "Запрос считается тяжёлой выгрузкой, количество элементов ограничено "
+    "настройкой HANDBOOK_SUBTREE_MAX_ELEMENTS.",
+    "operation_id": "get_element_subtree",
+    "responses": {
+        200: openapi.Response(
+            description="Элементы поддерева",
+            schema=openapi.Schema(
+                type=openapi.TYPE_OBJECT,
+                properties={
+                    "elements": openapi.Schema(
+                        type=openapi.TYPE_ARRAY, items=tree_element_schema
+                    )
+                },
+            ),
+            examples={
+                "application/json": {
+                    "elements": [
+                        {
+                            "code": "A00",
+                            "value": "Холера",
+                            "parent_code": "",
+                            "depth": 0,
+                        },
+                        {
+                            "code": "A00.0",
+                            "value": "Холера классическая",
+                            "parent_code": "A00",
+                            "depth": 1,
+                        },
+                    ]
+                }
+            },
+        ),
+        **tree_error_responses,
+        400: openapi.Response(
+            description="Не указан код элемента, не построен индекс иерархии "
+            "или в поддереве слишком много элементов",
+            examples={
+                "application/json": {
+                    "error": "Too many elements in the subtree (> 10000). "
+                    "Request subtrees of its children separately."
+                }
+            },
+        ),
+        429: openapi.Response(
+            description="Превышен лимит запросов или одновременных выгрузок. "
+            "Через сколько секунд повторить запрос, указано в заголовке Retry-After.",
+            examples={
+                "application/json": {
+                    "detail": "Request was throttled. Expected available in 1 second."
+                }
+            },
+        ),
+    },
+    "manual_parameters": [
+        common_parameters["id"],
+        common_parameters["code"],
+        common_parameters["version"],
+    ],
+}
+
+# Схема для получения предков элемента
+ancestors_schema: Dict = {
+    "operation_description": "Возвращает предков элемента "
+    "от корня иерархии к непосредственному родителю.",
+    "operation_id": "get_element_ancestors",
+    "responses": {
+        200: openapi.Response(
+            description="Элементы-предки",
+            schema=openapi.Schema(
+                type=openapi.TYPE_OBJECT,
+                properties={
+                    "elements": openapi.Schema(
+                        type=openapi.TYPE_ARRAY, items=tree_element_schema
+                    )
+                },
+            ),
+        ),
+        **tree_error_responses,
+    },
+    "manual_parameters": [
+        common_parameters["id"],
+        common_parameters["code"],
+        common_parameters["version"],
+    ],
+}
+
+# Схема для проверки, является ли элемент потомком другого элемента
+is_descendant_schema: Dict = {
+    "operation_description": "Проверяет, является ли элемент с кодом code "
+    "потомком элемента с кодом ancestor.",
+    "operation_id": "check_element_is_descendant",
+    "responses": {
+        200: openapi.Response(
+            description="Результат проверки",
+            schema=openapi.Schema(
+                type=openapi.TYPE_OBJECT,
+                properties={"is_descendant": openapi.Schema(type=openapi.TYPE_BOOLEAN)},
+            ),
+            examples={"application/json": {"is_descendant": True}},
+        ),
+        **tree_error_responses,
+    },
+    "manual_parameters": [
+        common_parameters["id"],
+        common_parameters["code"],
+        common_parameters["ancestor"],
+        common_parameters["version"],
+    ],
+}
+
+# Схема версии справочника в ответах API загрузки
+version_response_schema = openapi.Schema(
+    type=openapi.TYPE_OBJECT,
+    properties={
+        "id": openapi.Schema(type=openapi.TYPE_INTEGER),
+        "version": openapi.Schema(type=openapi.TYPE_STRING),
+        "start_date": openapi.Schema(
+            type=openapi.TYPE_STRING, format=openapi.FORMAT_DATE
+        ),
+        "status": openapi.Schema(type=openapi.TYPE_STRING, enum=["draft", "published"]),
+        "element_count": openapi.Schema(type=openapi.TYPE_INTEGER),
+    },
+)
+
+# Схема для создания черновика версии
+create_version_schema: Dict = {
+    "operation_description": "Создаёт черновик версии справочника. "
+    "Черновик не виден читателям до публикации. "
+    "Если указана базовая версия, её элементы копируются в черновик "
+    "фоновой задачей (поле job), после которой загружать остаётся "
+    "только изменённые элементы. До завершения задачи загрузка элементов и публикация "
+    "черновика отклоняются. "
+    "Доступно только администраторам.",
+    "operation_id": "create_handbook_version",
+    "request_body": openapi.Schema(
+        type=openapi.TYPE_OBJECT,
+        required=["version", "start_date"],
+        properties={
+            "version": openapi.Schema(type=openapi.TYPE_STRING),
+            "start_date": openapi.Schema(
+                type=openapi.TYPE_STRING, format=openapi.FORMAT_DATE
+            ),
+            "base_version": openapi.Schema(
+                type=openapi.TYPE_STRING,
+                description="Опубликованная версия, элементы которой "
+                "копируются в черновик",
+            ),
+        },
+    ),
+    "responses": {
+        201: openapi.Response(
+            description="Созданный черновик версии",
+            schema=openapi.Schema(
+                type=openapi.TYPE_OBJECT,
+                properties={
+                    **version_response_schema.properties,
+                    "job": openapi.Schema(
+                        type=openapi.TYPE_INTEGER,
+                        description="Задача копирования элементов базовой версии "
+                        "(если она указана)",
+                    ),
+                },
+            ),
+            examples={
+                "application/json": {
+                    "id": 5,
+                    "version": "2025",
+                    "start_date": "2025-01-01",
+                    "status": "draft",
+                    "element_count": 0,
+                    "job": 12,
+                }
+            },
+        ),
+        400: openapi.Response(
+            description="Версия уже существует",
+            examples={
+                "application/json": {
+                    "error": "Version with this number or start date already exists."
+                }
+            },
+        ),
+        404: openapi.Response(
+            description="Справочник или базовая версия не найдены",
+            examples={
+                "application/json": {
+                    "error": "Version '2024' not found for this handbook."
+                }
+            },
+        ),
+    },
+    "manual_parameters": [
+        common_parameters["id"],
+    ],
+}
+
+# Схема для загрузки пакета элементов в черновик версии
+upload_elements_schema: Dict = {
+    "operation_description": "Загружает пакет элементов в черновик версии. "
+    "Элементы с существующими кодами обновляются, "
+    "элементы с кодами из removed удаляются. "
+    "Доступно только администраторам.",
+    "operation_id": "upload_version_elements",
+    "request_body": openapi.Schema(
+        type=openapi.TYPE_OBJECT,
+        properties={
+            "elements": openapi.Schema(
+                type=openapi.TYPE_ARRAY,
+                items=openapi.Schema(
+                    type=openapi.TYPE_OBJECT,
+                    required=["code", "value"],
+                    properties={
+                        "code": openapi.Schema(type=openapi.TYPE_STRING),
+                        "value": openapi.Schema(type=openapi.TYPE_STRING),
+                        "parent_code": openapi.Schema(type=openapi.TYPE_STRING),
+                    },
+                ),
+            ),
+            "removed": openapi.Schema(
+                type=openapi.TYPE_ARRAY,
+                items=openapi.Schema(type=openapi.TYPE_STRING),
+                description="Коды удаляемых элементов",
+            ),
+        },
+    ),
+    "responses": {
+        200: openapi.Response(
+            description="Количество элементов в версии",
+            schema=openapi.Schema(
+                type=openapi.TYPE_OBJECT,
+                properties={"element_count": openapi.Schema(type=openapi.TYPE_INTEGER)},
+            ),
+            examples={"application/json": {"element_count": 5000}},
+        ),
+        400: openapi.Response(
+            description="Версия уже опубликована или в неё ещё копируются "
+            "элементы базовой версии",
+            examples={
+                "application/json": {"error": "Version '2025' is already published."}
+            },
+        ),
+    },
+    "manual_parameters": [
+        common_parameters["id"],
+    ],
+}
+
+# Схема для сравнения версий справочника
+diff_schema: Dict = {
+    "operation_description": "Сравнивает две опубликованные версии справочника. "
+    "Версии с достоверной статистикой и одинаковым хешем содержимого "
+    "считаются совпадающими без чтения элементов. Изменёнными считаются "
+    "элементы с другим значением или кодом родителя.",
+    "operation_id": "diff_handbook_versions",
+    "responses": {
+        200: openapi.Response(
+            description="Разница между версиями",
+            schema=openapi.Schema(
+                type=openapi.TYPE_OBJECT,
+                properties={
+                    "from": openapi.Schema(type=openapi.TYPE_STRING),
+                    "to": openapi.Schema(type=openapi.TYPE_STRING),
+                    "identical": openapi.Schema(type=openapi.TYPE_BOOLEAN),
+                    "added": openapi.Schema(
+                        type=openapi.TYPE_ARRAY,
+                        items=openapi.Schema(
+                            type=openapi.TYPE_OBJECT,
+                            properties={
+                                "code": openapi.Schema(type=openapi.TYPE_STRING),
+                                "value": openapi.Schema(type=openapi.TYPE_STRING),
+                            },
+                        ),
+                    ),
+                    "removed": openapi.Schema(
+                        type=openapi.TYPE_ARRAY,
+                        items=openapi.Schema(
+                            type=openapi.TYPE_OBJECT,
+                            properties={
+                                "code": openapi.Schema(type=openapi.TYPE_STRING),
+                                "value": openapi.Schema(type=openapi.TYPE_STRING),
+                            },
+                        ),
+                    ),
+                    "changed": openapi.Schema(
+                        type=openapi.TYPE_ARRAY,
+                        items=openapi.Schema(
+                            type=openapi.TYPE_OBJECT,
+                            properties={
+                                "code": openapi.Schema(type=openapi.TYPE_STRING),
+                                "previous_value": openapi.Schema(
+                                    type=openapi.TYPE_STRING
+                                ),
+                                "value": openapi.Schema(type=openapi.TYPE_STRING),
+                                "previous_parent_code": openapi.Schema(
+                                    type=openapi.TYPE_STRING
+                                ),
+                                "parent_code": openapi.Schema(type=openapi.TYPE_STRING),
+                            },
+                        ),
+                    ),
+                },
+            ),
+            examples={
+                "application/json": {
+                    "from": "2021",
+                    "to": "2023",
+                    "identical": False,
+                    "added": [{"code": "AMOX", "value": "Амоксициллин 875 мг"}],
+                    "removed": [{"code": "IBU", "value": "Ибупрофен 200 мг"}],
+                    "changed": [
+                        {
+                            "code": "PARA",
+                            "previous_value": "Парацетамол 500 мг",
+                            "value": "Парацетамол 1000 мг",
+                            "previous_parent_code": "",
+                            "parent_code": "",
+                        }
+                    ],
+                }
+            },
+        ),
+        400: openapi.Response(
+            description="Не указана исходная версия",
+            examples={"application/json": {"error": "Parameter 'from' is required."}},
+        ),
+        404: openapi.Response(
+            description="Справочник или версия не найдены",
+            examples={
+                "application/json": {
+                    "error": "Version '2020' not found for this handbook."
+                }
+            },
+        ),
+        429: openapi.Response(
+            description="Превышен лимит запросов или одновременных выгрузок. "
+            "Через сколько секунд повторить запрос, указано в заголовке Retry-After.",
+            examples={
+                "application/json": {
+                    "detail": "Request was throttled. Expected available in 1 second."
+                }
+            },
+        ),
+    },
+    "manual_parameters": [
+        common_parameters["id"],
+        common_parameters["from"],
+        common_parameters["to"],
+    ],
+}
+
+# Схема для публикации черновика версии
+publish_version_schema: Dict = {
+    "operation_description": "Публикует черновик версии одной транзакцией, "
+    "после чего версия становится видна читателям. "
+    "Доступно только администраторам.",
+    "operation_id": "publish_handbook_version",
+    "request_body": no_body,
+    "responses": {
+        200: openapi.Response(
+            description="Опубликованная версия",
+            schema=version_response_schema,
+        ),
+        400: openapi.Response(
+            description="Версия уже опубликована или в неё ещё копируются "
+            "элементы базовой версии",
+            examples={
+                "application/json": {"error": "Version '2025' is already published."}
+            },
+        ),
+    },
+    "manual_parameters": [
+        common_parameters["id"],
+    ],
+}
+
+# Схема для получения журнала изменений
+list_changes_schema: Dict = {
+    "operation_description": "Возвращает изменения справочников, версий "
+    "и элементов после указанного токена синхронизации. "
+    "Изменения после пропуска в токенах, который может означать "
+    "незафиксированную транзакцию, выдаются после её фиксации, "
+    "при этом has_more равен false.",
+    "operation_id": "list_changes",
+    "responses": {
+        200: openapi.Response(
+            description="Пакет изменений",
+            schema=openapi.Schema(
+                type=openapi.TYPE_OBJECT,
+                properties={
+                    "changes": openapi.Schema(
+                        type=openapi.TYPE_ARRAY,
+                        items=openapi.Schema(
+                            type=openapi.TYPE_OBJECT,
+                            properties={
+                                "token": openapi.Schema(type=openapi.TYPE_STRING),
+                                "kind": openapi.Schema(type=openapi.TYPE_STRING),
+                                "action": openapi.Schema(type=openapi.TYPE_STRING),
+                                "object_id": openapi.Schema(type=openapi.TYPE_INTEGER),
+                                "handbook_id": openapi.Schema(
+                                    type=openapi.TYPE_INTEGER
+                                ),
+                                "data": openapi.Schema(type=openapi.TYPE_OBJECT),
+                            },
+                        ),
+                    ),
+                    "next_token": openapi.Schema(type=openapi.TYPE_STRING),
+                    "has_more": openapi.Schema(type=openapi.TYPE_BOOLEAN),
+                },
+            ),
+            examples={
+                "application/json": {
+                    "changes": [
+                        {
+                            "token": "42",
+                            "kind": "element",
+                            "action": "updated",
+                            "object_id": 4,
+                            "handbook_id": 1,
+                            "data": {
+                                "version_id": 2,
+                                "code": "A00",
+                                "value": "Холера (обновлено)",
+                            },
+                        }
+                    ],
+                    "next_token": "42",
+                    "has_more": False,
+                }
+            },
+        ),
+        400: openapi.Response(
+            description="Неверно указаны параметры",
+            examples={"application/json": {"error": "Invalid 'since' parameter."}},
+        ),
+    },
+    "manual_parameters": [
+        common_parameters["since"],
+        common_parameters["limit"],
+    ],
+}
+
+# Схема фоновой задачи
+job_schema = openapi.Schema(
+    type=openapi.TYPE_OBJECT,
+    properties={
+        "id": openapi.Schema(type=openapi.TYPE_INTEGER),
+        "kind": openapi.Schema(type=openapi.TYPE_STRING),
+        "status": openapi.Schema(
+            type=openapi.TYPE_STRING,
+            enum=["pending", "running", "succeeded", "failed"],
+        ),
+        "handbook": openapi.Schema(type=openapi.TYPE_INTEGER, x_nullable=True),
+        "params": openapi.Schema(type=openapi.TYPE_OBJECT),
+        "progress": openapi.Schema(type=openapi.TYPE_INTEGER),
+        "total": openapi.Schema(type=openapi.TYPE_INTEGER, x_nullable=True),
+        "result": openapi.Schema(type=openapi.TYPE_OBJECT, x_nullable=True),
+        "error": openapi.Schema(type=openapi.TYPE_STRING),
+        "created_at": openapi.Schema(
+            type=openapi.TYPE_STRING, format=openapi.FORMAT_DATETIME
+        ),
+        "started_at": openapi.Schema(
+            type=openapi.TYPE_STRING, format=openapi.FORMAT_DATETIME, x_nullable=True
+        ),
+        "finished_at": openapi.Schema(
+            type=openapi.TYPE_STRING, format=openapi.FORMAT_DATETIME, x_nullable=True
+        ),
+    },
+)
+
+job_example = {
+    "id": 7,
+    "kind": "rebuild_tree_index",
+    "status": "running",
+    "handbook": 1,
+    "params": {"version_id": 2},
+    "progress": 0,
+    "total": None,
+    "result": None,
+    "error": "",
+    "created_at": "2025-01-01T10:00:00+03:00",
+    "started_at": "2025-01-01T10:00:01+03:00",
+    "finished_at": None,
+}
+
+# Схема для получения списка фоновых задач
+list_jobs_schema: Dict = {
+    "operation_description": "Возвращает фоновые задачи, начиная с последних. "
+    "Доступно только администраторам.",
+    "operation_id": "list_jobs",
+    "responses": {
+        200: openapi.Response(
+            description="Список задач",
+            schema=openapi.Schema(
+                type=openapi.TYPE_OBJECT,
+                properties={
+                    "count": openapi.Schema(type=openapi.TYPE_INTEGER),
+                    "next": openapi.Schema(type=openapi.TYPE_STRING, x_nullable=True),
+                    "previous": openapi.Schema(
+                        type=openapi.TYPE_STRING, x_nullable=True
+                    ),
+                    "results": openapi.Schema(
+                        type=openapi.TYPE_ARRAY, items=job_schema
+                    ),
+                },
+            ),
+        ),
+    },
+    "manual_parameters": [
+        common_parameters["job_status"],
+        common_parameters["limit"],
+        common_parameters["offset"],
+    ],
+}
+
+# Схема для получения статуса фоновой задачи
+retrieve_job_schema: Dict = {
+    "operation_description": "Возвращает статус, ход выполнения и результат "
+    "фоновой задачи. Доступно только администраторам.",
+    "operation_id": "retrieve_job",
+    "responses": {
+        200: openapi.Response(
+            description="Задача",
+            schema=job_schema,
+            examples={"application/json": job_example},
+        ),
+        404: openapi.Response(
+            description="Задача не найдена",
+            examples={
+                "application/json": {
+                    "detail": "No HandbookJob matches the given query."
+                }
+            },
+        ),
+    },
+    "manual_parameters": [
+        common_parameters["job_id"],
+    ],
+}
+
+# Схема для постановки фоновой задачи в очередь
+create_job_schema: Dict = {
+    "operation_description": "Ставит в очередь фоновую задачу: перестроение "
+    "индекса иерархии (rebuild_tree_index), пересчёт статистики "
+    "(refresh_handbook_stats), публикацию версии (publish_version), "
+    "копирование элементов базовой версии в черновик (copy_elements) "
+    "или импорт элементов из CSV в черновик (import_elements). "
+    "Задачи выполняет команда run_handbook_worker. "
+    "Доступно только администраторам.",
+    "operation_id": "create_job",
+    "request_body": openapi.Schema(
+        type=openapi.TYPE_OBJECT,
+        required=["kind"],
+        properties={
+            "kind": openapi.Schema(type=openapi.TYPE_STRING),
+            "handbook": openapi.Schema(type=openapi.TYPE_INTEGER),
+            "params": openapi.Schema(type=openapi.TYPE_OBJECT),
+        },
+    ),
+    "responses": {
+        201: openapi.Response(
+            description="Задача поставлена в очередь",
+            schema=job_schema,
+        ),
+        400: openapi.Response(
+            description="Неизвестный тип задачи или не хватает параметров",
+            examples={
+                "application/json": {"error": "Missing job parameters: version_id."}
+            },
+        ),
+    },
+}
@@ -1,6 +1,13 @@
 from rest_framework import serializers
 
-from .models import Handbook, HandbookElement
+from .bulk import MAX_CHUNK_SIZE
+from .models import (
+    Handbook,
+    HandbookChange,
+    HandbookElement,
+    HandbookJob,
+    HandbookVersion,
+)
 
 
 class HandbookSerializer(serializers.ModelSerializer):
@@ -10,7 +17,7 @@ class HandbookSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Handbook
-        fields = ["id", "code", "name"]
+        fields = ["id", "code", "name", "element_count", "content_hash", "modified_at"]
 
 
 class HandbookElementSerializer(serializers.ModelSerializer):
@@ -21,3 +28,121 @@ class HandbookElementSerializer(serializers.ModelSerializer):
     class Meta:
         model = HandbookElement
         fields = ["code", "value"]
+
+
+class HandbookTreeElementSerializer(serializers.ModelSerializer):
+    """
+    Сериализатор элемента справочника с его положением в иерархии.
+    Используется также для загрузки элементов в черновик версии.
+    """
+
+    class Meta:
+        model = HandbookElement
+        fields = ["code", "value", "parent_code", "depth"]
+
+
+class HandbookVersionSerializer(serializers.ModelSerializer):
+    """
+    Сериализатор для модели HandbookVersion.
+    Используется при создании черновика версии через API.
+    Черновик можно заполнить копией опубликованной версии (base_version).
+    """
+
+    base_version = serializers.CharField(required=False, write_only=True)
+
+    class Meta:
+        model = HandbookVersion
+        fields = [
+            "id",
+            "version",
+            "start_date",
+            "status",
+            "element_count",
+            "base_version",
+        ]
+        read_only_fields = ["status", "element_count"]
+
+
+class HandbookElementChunkSerializer(serializers.Serializer):
+    """
+    Сериализатор пакета элементов, загружаемых в черновик версии,
+    и кодов элементов, удаляемых из него.
+    """
+
+    elements = HandbookTreeElementSerializer(
+        many=True, required=False, max_length=MAX_CHUNK_SIZE
+    )
+    removed = serializers.ListField(
+        child=serializers.CharField(max_length=100),
+        required=False,
+        max_length=MAX_CHUNK_SIZE,
+    )
+
+    def validate(self, attrs: dict) -> dict:
+        """
+        Проверяет, что пакет содержит элементы или удаляемые коды.
+        """
+        if not attrs.get("elements") and not attrs.get("removed"):
+            raise serializers.ValidationError(
+                {"error": "Either 'elements' or 'removed' must not be empty."}
+            )
+        return attrs
+
+
+class CheckElementSerializer(serializers.Serializer):
+    """
+    Сериализатор параметров проверки наличия элемента.
+    """
+
+    code = serializers.CharField()
+    value = serializers.CharField()
+    version = serializers.CharField(required=False)
+    exact = serializers.BooleanField(default=False)
+
+
+class HandbookChangeSerializer(serializers.ModelSerializer):
+    """
+    Сериализатор для модели HandbookChange.
+    Идентификатор записи отдаётся как токен синхронизации.
+    """
+
+    token = serializers.CharField(source="pk")
+
+    class Meta:
+        model = HandbookChange
+        fields = ["token", "kind", "action", "object_id", "handbook_id", "data"]
+
+
+class HandbookJobSerializer(serializers.ModelSerializer):
+    """
+    Сериализатор для модели HandbookJob.
+    При постановке задачи в очередь принимаются только тип,
+    справочник и параметры задачи.
+    """
+
+    class Meta:
+        model = HandbookJob
+        fields = [
+            "id",
+            "kind",
+            "status",
+            "handbook",
+            "params",
+            "progress",
+            "total",
+            "result",
+            "error",
+            "created_at",
+            "started_at",
+            "finished_at",
+        ]
+        read_only_fields = [
+            "status",
+            "progress",
+            "total",
+            "result",
+            "error",
+            "created_at",
+            "started_at",
+            "finished_at",
+        ]
@@ -0,0 +1,159 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .changes import record_change
+from .models import (
+    Handbook,
+    HandbookChange,
+    HandbookElement,
+    HandbookElementTranslation,
+    HandbookVersion,
+)
+from .stats import apply_element_changes, refresh_handbook_stats, touch_version
+from .tree import update_element_path
+
+
+def _is_own_deletion(instance, origin) -> bool:
+    """
+    Проверяет, что удаление начато с самого объекта или QuerySet его модели,
+    а не каскадно при удалении родительского объекта.
+    """
+    model = getattr(origin, "model", type(origin))
+    return model is type(instance)
+
+
+@receiver(pre_save, sender=HandbookElement)
+def remember_element_state(sender, instance: HandbookElement, raw, **kwargs) -> None:
+    """
+    Запоминает сохранённое состояние элемента перед его изменением,
+    чтобы затем вычесть старое состояние (код, значение, код родителя)
+    из статистики версии и определить, изменилось ли положение элемента
+    в иерархии.
+    """
+    if raw or instance.pk is None:
+        instance._previous_state = None
+        instance._previous_link = None
+        instance._previous_path = ""
+        return
+    row = (
+        HandbookElement.objects.filter(pk=instance.pk)
+        .values_list("version_id", "code", "value", "parent_code", "path")
+        .first()
+    )
+    instance._previous_state = row[:4] if row else None
+    instance._previous_link = (row[0], row[1], row[3]) if row else None
+    instance._previous_path = row[4] if row else ""
+
+
+@receiver(post_save, sender=HandbookElement)
+def update_stats_on_element_save(
+    sender, instance: HandbookElement, raw, **kwargs
+) -> None:
+    """
+    Обновляет статистику версии после создания или изменения элемента.
+    """
+    if raw:
+        return
+    current = (instance.code, instance.value, instance.parent_code)
+    previous = getattr(instance, "_previous_state", None)
+    if previous is None:
+        apply_element_changes(instance.version_id, added=[current])
+        return
+    version_id, *state = previous
+    if version_id == instance.version_id:
+        if tuple(state) != current:
+            apply_element_changes(version_id, added=[current], removed=[state])
+    else:
+        apply_element_changes(version_id, removed=[state])
+        apply_element_changes(instance.version_id, added=[current])
+
+
+@receiver(post_save, sender=HandbookElement)
+def update_tree_on_element_save(
+    sender, instance: HandbookElement, raw, **kwargs
+) -> None:
+    """
+    Обновляет индекс иерархии, если элемент создан, перенесён в другую версию
+    или изменились его код или код родителя.
+    """
+    if raw:
+        return
+    previous = getattr(instance, "_previous_link", None)
+    if previous == (instance.version_id, instance.code, instance.parent_code):
+        return
+    update_element_path(instance, previous, getattr(instance, "_previous_path", ""))
+
+
+@receiver(pre_save, sender=HandbookVersion)
+def mark_new_version_stats_valid(
+    sender, instance: HandbookVersion, raw, **kwargs
+) -> None:
+    """
+    Помечает статистику новой версии достоверной: у версии ещё нет элементов,
+    и дальше статистика поддерживается инкрементально.
+    Версии из фикстур остаются с недостоверной статистикой до её пересчёта.
+    """
+    if not raw and instance._state.adding:
+        instance.stats_valid = True
+
+
+@receiver(post_save, sender=HandbookVersion)
+def update_stats_on_version_save(
+    sender, instance: HandbookVersion, raw, **kwargs
+) -> None:
+    """
+    Обновляет статистику справочника после сохранения версии.
+    """
+    if not raw:
+        refresh_handbook_stats(instance.handbook_id)
+
+
+@receiver(post_delete, sender=HandbookVersion)
+def update_stats_on_version_delete(
+    sender, instance: HandbookVersion, origin=None, **kwargs
+) -> None:
+    """
+    Обновляет статистику справочника после удаления версии.
+    """
+    if _is_own_deletion(instance, origin):
+        refresh_handbook_stats(instance.handbook_id)
+
+
+@receiver(post_save, sender=HandbookElementTranslation)
+def touch_version_on_translation_save(
+    sender, instance: HandbookElementTranslation, raw, **kwargs
+) -> None:
+    """
+    Обновляет время изменения версии после изменения перевода,
+    чтобы сбросить закэшированные ответы с элементами версии.
+    """
+    if not raw:
+        touch_version(instance.element.version_id)
+
+
+@receiver(post_save, sender=Handbook)
+@receiver(post_save, sender=HandbookVersion)
+@receiver(post_save, sender=HandbookElement)
+@receiver(post_save, sender=HandbookElementTranslation)
+def record_save(sender, instance, created, raw, **kwargs) -> None:
+    """
+    Записывает создание или изменение объекта в журнал изменений.
+    """
+    if not raw:
+        action = (
+            HandbookChange.Action.CREATED if created else HandbookChange.Action.UPDATED
+        )
+        record_change(instance, action)
+
+
+@receiver(post_delete, sender=Handbook)
+@receiver(post_delete, sender=HandbookVersion)
+def record_delete(sender, instance, origin=None, **kwargs) -> None:
+    """
+    Записывает удаление объекта в журнал изменений.
+    При каскадном удалении записывается только удаление родительского объекта,
+    реплики удаляют дочерние объекты сами. Удаление элементов и переводов
+    записывается модулем deletion.
+    """
+    if _is_own_deletion(instance, origin):
+        record_change(instance, HandbookChange.Action.DELETED)
@@ -0,0 +1,173 @@
+"""
+Инкрементальное обновление статистики версий и справочников.
+
+Хеш содержимого версии — сумма SHA-256 хешей элементов (код, значение,
+код родителя) по модулю 2**256. Такой хеш не зависит от порядка элементов
+и пересчитывается при добавлении или удалении элемента без чтения остальных
+элементов версии.
+
+Статистика версии, которую не пересчитывали полностью (например, загруженной
+из фикстур или существовавшей до изменения формулы хеша), не считается
+достоверной: признак stats_valid устанавливается при создании версии
+и при полном пересчёте командой refresh_handbook_stats.
+"""
+
+from hashlib import sha256
+from typing import Iterable, Tuple
+
+from django.db import transaction
+from django.utils import timezone
+
+from .models import EMPTY_CONTENT_HASH, Handbook, HandbookVersion
+
+HASH_MODULUS = 2**256
+
+# Код, значение и код родителя элемента.
+ElementState = Tuple[str, str, str]
+
+
+def element_digest(code: str, value: str, parent_code: str = "") -> int:
+    """
+    Вычисляет хеш одного элемента справочника.
+
+    :param code: Код элемента.
+    :param value: Значение элемента.
+    :param parent_code: Код родительского элемента.
+    :return: Хеш элемента в виде целого числа.
+    """
+    data = f"{code}\x1f{value}\x1f{parent_code}".encode()
+    return int.from_bytes(sha256(data).digest(), "big")
+
+
+def combine_hash(
+    content_hash: str,
+    added: Iterable[ElementState] = (),
+    removed: Iterable[ElementState] = (),
+) -> str:
+    """
+    Применяет добавленные и удалённые элементы к хешу содержимого.
+
+    :param content_hash: Текущий хеш содержимого в шестнадцатеричном виде.
+    :param added: Добавленные элементы (код, значение, код родителя).
+    :param removed: Удалённые элементы (код, значение, код родителя).
+    :return: Новый хеш содержимого.
+    """
+    total = int(content_hash or EMPTY_CONTENT_HASH, 16)
+    for element in added:
+        total += element_digest(*element)
+    for element in removed:
+        total -= element_digest(*element)
+    return format(total % HASH_MODULUS, "064x")
+
+
+def apply_element_changes(
+    version_id: int,
+    added: Iterable[ElementState] = (),
+    removed: Iterable[ElementState] = (),
+) -> None:
+    """
+    Инкрементально обновляет статистику версии и её справочника.
+    Используется сигналами, а также массовыми операциями,
+    которые знают, какие элементы были добавлены или удалены.
+    Недостоверная статистика остаётся недостоверной.
+
+    :param version_id: Идентификатор версии.
+    :param added: Добавленные элементы (код, значение, код родителя).
+    :param removed: Удалённые элементы (код, значение, код родителя).
+    """
+    added, removed = list(added), list(removed)
+    with transaction.atomic():
+        version = (
+            HandbookVersion.objects.select_for_update()
+            .filter(pk=version_id)
+            .only("handbook_id", "element_count", "content_hash")
+            .first()
+        )
+        if version is None:
+            return
+        HandbookVersion.objects.filter(pk=version_id).update(
+            element_count=version.element_count + len(added) - len(removed),
+            content_hash=combine_hash(version.content_hash, added, removed),
+            modified_at=timezone.now(),
+        )
+        refresh_handbook_stats(version.handbook_id)
+
+
+def touch_version(version_id: int) -> None:
+    """
+    Обновляет время изменения версии и её справочника без пересчёта хеша.
+    Используется при изменениях, которые не входят в хеш содержимого,
+    например при изменении переводов значений элементов.
+
+    :param version_id: Идентификатор версии.
+    """
+    handbook_id = (
+        HandbookVersion.objects.filter(pk=version_id)
+        .values_list("handbook_id", flat=True)
+        .first()
+    )
+    if handbook_id is None:
+        return
+    HandbookVersion.objects.filter(pk=version_id).update(modified_at=timezone.now())
+    refresh_handbook_stats(handbook_id)
+
+
+def recompute_version_stats(version: HandbookVersion) -> None:
+    """
+    Полностью пересчитывает статистику версии по её элементам
+    и помечает её достоверной.
+    Нужен после массовых операций, которые не отправляют сигналы
+    (bulk_create, bulk_update, QuerySet.update).
+
+    :param version: Объект версии справочника.
+    """
+    elements = version.elements.values_list("code", "value", "parent_code")
+    count, content_hash = 0, EMPTY_CONTENT_HASH
+    for chunk in chunked(elements.iterator(), 10000):
+        count += len(chunk)
+        content_hash = combine_hash(content_hash, added=chunk)
+    with transaction.atomic():
+        HandbookVersion.objects.filter(pk=version.pk).update(
+            element_count=count,
+            content_hash=content_hash,
+            stats_valid=True,
+            modified_at=timezone.now(),
+        )
+        refresh_handbook_stats(version.handbook_id)
+
+
+def refresh_handbook_stats(handbook_id: int) -> None:
+    """
+    Пересчитывает статистику справочника по статистике его опубликованных версий.
+    Элементы при этом не читаются, только строки версий.
+
+    :param handbook_id: Идентификатор справочника.
+    """
+    versions = (
+        HandbookVersion.objects.published()
+        .filter(handbook_id=handbook_id)
+        .values_list("version", "element_count", "content_hash")
+    )
+    count, total = 0, 0
+    for version, element_count, content_hash in versions:
+        count += element_count
+        total += element_digest(version, content_hash)
+    Handbook.objects.filter(pk=handbook_id).update(
+        element_count=count,
+        content_hash=format(total % HASH_MODULUS, "064x"),
+        modified_at=timezone.now(),
+    )
+
+
+def chunked(iterable: Iterable, size: int) -> Iterable[list]:
+    """
+    Разбивает итерируемый объект на списки заданного размера.
+    """
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
@@ -0,0 +1,154 @@
+"""
+Потоковая выдача списка справочников вместе с элементами текущих версий
+(параметр include=current_elements списка справочников).
+
+Текущие версии всех справочников определяются тем же запросом, что и список
+(with_current_version), а элементы всех этих версий загружаются одним
+запросом, упорядоченным по справочнику, и группируются на лету.
+Ответ формируется частями, поэтому список целиком не собирается в памяти.
+"""
+
+from itertools import groupby
+from operator import attrgetter, itemgetter
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+
+from django.db.models import Count
+
+from .models import Handbook, HandbookElement
+from .payloads import localize_rows
+from .renderers import ElementRowsRenderer
+from .routers import read_from_replica
+
+# Количество элементов в одной части потокового ответа.
+STREAM_CHUNK_ELEMENTS = 1000
+
+dumps = ElementRowsRenderer.dumps
+
+
+class ReleasingStream:
+    """
+    Тело потокового ответа, которое вызывает функцию освобождения ресурсов
+    после выдачи последней части или при закрытии ответа.
+    """
+
+    def __init__(self, chunks: Iterator[bytes], release: Callable[[], None]) -> None:
+        self.chunks = chunks
+        self.release = release
+
+    def __iter__(self) -> Iterator[bytes]:
+        try:
+            yield from self.chunks
+        finally:
+            self.release()
+
+    def close(self) -> None:
+        """
+        Закрывает тело ответа. Вызывается сервером по окончании запроса.
+        """
+        close = getattr(self.chunks, "close", None)
+        if close is not None:
+            close()
+        self.release()
+
+
+def stream_elements(rows: Iterable[tuple]) -> Iterator[bytes]:
+    """
+    Выдаёт элементы одной версии частями JSON-массива (без скобок).
+
+    :param rows: Кортежи (справочник, код, значение).
+    :return: Итератор частей ответа.
+    """
+    separator = ""
+    parts: List[str] = []
+    for _, code, value in rows:
+        parts.append(dumps({"code": code, "value": value}))
+        if len(parts) >= STREAM_CHUNK_ELEMENTS:
+            yield (separator + ",".join(parts)).encode()
+            separator, parts = ",", []
+    if parts:
+        yield (separator + ",".join(parts)).encode()
+
+
+def count_current_elements(handbooks: List[Handbook]) -> int:
+    """
+    Считает элементы текущих версий справочников одним запросом с группировкой
+    по версии и сохраняет количество в current_version_element_count.
+    Статистика версий для этого не используется: она может быть
+    не пересчитана после загрузки фикстур.
+
+    :param handbooks: Справочники, аннотированные with_current_version.
+    :return: Общее количество элементов.
+    """
+    version_ids = [
+        handbook.current_version_id
+        for handbook in handbooks
+        if handbook.current_version_id is not None
+    ]
+    counts = dict(
+        HandbookElement.objects.filter(version_id__in=version_ids)
+        .order_by()
+        .values("version_id")
+        .annotate(count=Count("pk"))
+        .values_list("version_id", "count")
+    )
+    for handbook in handbooks:
+        if handbook.current_version_id is not None:
+            handbook.current_version_element_count = counts.get(
+                handbook.current_version_id, 0
+            )
+    return sum(counts.values())
+
+
+def get_current_version_data(handbook: Handbook) -> Optional[Dict]:
+    """
+    Получить описание текущей версии из аннотаций with_current_version.
+    """
+    if handbook.current_version_id is None:
+        return None
+    return {
+        "version": handbook.current_version_value,
+        "start_date": handbook.current_version_start_date.isoformat(),
+        "element_count": handbook.current_version_element_count,
+    }
+
+
+def stream_current_elements(
+    handbooks: List[Handbook],
+    serialize: Callable[[Handbook], Dict],
+    language: str,
+) -> Iterator[bytes]:
+    """
+    Выдаёт список справочников с текущими версиями и их элементами
+    в виде {"refbooks": [{..., "current_version": {...}, "elements": [...]}]}.
+
+    :param handbooks: Справочники, аннотированные with_current_version.
+    :param serialize: Функция, сериализующая справочник.
+    :param language: Код языка значений элементов.
+    :return: Итератор частей ответа.
+    """
+    handbooks = sorted(handbooks, key=attrgetter("pk"))
+    version_ids = [
+        handbook.current_version_id
+        for handbook in handbooks
+        if handbook.current_version_id is not None
+    ]
+    elements = HandbookElement.objects.filter(version_id__in=version_ids).order_by(
+        "version__handbook_id", "pk"
+    )
+    yield b'{"refbooks":['
+    with read_from_replica():
+        rows = localize_rows(elements, language, "version__handbook_id")
+        groups = groupby(
+            rows.iterator(chunk_size=STREAM_CHUNK_ELEMENTS), key=itemgetter(0)
+        )
+        group = next(groups, None)
+        for index, handbook in enumerate(handbooks):
+            data = dict(serialize(handbook))
+            data["current_version"] = get_current_version_data(handbook)
+            head = dumps(data)[:-1]
+            yield f'{"," if index else ""}{head},"elements":['.encode()
+            if group is not None and group[0] == handbook.pk:
+                yield from stream_elements(group[1])
+                group = next(groups, None)
+            yield b"]}"
+    yield b"]}"
@@ -0,0 +1,85 @@
+from datetime import date
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from ..models import Handbook, HandbookElement, HandbookVersion
+
+
+class HandbookAdminTests(TestCase):
+    """
+    Тест-кейсы для списков и форм справочников в админке.
+    """
+
+    fixtures = ["test_data.json"]
+
+    def setUp(self) -> None:
+        """
+        Авторизует суперпользователя для доступа к админке.
+        """
+        self.user = User.objects.create_superuser("admin", "admin@example.com", "pw")
+        self.client.force_login(self.user)
+
+    def count_queries(self, url: str) -> int:
+        """
+        Выполняет GET-запрос и возвращает количество SQL-запросов.
+        """
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(context.captured_queries)
+
+    def add_handbooks(self, count: int) -> None:
+        """
+        Создаёт справочники с версией и элементом для проверки числа запросов.
+        """
+        for index in range(count):
+            handbook = Handbook.objects.create(code=f"HB{index}", name=f"HB {index}")
+            version = HandbookVersion.objects.create(
+                handbook=handbook, version="1", start_date=date(2020, 1, 1)
+            )
+            HandbookElement.objects.create(version=version, code="C", value="V")
+
+    def test_changelists_do_not_query_per_row(self) -> None:
+        """
+        Тестирует, что количество запросов в списках не зависит от числа строк.
+        """
+        urls = [
+            reverse("admin:handbook_handbook_changelist"),
+            reverse("admin:handbook_handbookversion_changelist"),
+            reverse("admin:handbook_handbookelement_changelist"),
+        ]
+        before = [self.count_queries(url) for url in urls]
+        self.add_handbooks(5)
+        after = [self.count_queries(url) for url in urls]
+        self.assertEqual(before, after)
+
+    def test_handbook_changelist_shows_current_version(self) -> None:
+        """
+        Тестирует вывод текущей версии, вычисленной аннотацией.
+        """
+        response = self.client.get(reverse("admin:handbook_handbook_changelist"))
+        self.assertContains(response, '<td class="field-current_version">2023</td>')
+
+    def test_element_inline_is_paginated(self) -> None:
+        """
+        Тестирует, что встраиваемые элементы версии выводятся постранично,
+        в том числе если статистика версии не пересчитывалась.
+        """
+        HandbookElement.objects.bulk_create(
+            HandbookElement(version_id=1, code=f"X{index:03}", value="V")
+            for index in range(120)
+        )
+        url = reverse("admin:handbook_handbookversion_change", args=[1])
+
+        response = self.client.get(url)
+        formset = response.context["inline_admin_formsets"][0].formset
+        self.assertEqual(formset.initial_form_count(), 50)
+        self.assertContains(response, "?elements_page=3")
+
+        response = self.client.get(url, {"elements_page": 3})
+        formset = response.context["inline_admin_formsets"][0].formset
+        self.assertEqual(formset.initial_form_count(), 123 - 100)
@@ -0,0 +1,79 @@
+import json
+import tempfile
+from io import StringIO
+from pathlib import Path
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from ..analytics import stop_analytics
+
+
+class RequestAnalyticsTests(TestCase):
+    """
+    Тест-кейсы для журнала аналитики запросов и отчёта hot_handbooks.
+    """
+
+    fixtures = ["test_data.json"]
+
+    def setUp(self) -> None:
+        """
+        Подготавливает клиент API и временный файл журнала.
+        """
+        cache.clear()
+        self.client = APIClient()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.log = Path(directory.name) / "analytics.jsonl"
+
+    def test_sampled_requests_are_logged_and_reported(self) -> None:
+        """
+        Тестирует запись запросов в журнал и построение отчёта по нему.
+        """
+        with override_settings(
+            HANDBOOK_ANALYTICS_SAMPLE_RATE=1.0, HANDBOOK_ANALYTICS_LOG=self.log
+        ):
+            for _ in range(2):
+                response = self.client.get(reverse("refbook-elements", args=[1]))
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.client.get(
+                reverse("refbook-check-element", args=[1]),
+                {"code": "A00", "value": "Холера"},
+            )
+            self.client.get(reverse("refbook-list"))
+            stop_analytics()
+
+        records = [json.loads(line) for line in self.log.read_text().splitlines()]
+        self.assertEqual(len(records), 4)
+        record = records[0]
+        self.assertEqual(record["handbook_code"], "ICD10")
+        self.assertEqual(record["version"], "2023")
+        self.assertEqual(record["action"], "elements")
+        self.assertEqual(record["elements"], 3)
+        self.assertEqual(records[2]["elements"], 0)
+        self.assertEqual(record["bytes"], len(response.content))
+        self.assertGreater(record["db_ms"], 0)
+        self.assertGreaterEqual(record["total_ms"], record["db_ms"])
+
+        out = StringIO()
+        call_command(
+            "hot_handbooks", "--log", str(self.log), "--by", "bytes", stdout=out
+        )
+        lines = out.getvalue().splitlines()
+        self.assertEqual(len(lines), 2)
+        self.assertTrue(lines[1].startswith("ICD10"))
+        self.assertEqual(lines[1].split()[-1], "6")
+
+    def test_unsampled_requests_are_not_logged(self) -> None:
+        """
+        Тестирует, что при нулевой доле выборки журнал не пишется.
+        """
+        with override_settings(
+            HANDBOOK_ANALYTICS_SAMPLE_RATE=0, HANDBOOK_ANALYTICS_LOG=self.log
+        ):
+            self.client.get(reverse("refbook-elements", args=[1]))
+        self.assertFalse(self.log.exists())
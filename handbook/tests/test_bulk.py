@@ -0,0 +1,190 @@
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from ..models import Handbook, HandbookChange, HandbookVersion
+from ..stats import recompute_version_stats
+
+
+class HandbookBulkWriteTests(TestCase):
+    """
+    Тест-кейсы для загрузки версий справочника черновиком и их публикации.
+    """
+
+    fixtures = ["test_data.json"]
+
+    def setUp(self) -> None:
+        """
+        Подготавливает клиент API с правами администратора.
+        """
+        self.client = APIClient()
+        self.admin = User.objects.create_superuser("admin", password="admin")
+        self.client.force_authenticate(self.admin)
+
+    def create_draft(self, version: str = "2024") -> None:
+        """
+        Создаёт черновик версии справочника 2.
+        """
+        response = self.client.post(
+            reverse("refbook-create-version", args=[2]),
+            {"version": version, "start_date": "2024-01-01"},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.json()["status"], "draft")
+
+    def upload(self, elements: list, version: str = "2024"):
+        """
+        Загружает пакет элементов в черновик версии справочника 2.
+        """
+        return self.client.post(
+            reverse("refbook-upload-elements", args=[2, version]),
+            {"elements": elements},
+            format="json",
+        )
+
+    def get_current_version(self) -> str:
+        """
+        Получает текущую версию справочника 2.
+        """
+        return Handbook.objects.get(pk=2).get_current_version()
+
+    def test_draft_is_hidden_until_published(self) -> None:
+        """
+        Тестирует, что черновик не виден читателям, а после публикации
+        становится текущей версией со статистикой, посчитанной по пакетам.
+        """
+        self.create_draft()
+        response = self.upload([{"code": "PARA", "value": "500"}])
+        self.assertEqual(response.json(), {"element_count": 1})
+        response = self.upload(
+            [{"code": "PARA", "value": "1000"}, {"code": "IBU", "value": "200"}]
+        )
+        self.assertEqual(response.json(), {"element_count": 2})
+
+        self.assertEqual(self.get_current_version(), "2023")
+        response = self.client.get(
+            reverse("refbook-elements", args=[2]), {"version": "2024"}
+        )
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+        response = self.client.post(reverse("refbook-publish", args=[2, "2024"]))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()["status"], "published")
+        self.assertEqual(self.get_current_version(), "2024")
+
+        version = HandbookVersion.objects.get(handbook_id=2, version="2024")
+        content_hash = version.content_hash
+        recompute_version_stats(version)
+        version.refresh_from_db()
+        self.assertEqual(version.content_hash, content_hash)
+        self.assertEqual(
+            HandbookChange.objects.filter(kind="version").last().data["status"],
+            "published",
+        )
+
+    def test_uploads_are_recorded_in_change_feed(self) -> None:
+        """
+        Тестирует запись созданных и изменённых элементов пакетов
+        в журнал изменений и запись публикации версии.
+        """
+        self.create_draft()
+        self.upload([{"code": "PARA", "value": "500"}, {"code": "IBU", "value": "200"}])
+        self.upload(
+            [{"code": "PARA", "value": "1000"}, {"code": "IBU", "value": "200"}]
+        )
+        self.client.post(reverse("refbook-publish", args=[2, "2024"]))
+
+        changes = HandbookChange.objects.all()
+        self.assertEqual(
+            list(changes.values_list("kind", "action")),
+            [
+                ("version", "created"),
+                ("element", "created"),
+                ("element", "created"),
+                ("element", "updated"),
+                ("version", "updated"),
+            ],
+        )
+        draft = HandbookVersion.objects.get(handbook_id=2, version="2024")
+        element = draft.elements.get(code="PARA")
+        change = changes.get(kind="element", action="updated")
+        self.assertEqual((change.object_id, change.handbook_id), (element.pk, 2))
+        self.assertEqual(
+            change.data,
+            {
+                "version_id": draft.pk,
+                "code": "PARA",
+                "value": "1000",
+                "parent_code": "",
+            },
+        )
+
+    def test_dotted_version_label(self) -> None:
+        """
+        Тестирует загрузку и публикацию версии с точкой в номере.
+        """
+        self.create_draft("1.2")
+        response = self.upload([{"code": "PARA", "value": "500"}], version="1.2")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        response = self.client.post(reverse("refbook-publish", args=[2, "1.2"]))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()["version"], "1.2")
+
+    def test_published_version_is_read_only(self) -> None:
+        """
+        Тестирует, что в опубликованную версию нельзя загружать элементы.
+        """
+        self.create_draft()
+        self.client.post(reverse("refbook-publish", args=[2, "2024"]))
+        response = self.upload([{"code": "X", "value": "Y"}])
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.post(reverse("refbook-publish", args=[2, "2024"]))
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_duplicate_version_is_rejected(self) -> None:
+        """
+        Тестирует ошибку при создании версии с существующим номером.
+        """
+        response = self.client.post(
+            reverse("refbook-create-version", args=[2]),
+            {"version": "2023", "start_date": "2024-01-01"},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_write_requires_admin(self) -> None:
+        """
+        Тестирует, что загрузка версий недоступна без прав администратора.
+        """
+        self.client.force_authenticate(None)
+        response = self.client.post(
+            reverse("refbook-create-version", args=[2]),
+            {"version": "2024", "start_date": "2024-01-01"},
+            format="json",
+        )
+        self.assertIn(
+            response.status_code,
+            [status.HTTP_401_UNAUTHORIZED, status.HTTP_403_FORBIDDEN],
+        )
+
+    def test_publish_builds_tree_index(self) -> None:
+        """
+        Тестирует построение индекса иерархии при публикации версии.
+        """
+        self.create_draft()
+        self.upload(
+            [
+                {"code": "N02", "value": "Анальгетики"},
+                {"code": "PARA", "value": "Парацетамол", "parent_code": "N02"},
+            ]
+        )
+        self.client.post(reverse("refbook-publish", args=[2, "2024"]))
+        response = self.client.get(
+            reverse("refbook-ancestors", args=[2]), {"code": "PARA"}
+        )
+        self.assertEqual(
+            [element["code"] for element in response.json()["elements"]], ["N02"]
+        )
@@ -0,0 +1,119 @@
+from datetime import date, timedelta
+
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from ..models import Handbook, HandbookChange, HandbookElement, HandbookVersion
+
+
+class HandbookChangeFeedTests(TestCase):
+    """
+    Тест-кейсы для журнала изменений и синхронизации по токену.
+    """
+
+    fixtures = ["test_data.json"]
+
+    def setUp(self) -> None:
+        """
+        Подготавливает клиент API для выполнения запросов.
+        """
+        self.client = APIClient()
+        self.url = reverse("change-list")
+
+    def test_writes_are_recorded(self) -> None:
+        """
+        Тестирует запись создания, изменения и удаления объектов в журнал.
+        """
+        handbook = Handbook.objects.create(code="NEW", name="Новый")
+        version = HandbookVersion.objects.create(
+            handbook=handbook, version="1", start_date=date(2024, 1, 1)
+        )
+        element = HandbookElement.objects.create(version=version, code="X", value="1")
+        element.value = "2"
+        element.save()
+        version.delete()
+
+        changes = list(HandbookChange.objects.values_list("kind", "action"))
+        self.assertEqual(
+            changes,
+            [
+                ("handbook", "created"),
+                ("version", "created"),
+                ("element", "created"),
+                ("element", "updated"),
+                ("version", "deleted"),
+            ],
+        )
+        element_change = HandbookChange.objects.get(kind="element", action="updated")
+        self.assertEqual(element_change.handbook_id, handbook.pk)
+        self.assertEqual(element_change.data["value"], "2")
+
+    def test_changes_since_token(self) -> None:
+        """
+        Тестирует постраничное получение изменений с возобновлением по токену.
+        """
+        for index in range(5):
+            HandbookElement.objects.create(version_id=1, code=f"N{index}", value="V")
+
+        response = self.client.get(self.url, {"limit": 3})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data["changes"]), 3)
+        self.assertTrue(response.data["has_more"])
+
+        token = response.data["next_token"]
+        response = self.client.get(self.url, {"since": token, "limit": 3})
+        self.assertEqual(len(response.data["changes"]), 2)
+        self.assertFalse(response.data["has_more"])
+        self.assertEqual(response.data["changes"][-1]["data"]["code"], "N4")
+
+        token = response.data["next_token"]
+        response = self.client.get(self.url, {"since": token})
+        self.assertEqual(response.data["changes"], [])
+        self.assertEqual(response.data["next_token"], token)
+
+    def test_invalid_token(self) -> None:
+        """
+        Тестирует ошибку 400 при некорректном токене.
+        """
+        response = self.client.get(self.url, {"since": "abc"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data["error"], "Invalid 'since' parameter.")
+        response = self.client.get(self.url, {"limit": "0"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data["error"], "Invalid 'limit' parameter.")
+
+    def test_changes_after_gap_wait_for_commit(self) -> None:
+        """
+        Тестирует, что изменения после свежего пропуска в токенах не выдаются,
+        пока пропуск может означать незафиксированную транзакцию.
+        """
+        for index in range(3):
+            HandbookElement.objects.create(version_id=1, code=f"N{index}", value="V")
+        first, missing, last = HandbookChange.objects.values_list("pk", flat=True)
+        HandbookChange.objects.filter(pk=missing).delete()
+
+        response = self.client.get(self.url)
+        self.assertEqual(
+            [change["token"] for change in response.data["changes"]], [str(first)]
+        )
+        self.assertEqual(response.data["next_token"], str(first))
+        self.assertFalse(response.data["has_more"])
+
+        HandbookChange.objects.filter(pk=last).update(
+            created_at=timezone.now() - timedelta(minutes=5)
+        )
+        response = self.client.get(self.url, {"since": first})
+        self.assertEqual(response.data["next_token"], str(last))
+
+    def test_version_with_string_date(self) -> None:
+        """
+        Тестирует запись версии, дата которой передана строкой.
+        """
+        HandbookVersion.objects.create(
+            handbook_id=1, version="2000", start_date="2000-01-01"
+        )
+        change = HandbookChange.objects.get(kind="version")
+        self.assertEqual(change.data["start_date"], "2000-01-01")
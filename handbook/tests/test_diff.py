@@ -0,0 +1,352 @@
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from .. import bulk
+from ..diff import diff_versions
+from ..jobs import run_job
+from ..models import (
+    HandbookChange,
+    HandbookElementTranslation,
+    HandbookJob,
+    HandbookVersion,
+)
+from ..stats import recompute_version_stats
+from ..timeline import clear_timelines
+
+
+class HandbookVersionDiffTests(TestCase):
+    """
+    Тест-кейсы для создания черновиков копией базовой версии
+    и сравнения версий по хешу содержимого.
+    """
+
+    fixtures = ["test_data.json"]
+
+    def setUp(self) -> None:
+        """
+        Пересчитывает статистику версий и подготавливает клиент API
+        с правами администратора.
+        """
+        cache.clear()
+        clear_timelines()
+        call_command("refresh_handbook_stats", stdout=StringIO())
+        self.client = APIClient()
+        self.admin = User.objects.create_superuser("admin", password="admin")
+        self.client.force_authenticate(self.admin)
+
+    def create_draft(self, base_version: str = "2023", copy: bool = True) -> dict:
+        """
+        Создаёт черновик версии 2024 справочника 2 копией базовой версии
+        и выполняет задачу копирования элементов.
+        """
+        response = self.client.post(
+            reverse("refbook-create-version", args=[2]),
+            {
+                "version": "2024",
+                "start_date": "2024-01-01",
+                "base_version": base_version,
+            },
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        data = response.json()
+        self.assertEqual(HandbookJob.objects.get(pk=data["job"]).kind, "copy_elements")
+        if copy:
+            self.assertEqual(run_job(data["job"]), HandbookJob.Status.SUCCEEDED)
+        return data
+
+    def publish(self) -> None:
+        """
+        Публикует черновик версии 2024 справочника 2.
+        """
+        response = self.client.post(reverse("refbook-publish", args=[2, "2024"]))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_copy_base_version(self) -> None:
+        """
+        Тестирует копирование элементов и переводов базовой версии
+        фоновой задачей с переносом статистики без пересчёта.
+        """
+        HandbookElementTranslation.objects.create(
+            element_id=9, language="en", value="Paracetamol 1000 mg"
+        )
+        job_id = self.create_draft()["job"]
+        self.assertEqual(HandbookJob.objects.get(pk=job_id).result, {"copied": 2})
+        base = HandbookVersion.objects.get(pk=4)
+        draft = HandbookVersion.objects.get(handbook_id=2, version="2024")
+        self.assertEqual(draft.element_count, 2)
+        self.assertEqual(
+            sorted(draft.elements.values_list("code", "value")),
+            sorted(base.elements.values_list("code", "value")),
+        )
+        self.assertEqual(draft.content_hash, base.content_hash)
+        recompute_version_stats(draft)
+        draft.refresh_from_db()
+        self.assertEqual(draft.content_hash, base.content_hash)
+        self.assertEqual(
+            HandbookElementTranslation.objects.get(element__version=draft).value,
+            "Paracetamol 1000 mg",
+        )
+
+    def test_copy_commits_chunks_and_resumes(self) -> None:
+        """
+        Тестирует, что пакеты копии фиксируются по отдельности,
+        а прерванное копирование продолжается без повторов.
+        """
+        calls = []
+
+        def fail_second_chunk(*args) -> None:
+            if calls:
+                raise RuntimeError("boom")
+            calls.append(args)
+            copy_chunk(*args)
+
+        copy_chunk = bulk.copy_chunk
+        with mock.patch.object(bulk, "MAX_CHUNK_SIZE", 1):
+            job_id = self.create_draft(copy=False)["job"]
+            with mock.patch.object(bulk, "copy_chunk", fail_second_chunk):
+                self.assertEqual(run_job(job_id), HandbookJob.Status.FAILED)
+            draft = HandbookVersion.objects.get(handbook_id=2, version="2024")
+            self.assertEqual(draft.elements.count(), 1)
+
+            HandbookJob.objects.filter(pk=job_id).update(
+                status=HandbookJob.Status.PENDING
+            )
+            self.assertEqual(run_job(job_id), HandbookJob.Status.SUCCEEDED)
+        self.assertEqual(HandbookJob.objects.get(pk=job_id).result, {"copied": 1})
+        base = HandbookVersion.objects.get(pk=4)
+        draft.refresh_from_db()
+        self.assertEqual(
+            sorted(draft.elements.values_list("code", "value")),
+            sorted(base.elements.values_list("code", "value")),
+        )
+        self.assertEqual(
+            (draft.element_count, draft.content_hash),
+            (base.element_count, base.content_hash),
+        )
+        self.assertEqual(
+            HandbookChange.objects.filter(
+                kind=HandbookChange.Kind.ELEMENT, object_id__in=draft.elements.all()
+            ).count(),
+            2,
+        )
+
+    def test_unknown_base_version(self) -> None:
+        """
+        Тестирует, что черновик не создаётся от несуществующей базовой версии.
+        """
+        response = self.client.post(
+            reverse("refbook-create-version", args=[2]),
+            {"version": "2024", "start_date": "2024-01-01", "base_version": "1999"},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertFalse(HandbookVersion.objects.filter(version="2024").exists())
+
+    def test_changed_upload_and_diff(self) -> None:
+        """
+        Тестирует загрузку только изменённых элементов в копию базовой
+        версии и сравнение опубликованной версии с базовой.
+        """
+        self.create_draft()
+        HandbookElementTranslation.objects.create(
+            element=HandbookVersion.objects.get(version="2024").elements.get(
+                code="AMOX"
+            ),
+            language="en",
+            value="Amoxicillin",
+        )
+        response = self.client.post(
+            reverse("refbook-upload-elements", args=[2, "2024"]),
+            {
+                "removed": ["AMOX"],
+                "elements": [
+                    {"code": "PARA", "value": "Парацетамол 500 мг"},
+                    {"code": "IBU", "value": "Ибупрофен 400 мг"},
+                ],
+            },
+            format="json",
+        )
+        self.assertEqual(response.json(), {"element_count": 2})
+        self.assertFalse(
+            HandbookElementTranslation.objects.filter(value="Amoxicillin").exists()
+        )
+        self.publish()
+
+        response = self.client.get(reverse("refbook-diff", args=[2]), {"from": "2023"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response.json(),
+            {
+                "from": "2023",
+                "to": "2024",
+                "identical": False,
+                "added": [{"code": "IBU", "value": "Ибупрофен 400 мг"}],
+                "removed": [{"code": "AMOX", "value": "Амоксициллин 875 мг"}],
+                "changed": [
+                    {
+                        "code": "PARA",
+                        "previous_value": "Парацетамол 1000 мг",
+                        "value": "Парацетамол 500 мг",
+                        "previous_parent_code": "",
+                        "parent_code": "",
+                    }
+                ],
+            },
+        )
+
+    def test_identical_versions_compared_by_hash(self) -> None:
+        """
+        Тестирует, что совпадающие версии сравниваются без чтения элементов.
+        """
+        self.create_draft()
+        self.publish()
+        base = HandbookVersion.objects.get(pk=4)
+        target = HandbookVersion.objects.get(handbook_id=2, version="2024")
+        with self.assertNumQueries(0):
+            self.assertTrue(diff_versions(base, target).identical)
+
+    def test_parent_change_is_reported(self) -> None:
+        """
+        Тестирует, что версии, различающиеся только иерархией элементов,
+        не считаются совпадающими.
+        """
+        self.create_draft()
+        self.client.post(
+            reverse("refbook-upload-elements", args=[2, "2024"]),
+            {
+                "elements": [
+                    {
+                        "code": "AMOX",
+                        "value": "Амоксициллин 875 мг",
+                        "parent_code": "PARA",
+                    }
+                ]
+            },
+            format="json",
+        )
+        self.publish()
+        base = HandbookVersion.objects.get(pk=4)
+        target = HandbookVersion.objects.get(handbook_id=2, version="2024")
+        self.assertNotEqual(base.content_hash, target.content_hash)
+        self.assertEqual(
+            diff_versions(base, target).changed,
+            [("AMOX", "Амоксициллин 875 мг", "Амоксициллин 875 мг", "", "PARA")],
+        )
+
+    def test_stale_stats_are_not_trusted(self) -> None:
+        """
+        Тестирует, что версии, статистика которых не пересчитывалась,
+        сравниваются по элементам, а не по хешу.
+        """
+        HandbookVersion.objects.update(
+            element_count=0, content_hash="0" * 64, stats_valid=False
+        )
+        clear_timelines()
+        response = self.client.get(
+            reverse("refbook-diff", args=[1]), {"from": "2022", "to": "2023"}
+        )
+        data = response.json()
+        self.assertFalse(data["identical"])
+        self.assertTrue(data["added"] or data["removed"] or data["changed"])
+
+    def test_diff_parameters(self) -> None:
+        """
+        Тестирует ошибки при отсутствующей или неизвестной версии
+        и при пустом пакете загрузки.
+        """
+        url = reverse("refbook-diff", args=[2])
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.get(url, {"from": "2021", "to": "1999"})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.create_draft()
+        response = self.client.post(
+            reverse("refbook-upload-elements", args=[2, "2024"]),
+            {"elements": [], "removed": []},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_draft_is_locked_while_copying(self) -> None:
+        """
+        Тестирует, что загрузка и публикация черновика отклоняются,
+        пока в него копируются элементы базовой версии.
+        """
+        job_id = self.create_draft(copy=False)["job"]
+        url = reverse("refbook-upload-elements", args=[2, "2024"])
+        chunk = {"elements": [{"code": "IBU", "value": "Ибупрофен 400 мг"}]}
+        response = self.client.post(url, chunk, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            response.json(), {"error": "Version '2024' is still being copied."}
+        )
+        response = self.client.post(reverse("refbook-publish", args=[2, "2024"]))
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        self.assertEqual(run_job(job_id), HandbookJob.Status.SUCCEEDED)
+        response = self.client.post(url, chunk, format="json")
+        self.assertEqual(response.json(), {"element_count": 3})
+
+    def test_copy_and_removal_are_recorded_in_change_feed(self) -> None:
+        """
+        Тестирует записи журнала изменений о скопированных элементах
+        и переводах и об удалённых элементах черновика.
+        """
+        HandbookElementTranslation.objects.create(
+            element_id=9, language="en", value="Paracetamol 1000 mg"
+        )
+        HandbookChange.objects.all().delete()
+        self.create_draft()
+        draft = HandbookVersion.objects.get(handbook_id=2, version="2024")
+        created = HandbookChange.objects.filter(action=HandbookChange.Action.CREATED)
+        self.assertEqual(
+            sorted(
+                created.filter(kind=HandbookChange.Kind.ELEMENT).values_list(
+                    "object_id", flat=True
+                )
+            ),
+            sorted(draft.elements.values_list("pk", flat=True)),
+        )
+        translation = created.get(kind=HandbookChange.Kind.TRANSLATION)
+        self.assertEqual(translation.handbook_id, 2)
+        self.assertEqual(translation.data["value"], "Paracetamol 1000 mg")
+
+        self.client.post(
+            reverse("refbook-upload-elements", args=[2, "2024"]),
+            {"removed": ["AMOX"]},
+            format="json",
+        )
+        deleted = HandbookChange.objects.get(action=HandbookChange.Action.DELETED)
+        self.assertEqual(deleted.kind, HandbookChange.Kind.ELEMENT)
+        self.assertEqual(deleted.handbook_id, 2)
+        self.assertEqual(deleted.data["code"], "AMOX")
+
+    def test_upload_is_atomic(self) -> None:
+        """
+        Тестирует, что удаление кодов из removed откатывается,
+        если загрузка элементов того же пакета не удалась.
+        """
+        self.create_draft()
+        with mock.patch(
+            "handbook.views.upsert_elements", side_effect=RuntimeError("boom")
+        ):
+            with self.assertRaises(RuntimeError):
+                self.client.post(
+                    reverse("refbook-upload-elements", args=[2, "2024"]),
+                    {
+                        "removed": ["AMOX"],
+                        "elements": [{"code": "IBU", "value": "Ибупрофен 400 мг"}],
+                    },
+                    format="json",
+                )
+        draft = HandbookVersion.objects.get(handbook_id=2, version="2024")
+        self.assertEqual(draft.element_count, 2)
+        self.assertTrue(draft.elements.filter(code="AMOX").exists())
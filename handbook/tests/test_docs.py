@@ -0,0 +1,80 @@
+import subprocess
+import sys
+from io import StringIO
+
+from django.conf import settings
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+
+
+class SwaggerDocsTests(TestCase):
+    """
+    Тест-кейсы для документации Swagger.
+    """
+
+    def test_schema_contains_lazy_operations(self) -> None:
+        """
+        Тестирует, что отложенные схемы операций попадают в документ OpenAPI,
+        а исключённые методы в нём отсутствуют.
+        """
+        response = self.client.get(reverse("schema-swagger-ui"), {"format": "openapi"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        operations = {
+            operation["operationId"]
+            for path in response.json()["paths"].values()
+            for operation in path.values()
+            if isinstance(operation, dict) and "operationId" in operation
+        }
+        self.assertIn("list_handbooks", operations)
+        self.assertIn("check_element_exists", operations)
+        self.assertNotIn("refbooks_read", operations)
+
+    def test_prerendered_document_with_etag(self) -> None:
+        """
+        Тестирует отдачу готового документа OpenAPI с ETag и ответ 304.
+        """
+        url = reverse("schema-openapi")
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn("/refbooks/", response.json()["paths"])
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_swagger_ui_uses_prerendered_document(self) -> None:
+        """
+        Тестирует, что Swagger UI загружает готовый документ.
+        """
+        response = self.client.get(reverse("schema-swagger-ui"))
+        self.assertContains(response, reverse("schema-openapi"))
+
+    def test_saved_document_matches_schemas(self) -> None:
+        """
+        Тестирует, что сохранённый документ OpenAPI совпадает
+        с текущими схемами операций.
+        """
+        call_command("generate_openapi", "--check", stdout=StringIO())
+
+    def test_api_only_profile_skips_docs_and_admin(self) -> None:
+        """
+        Тестирует, что в профиле API_ONLY не загружаются drf_yasg и админка,
+        а маршруты документации и админки не подключаются.
+        """
+        code = (
+            "import sys, django; django.setup();"
+            "from django.urls import get_resolver;"
+            "resolver = get_resolver(); names = resolver.reverse_dict.keys();"
+            "print('drf_yasg' in sys.modules, 'refbook-list' in names,"
+            " 'schema-swagger-ui' in names, 'admin' in resolver.namespace_dict)"
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", code],
+            cwd=settings.BASE_DIR,
+            env={"API_ONLY": "1", "DJANGO_SETTINGS_MODULE": "terminology_api.settings"},
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        self.assertEqual(result.stdout.split(), ["False", "True", "False", "False"])
@@ -0,0 +1,146 @@
+import tempfile
+from datetime import date
+from pathlib import Path
+
+from django.test import TestCase, override_settings
+
+from ..importers import get_limits, import_elements, validate_chunk
+from ..jobs import enqueue_job, run_job
+from ..models import HandbookChange, HandbookJob, HandbookVersion
+
+
+class ElementImportTests(TestCase):
+    """
+    Тест-кейсы для параллельного импорта элементов из CSV.
+    """
+
+    fixtures = ["test_data.json"]
+
+    def setUp(self) -> None:
+        """
+        Создаёт черновик версии и временный каталог для файлов импорта.
+        """
+        self.draft = HandbookVersion.objects.create(
+            handbook_id=2,
+            version="2024",
+            start_date=date(2024, 1, 1),
+            status=HandbookVersion.Status.DRAFT,
+        )
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = Path(directory.name)
+
+    def write_file(self, text: str) -> Path:
+        """
+        Записывает файл импорта во временный каталог.
+        """
+        path = self.directory / "elements.csv"
+        path.write_text(text, encoding="utf-8")
+        return path
+
+    def test_validate_chunk(self) -> None:
+        """
+        Тестирует проверку записей пакета с номерами строк в ошибках.
+        """
+        records = [
+            (10, ["A1", "Первый"]),
+            (11, ["A2"]),
+            (12, ["", "Пусто"]),
+            (13, ["A1", "Повтор"]),
+            (14, ["X" * 101, "Длинный код"]),
+            (15, ["B1", "Второй", "A1"]),
+        ]
+        rows, errors = validate_chunk(records, get_limits())
+        self.assertEqual(rows, [(10, "A1", "Первый", ""), (15, "B1", "Второй", "A1")])
+        self.assertEqual(
+            [(error.row, error.message) for error in errors],
+            [
+                (11, "Expected 2 or 3 columns, got 1."),
+                (12, "Code is empty."),
+                (13, "Duplicate code, first seen in row 10."),
+                (14, "Column 'code' is longer than 100 characters."),
+            ],
+        )
+
+    def test_import_in_order_across_chunks(self) -> None:
+        """
+        Тестирует запись пакетов по порядку и поиск повторов между пакетами.
+        """
+        path = self.write_file(
+            "code,value,parent_code\nA,Корень\nB,Лист,A\nC,Лист\nA,Повтор\nD,\n"
+        )
+        progress = []
+        result = import_elements(
+            self.draft, path, processes=0, chunk_rows=2, progress=progress.append
+        )
+        self.assertEqual((result.rows, result.imported, result.error_count), (5, 3, 2))
+        self.assertEqual(
+            [(error.row, error.code) for error in result.errors], [(5, "A"), (6, "D")]
+        )
+        self.assertEqual(progress, [2, 4, 5])
+        elements = dict(self.draft.elements.values_list("code", "parent_code"))
+        self.assertEqual(elements, {"A": "", "B": "A", "C": ""})
+        self.draft.refresh_from_db()
+        self.assertEqual(self.draft.element_count, 3)
+        changes = HandbookChange.objects.filter(kind="element", action="created")
+        self.assertEqual(
+            sorted(change.data["code"] for change in changes), ["A", "B", "C"]
+        )
+
+    def test_multiline_values_are_not_split(self) -> None:
+        """
+        Тестирует, что значение с переводом строки на границе пакетов
+        импортируется целиком, а номера строк ошибок учитывают такие записи.
+        """
+        path = self.write_file(
+            'A,"Первая строка\nвторая строка"\nB,"Лист\nдва\nтри",A\nC,Лист\nA,Повтор\n'
+        )
+        result = import_elements(self.draft, path, processes=0, chunk_rows=1)
+        self.assertEqual((result.rows, result.imported, result.error_count), (4, 3, 1))
+        self.assertEqual(
+            [(error.row, error.code) for error in result.errors], [(7, "A")]
+        )
+        self.assertEqual(
+            self.draft.elements.get(code="A").value, "Первая строка\nвторая строка"
+        )
+        self.assertEqual(self.draft.elements.get(code="B").parent_code, "A")
+
+    def test_import_with_process_pool(self) -> None:
+        """
+        Тестирует проверку пакетов в пуле процессов.
+        """
+        path = self.write_file(
+            "".join(f"C{index},Значение {index}\n" for index in range(50)) + "C7,X\n"
+        )
+        result = import_elements(self.draft, path, processes=2, chunk_rows=10)
+        self.assertEqual((result.imported, result.error_count), (50, 1))
+        self.assertEqual(result.errors[0].row, 51)
+        self.assertEqual(self.draft.elements.count(), 50)
+
+    def test_published_version_rejected(self) -> None:
+        """
+        Тестирует, что импорт в опубликованную версию запрещён.
+        """
+        path = self.write_file("A,Значение\n")
+        version = HandbookVersion.objects.get(pk=4)
+        with self.assertRaisesMessage(ValueError, "already published"):
+            import_elements(version, path, processes=0)
+
+    def test_import_job(self) -> None:
+        """
+        Тестирует задачу импорта и запрет файлов вне каталога импорта.
+        """
+        self.write_file("A,Значение\nB,Значение\n")
+        with override_settings(HANDBOOK_IMPORT_DIR=self.directory):
+            job = enqueue_job(
+                "import_elements",
+                {"version_id": self.draft.pk, "path": "elements.csv", "processes": 0},
+            )
+            outside = enqueue_job(
+                "import_elements", {"version_id": self.draft.pk, "path": "../x.csv"}
+            )
+            self.assertEqual(run_job(job.pk), HandbookJob.Status.SUCCEEDED)
+            self.assertEqual(run_job(outside.pk), HandbookJob.Status.FAILED)
+        job.refresh_from_db()
+        self.assertEqual(job.result["imported"], 2)
+        self.assertEqual((job.progress, job.total), (2, 2))
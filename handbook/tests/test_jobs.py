@@ -0,0 +1,186 @@
+import time
+from datetime import date, timedelta
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from ..jobs import (
+    JOB_TYPES,
+    JobType,
+    claim_job,
+    enqueue_job,
+    requeue_stale_jobs,
+    run_job,
+)
+from ..models import HandbookElement, HandbookJob, HandbookVersion
+
+
+class HandbookJobTests(TestCase):
+    """
+    Тест-кейсы для фоновых задач справочников.
+    """
+
+    fixtures = ["test_data.json"]
+
+    def setUp(self) -> None:
+        """
+        Подготавливает клиент API с правами администратора.
+        """
+        self.client = APIClient()
+        self.admin = User.objects.create_superuser("admin", password="admin")
+        self.client.force_authenticate(self.admin)
+
+    def test_enqueue_validates_kind_and_params(self) -> None:
+        """
+        Тестирует проверку типа и обязательных параметров задачи.
+        """
+        with self.assertRaisesMessage(ValueError, "Unknown job kind 'export'."):
+            enqueue_job("export")
+        with self.assertRaisesMessage(
+            ValueError, "Missing job parameters: version_id."
+        ):
+            enqueue_job("rebuild_tree_index", {})
+
+    def test_claim_takes_each_job_once(self) -> None:
+        """
+        Тестирует, что задачи забираются по порядку и только одним воркером.
+        """
+        first = enqueue_job("refresh_handbook_stats", {"handbook_id": 1})
+        second = enqueue_job("refresh_handbook_stats", {"handbook_id": 2})
+        self.assertEqual(claim_job("worker-1").pk, first.pk)
+        self.assertEqual(claim_job("worker-2").pk, second.pk)
+        self.assertIsNone(claim_job("worker-1"))
+        first.refresh_from_db()
+        self.assertEqual(first.status, HandbookJob.Status.RUNNING)
+        self.assertEqual(first.worker, "worker-1")
+
+    def test_run_job_saves_result_and_error(self) -> None:
+        """
+        Тестирует сохранение результата успешной задачи и ошибки упавшей.
+        """
+        HandbookElement.objects.filter(version_id=2).update(path="", depth=0)
+        done = enqueue_job("rebuild_tree_index", {"version_id": 2})
+        failed = enqueue_job("publish_version", {"version_id": 999})
+        self.assertEqual(run_job(done.pk), HandbookJob.Status.SUCCEEDED)
+        self.assertEqual(run_job(failed.pk), HandbookJob.Status.FAILED)
+
+        done.refresh_from_db()
+        expected = HandbookElement.objects.filter(version_id=2).count()
+        self.assertEqual(done.result, {"updated": expected})
+        self.assertIsNotNone(done.finished_at)
+        failed.refresh_from_db()
+        self.assertIn("DoesNotExist", failed.error)
+
+    def test_stale_jobs_requeued(self) -> None:
+        """
+        Тестирует возврат в очередь задач, воркер которых перестал отвечать.
+        """
+        job = enqueue_job("refresh_handbook_stats", {"handbook_id": 1})
+        claim_job("worker-1")
+        self.assertEqual(requeue_stale_jobs(), 0)
+        HandbookJob.objects.filter(pk=job.pk).update(
+            heartbeat_at=timezone.now() - timedelta(hours=1)
+        )
+        self.assertEqual(requeue_stale_jobs(), 1)
+        self.assertEqual(claim_job("worker-2").pk, job.pk)
+
+    def test_requeued_job_result_is_discarded(self) -> None:
+        """
+        Тестирует, что итог задачи не сохраняется, если за время выполнения
+        её вернули в очередь как брошенную.
+        """
+
+        def requeue(job: HandbookJob) -> dict:
+            HandbookJob.objects.filter(pk=job.pk).update(
+                heartbeat_at=timezone.now() - timedelta(hours=1)
+            )
+            requeue_stale_jobs()
+            return {}
+
+        with mock.patch.dict(JOB_TYPES, {"requeue": JobType(requeue, ())}):
+            job = enqueue_job("requeue")
+            claim_job("worker-1")
+            self.assertEqual(run_job(job.pk), HandbookJob.Status.PENDING)
+        job.refresh_from_db()
+        self.assertEqual(job.status, HandbookJob.Status.PENDING)
+        self.assertIsNone(job.finished_at)
+
+    def test_inline_worker_sends_heartbeats(self) -> None:
+        """
+        Тестирует обновление отметки активности задачи, которая выполняется
+        в главном процессе воркера.
+        """
+        with mock.patch.dict(
+            JOB_TYPES, {"sleep": JobType(lambda job: time.sleep(0.2), ())}
+        ):
+            job = enqueue_job("sleep")
+            with mock.patch(
+                "handbook.management.commands.run_handbook_worker.touch_jobs"
+            ) as touch_jobs:
+                call_command(
+                    "run_handbook_worker",
+                    processes=0,
+                    once=True,
+                    poll_interval=0.02,
+                    stdout=StringIO(),
+                )
+        touch_jobs.assert_called_with([job.pk])
+        job.refresh_from_db()
+        self.assertEqual(job.status, HandbookJob.Status.SUCCEEDED)
+
+    def test_worker_command_drains_queue(self) -> None:
+        """
+        Тестирует выполнение очереди командой run_handbook_worker.
+        """
+        draft = HandbookVersion.objects.create(
+            handbook_id=2,
+            version="2024",
+            start_date=date(2024, 1, 1),
+            status=HandbookVersion.Status.DRAFT,
+        )
+        enqueue_job("publish_version", {"version_id": draft.pk})
+        enqueue_job("refresh_handbook_stats", {"handbook_id": 2})
+        out = StringIO()
+        call_command("run_handbook_worker", processes=0, once=True, stdout=out)
+        self.assertEqual(out.getvalue().count("succeeded"), 2)
+        draft.refresh_from_db()
+        self.assertEqual(draft.status, HandbookVersion.Status.PUBLISHED)
+
+    def test_job_api(self) -> None:
+        """
+        Тестирует постановку задачи через API и получение её статуса.
+        """
+        url = reverse("job-list")
+        response = self.client.post(
+            url,
+            {"kind": "rebuild_tree_index", "handbook": 1, "params": {"version_id": 2}},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.json()["status"], "pending")
+        job_id = response.json()["id"]
+
+        run_job(claim_job("worker-1").pk)
+        response = self.client.get(reverse("job-detail", args=[job_id]))
+        self.assertEqual(response.json()["status"], "succeeded")
+        response = self.client.get(url, {"status": "pending"})
+        self.assertEqual(response.json()["count"], 0)
+
+        response = self.client.post(url, {"kind": "export"}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.json(), {"error": "Unknown job kind 'export'."})
+
+    def test_job_api_requires_admin(self) -> None:
+        """
+        Тестирует, что задачи доступны только администраторам.
+        """
+        self.client.force_authenticate(None)
+        response = self.client.get(reverse("job-list"))
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
@@ -0,0 +1,59 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.test import TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from ..models import Handbook
+from ..routers import choose_read_alias
+
+
+@override_settings(
+    HANDBOOK_READ_REPLICAS=["replica"], HANDBOOK_REPLICA_CHECK_INTERVAL=0
+)
+class ReadReplicaRouterTests(TransactionTestCase):
+    """
+    Тест-кейсы для маршрутизации чтения API на реплику.
+    В тестах реплика является зеркалом основной тестовой базы,
+    поэтому данные фикстур должны быть зафиксированы, а не откатываться
+    в транзакции, как в TestCase.
+    """
+
+    databases = {"default", "replica"}
+    fixtures = ["test_data.json"]
+
+    def setUp(self) -> None:
+        """
+        Подготавливает клиент API для выполнения запросов.
+        """
+        cache.clear()
+        self.client = APIClient()
+
+    def test_api_reads_use_replica(self) -> None:
+        """
+        Тестирует, что читающие запросы API выполняются на реплике,
+        а запросы вне API — на основной базе.
+        """
+        with CaptureQueriesContext(connections["replica"]) as queries:
+            response = self.client.get(reverse("refbook-elements", args=[1]))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(
+            any("handbook_handbookelement" in query["sql"] for query in queries)
+        )
+        self.assertEqual(Handbook.objects.all().db, DEFAULT_DB_ALIAS)
+
+    def test_lagging_replica_falls_back_to_primary(self) -> None:
+        """
+        Тестирует переключение чтения на основную базу,
+        если реплика отстаёт или недоступна.
+        """
+        self.assertEqual(choose_read_alias(), "replica")
+        positions = {DEFAULT_DB_ALIAS: 10, "replica": 5}
+        with mock.patch(
+            "handbook.routers.get_change_position", side_effect=positions.get
+        ):
+            self.assertEqual(choose_read_alias(), DEFAULT_DB_ALIAS)
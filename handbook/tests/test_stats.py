@@ -0,0 +1,131 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.db.models.signals import post_delete, pre_delete
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from ..models import (
+    EMPTY_CONTENT_HASH,
+    Handbook,
+    HandbookChange,
+    HandbookElement,
+    HandbookElementTranslation,
+    HandbookVersion,
+)
+from ..stats import combine_hash, recompute_version_stats
+
+
+class HandbookStatsTests(TestCase):
+    """
+    Тест-кейсы для инкрементально поддерживаемой статистики версий и справочников.
+    """
+
+    fixtures = ["test_data.json"]
+
+    def setUp(self) -> None:
+        """
+        Пересчитывает статистику, так как фикстуры загружаются без сигналов.
+        """
+        call_command("refresh_handbook_stats", stdout=StringIO())
+        self.version = HandbookVersion.objects.get(pk=2)
+
+    def assert_stats_consistent(self) -> None:
+        """
+        Проверяет, что инкрементальная статистика совпадает с полным пересчётом.
+        """
+        self.version.refresh_from_db()
+        incremental = (self.version.element_count, self.version.content_hash)
+        recompute_version_stats(self.version)
+        self.version.refresh_from_db()
+        self.assertEqual(
+            incremental, (self.version.element_count, self.version.content_hash)
+        )
+
+    def test_fixture_stats(self) -> None:
+        """
+        Тестирует статистику, пересчитанную командой refresh_handbook_stats.
+        """
+        self.assertEqual(self.version.element_count, 3)
+        self.assertNotEqual(self.version.content_hash, EMPTY_CONTENT_HASH)
+        self.assertTrue(self.version.stats_valid)
+        self.assertEqual(Handbook.objects.get(pk=1).element_count, 6)
+
+    def test_content_hash_is_order_independent(self) -> None:
+        """
+        Тестирует, что хеш содержимого не зависит от порядка элементов.
+        """
+        elements = [("A", "1", ""), ("B", "2", "A"), ("C", "3", "")]
+        self.assertEqual(
+            combine_hash(EMPTY_CONTENT_HASH, elements),
+            combine_hash(EMPTY_CONTENT_HASH, reversed(elements)),
+        )
+        self.assertEqual(
+            combine_hash(combine_hash("", elements), [], elements), "0" * 64
+        )
+        self.assertNotEqual(
+            combine_hash(EMPTY_CONTENT_HASH, elements),
+            combine_hash(EMPTY_CONTENT_HASH, [("A", "1", ""), ("B", "2", "")]),
+        )
+
+    def test_stats_follow_element_writes(self) -> None:
+        """
+        Тестирует обновление статистики при создании, изменении и удалении элемента.
+        """
+        element = HandbookElement.objects.create(
+            version=self.version, code="Z99", value="Новый элемент"
+        )
+        self.assert_stats_consistent()
+        self.assertEqual(self.version.element_count, 4)
+
+        element.value = "Изменённый элемент"
+        element.save()
+        self.assert_stats_consistent()
+
+        content_hash = self.version.content_hash
+        element.parent_code = "A00"
+        element.save()
+        self.assert_stats_consistent()
+        self.assertNotEqual(self.version.content_hash, content_hash)
+
+        element.delete()
+        self.assert_stats_consistent()
+        self.assertEqual(self.version.element_count, 3)
+        self.assertEqual(Handbook.objects.get(pk=1).element_count, 6)
+
+    def test_queryset_delete_updates_stats(self) -> None:
+        """
+        Тестирует удаление элементов через QuerySet без обработчиков сигналов
+        удаления, которые замедляли бы каскадное удаление версии.
+        """
+        for model in (HandbookElement, HandbookElementTranslation):
+            self.assertFalse(pre_delete.has_listeners(model))
+            self.assertFalse(post_delete.has_listeners(model))
+        HandbookElementTranslation.objects.create(
+            element_id=4, language="en", value="Cholera"
+        )
+        self.version.elements.filter(code__in=["A00", "B01"]).delete()
+        self.assert_stats_consistent()
+        self.assertEqual(self.version.element_count, 1)
+        self.assertFalse(HandbookElementTranslation.objects.exists())
+        self.assertEqual(
+            HandbookChange.objects.filter(kind="element", action="deleted").count(), 2
+        )
+
+    def test_version_delete_updates_handbook(self) -> None:
+        """
+        Тестирует обновление статистики справочника после удаления версии.
+        """
+        self.version.delete()
+        self.assertEqual(Handbook.objects.get(pk=1).element_count, 3)
+
+    def test_stats_in_list_response(self) -> None:
+        """
+        Тестирует вывод статистики в списке справочников.
+        """
+        response = APIClient().get(reverse("refbook-list"))
+        refbook = response.data["refbooks"][0]
+        self.assertEqual(refbook["element_count"], 6)
+        self.assertEqual(len(refbook["content_hash"]), 64)
+        self.assertIsNotNone(refbook["modified_at"])
@@ -0,0 +1,89 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework.throttling import ScopedRateThrottle
+
+from ..throttling import ConcurrencyLimiter, heavy_requests
+
+
+class HandbookThrottlingTests(TestCase):
+    """
+    Тест-кейсы для ограничения частоты и одновременности запросов к API.
+    """
+
+    fixtures = ["test_data.json"]
+
+    def setUp(self) -> None:
+        """
+        Подготавливает клиент API и очищает счётчики лимитов.
+        """
+        cache.clear()
+        self.client = APIClient()
+
+    @override_settings(
+        HANDBOOK_HEAVY_MAX_CONCURRENCY=2, HANDBOOK_HEAVY_MAX_PER_CLIENT=1
+    )
+    def test_concurrency_limiter(self) -> None:
+        """
+        Тестирует общий лимит и лимит на клиента.
+        """
+        limiter = ConcurrencyLimiter()
+        self.assertTrue(limiter.acquire("a"))
+        self.assertFalse(limiter.acquire("a"))
+        self.assertTrue(limiter.acquire("b"))
+        self.assertFalse(limiter.acquire("c"))
+        limiter.release("a")
+        self.assertTrue(limiter.acquire("c"))
+
+    @override_settings(HANDBOOK_HEAVY_MAX_PER_CLIENT=1, HANDBOOK_HEAVY_RETRY_AFTER=3)
+    def test_concurrent_dump_is_rejected_with_retry_after(self) -> None:
+        """
+        Тестирует ответ 429 с Retry-After, если клиент уже выполняет выгрузку.
+        """
+        self.assertTrue(heavy_requests.acquire("127.0.0.1"))
+        try:
+            response = self.client.get(reverse("refbook-elements", args=[1]))
+        finally:
+            heavy_requests.release("127.0.0.1")
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(response["Retry-After"], "3")
+
+        response = self.client.get(reverse("refbook-elements", args=[1]))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_heavy_and_cheap_budgets_are_separate(self) -> None:
+        """
+        Тестирует, что исчерпание лимита выгрузок не влияет на дешёвые запросы.
+        """
+        rates = {"handbook_heavy": "1/min", "handbook_cheap": "100/min"}
+        with mock.patch.object(ScopedRateThrottle, "THROTTLE_RATES", rates):
+            url = reverse("refbook-elements", args=[1])
+            self.assertEqual(self.client.get(url).status_code, status.HTTP_200_OK)
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+            self.assertIn("Retry-After", response)
+
+            response = self.client.get(
+                reverse("refbook-check-element", args=[1]),
+                {"code": "A00", "value": "Холера"},
+            )
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_invalid_include_does_not_use_heavy_budget(self) -> None:
+        """
+        Тестирует, что список с неизвестным значением include отклоняется
+        без расхода лимита выгрузок.
+        """
+        rates = {"handbook_heavy": "1/min", "handbook_cheap": "100/min"}
+        with mock.patch.object(ScopedRateThrottle, "THROTTLE_RATES", rates):
+            url = reverse("refbook-list")
+            for _ in range(2):
+                response = self.client.get(url, {"include": "versions"})
+                self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+            response = self.client.get(url, {"include": "current_elements"})
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            b"".join(response.streaming_content)
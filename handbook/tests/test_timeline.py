@@ -0,0 +1,82 @@
+from datetime import date, datetime
+from datetime import timezone as dt_timezone
+from unittest import mock
+
+from django.test import TestCase
+
+from ..models import Handbook, HandbookVersion
+from ..timeline import clear_timelines, get_timeline
+
+
+class VersionTimelineTests(TestCase):
+    """
+    Тест-кейсы для расписания версий справочника в памяти процесса.
+    """
+
+    fixtures = ["test_data.json"]
+
+    def setUp(self) -> None:
+        """
+        Очищает кэш расписаний версий.
+        """
+        clear_timelines()
+
+    def test_as_of_date(self) -> None:
+        """
+        Тестирует определение версии, действующей на дату.
+        """
+        timeline = get_timeline(Handbook.objects.get(pk=1))
+        self.assertIsNone(timeline.as_of(date(2021, 12, 31)))
+        self.assertEqual(timeline.as_of(date(2022, 6, 1)).version, "2022")
+        self.assertEqual(timeline.as_of(date(2023, 1, 1)).version, "2023")
+        self.assertEqual(timeline.get("2022").pk, 1)
+        self.assertIsNone(timeline.get("1999"))
+
+    def test_resolved_without_queries(self) -> None:
+        """
+        Тестирует, что повторное определение текущей версии не обращается к базе.
+        """
+        get_timeline(Handbook.objects.get(pk=1))
+        handbook = Handbook.objects.get(pk=1)
+        with self.assertNumQueries(0):
+            version = handbook.get_latest_version()
+        self.assertEqual(version.pk, 2)
+        self.assertEqual(version.handbook_id, 1)
+
+    def test_refreshed_after_version_write(self) -> None:
+        """
+        Тестирует, что новая версия попадает в расписание,
+        а черновики в него не попадают.
+        """
+        get_timeline(Handbook.objects.get(pk=1))
+        HandbookVersion.objects.create(
+            handbook_id=1,
+            version="draft",
+            start_date=date(2024, 1, 1),
+            status=HandbookVersion.Status.DRAFT,
+        )
+        handbook = Handbook.objects.get(pk=1)
+        self.assertEqual(handbook.get_current_version(), "2023")
+
+        HandbookVersion.objects.create(
+            handbook_id=1, version="2024-02", start_date=date(2024, 2, 1)
+        )
+        handbook = Handbook.objects.get(pk=1)
+        self.assertEqual(handbook.get_current_version(), "2024-02")
+
+    def test_rollover_uses_time_zone(self) -> None:
+        """
+        Тестирует смену текущей версии в полночь по часовому поясу TIME_ZONE,
+        а не по UTC.
+        """
+        HandbookVersion.objects.create(
+            handbook_id=2, version="2031", start_date=date(2031, 1, 1)
+        )
+        timeline = get_timeline(Handbook.objects.get(pk=2))
+        # 22:30 UTC 31 декабря — уже 1 января в Europe/Moscow.
+        now = datetime(2030, 12, 31, 22, 30, tzinfo=dt_timezone.utc)
+        with mock.patch("django.utils.timezone.now", return_value=now):
+            self.assertEqual(timeline.current().version, "2031")
+        now = datetime(2030, 12, 31, 20, 30, tzinfo=dt_timezone.utc)
+        with mock.patch("django.utils.timezone.now", return_value=now):
+            self.assertEqual(timeline.current().version, "2023")
@@ -0,0 +1,93 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from ..models import HandbookChange, HandbookElementTranslation
+
+
+class HandbookElementTranslationTests(TestCase):
+    """
+    Тест-кейсы для переводов значений элементов справочника.
+    """
+
+    fixtures = ["test_data.json"]
+
+    def setUp(self) -> None:
+        """
+        Подготавливает клиент API и перевод одного элемента.
+        """
+        cache.clear()
+        self.client = APIClient()
+        self.url = reverse("refbook-elements", args=[1])
+        HandbookElementTranslation.objects.create(
+            element_id=4, language="en", value="Cholera (updated)"
+        )
+
+    def get_values(self, **headers) -> list:
+        """
+        Получает значения элементов текущей версии справочника 1.
+        """
+        response = self.client.get(self.url, **headers)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn("Accept-Language", response["Vary"])
+        return [element["value"] for element in response.json()["elements"]]
+
+    def test_values_follow_accept_language(self) -> None:
+        """
+        Тестирует выбор языка значений по заголовку Accept-Language
+        и подстановку исходного значения при отсутствии перевода.
+        """
+        self.assertIn("Холера (обновлено)", self.get_values())
+        english = self.get_values(HTTP_ACCEPT_LANGUAGE="en")
+        self.assertIn("Cholera (updated)", english)
+        self.assertIn("Ветряная оспа (обновлено)", english)
+        self.assertIn("Холера (обновлено)", self.get_values(HTTP_ACCEPT_LANGUAGE="ru"))
+
+    def test_messages_stay_in_default_language(self) -> None:
+        """
+        Тестирует, что по Accept-Language выбирается только язык значений
+        элементов, а сообщения API остаются на языке по умолчанию.
+        """
+        response = self.client.get(
+            reverse("refbook-check-element", args=[1]), HTTP_ACCEPT_LANGUAGE="en"
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data["code"], ["Обязательное поле."])
+
+    def test_api_requests_do_not_activate_language(self) -> None:
+        """
+        Тестирует, что запросы к API не переключают язык, а значения
+        элементов всё равно выбираются по Accept-Language.
+        """
+        self.client.get("/admin/login/", HTTP_ACCEPT_LANGUAGE="en")
+        with mock.patch(
+            "django.utils.translation.activate",
+            side_effect=AssertionError("language activated"),
+        ):
+            values = self.get_values(HTTP_ACCEPT_LANGUAGE="en")
+            response = self.client.get(
+                reverse("refbook-check-element", args=[1]),
+                HTTP_ACCEPT_LANGUAGE="en",
+            )
+        self.assertEqual(values[0], "Cholera (updated)")
+        self.assertEqual(response.data["code"], ["Обязательное поле."])
+
+    def test_translation_change_invalidates_payload(self) -> None:
+        """
+        Тестирует, что изменение перевода сбрасывает кэш тела ответа
+        и записывается в журнал изменений.
+        """
+        self.get_values(HTTP_ACCEPT_LANGUAGE="en")
+        translation = HandbookElementTranslation.objects.get()
+        translation.value = "Cholera"
+        translation.save()
+
+        self.assertIn("Cholera", self.get_values(HTTP_ACCEPT_LANGUAGE="en"))
+        change = HandbookChange.objects.filter(kind="translation").last()
+        self.assertEqual(change.action, "updated")
+        self.assertEqual(change.handbook_id, 1)
+        self.assertEqual(change.data["language"], "en")
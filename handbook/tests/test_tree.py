@@ -0,0 +1,152 @@
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from ..models import HandbookElement
+from ..throttling import heavy_requests
+from ..tree import build_paths
+
+
+class HandbookTreeTests(TestCase):
+    """
+    Тест-кейсы для иерархии элементов и её индекса.
+    """
+
+    fixtures = ["test_data.json"]
+
+    def setUp(self) -> None:
+        """
+        Строит иерархию A00 → A00.0 → A00.01 в текущей версии справочника 1.
+        """
+        self.client = APIClient()
+        call_command("rebuild_tree_index", stdout=StringIO())
+        HandbookElement.objects.create(
+            version_id=2, code="A00.0", value="Холера классическая", parent_code="A00"
+        )
+        HandbookElement.objects.create(
+            version_id=2, code="A00.01", value="Уточнённая", parent_code="A00.0"
+        )
+
+    def assert_index_consistent(self) -> None:
+        """
+        Проверяет, что инкрементально обновлённый индекс совпадает
+        с индексом, построенным заново.
+        """
+        rows = HandbookElement.objects.filter(version_id=2).values_list(
+            "pk", "code", "parent_code", "path", "depth"
+        )
+        expected = build_paths([(pk, code, parent) for pk, code, parent, *_ in rows])
+        self.assertEqual(
+            {code: (path, depth) for _, code, _, path, depth in rows}, expected
+        )
+
+    def get(self, name: str, **params):
+        """
+        Выполняет запрос к действию иерархии справочника 1.
+        """
+        return self.client.get(reverse(f"refbook-{name}", args=[1]), params)
+
+    def test_subtree_and_ancestors(self) -> None:
+        """
+        Тестирует получение поддерева и предков элемента.
+        """
+        response = self.get("subtree", code="A00")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [(e["code"], e["depth"]) for e in response.json()["elements"]],
+            [("A00", 0), ("A00.0", 1), ("A00.01", 2)],
+        )
+        response = self.get("ancestors", code="A00.01")
+        self.assertEqual(
+            [e["code"] for e in response.json()["elements"]], ["A00", "A00.0"]
+        )
+
+    @override_settings(HANDBOOK_SUBTREE_MAX_ELEMENTS=2, HANDBOOK_HEAVY_MAX_PER_CLIENT=1)
+    def test_subtree_is_a_limited_heavy_request(self) -> None:
+        """
+        Тестирует ограничение размера поддерева и количества
+        одновременных выгрузок поддеревьев.
+        """
+        response = self.get("subtree", code="A00")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("Too many elements in the subtree", response.json()["error"])
+        self.assertEqual(len(self.get("subtree", code="A00.0").json()["elements"]), 2)
+
+        self.assertTrue(heavy_requests.acquire("127.0.0.1"))
+        try:
+            response = self.get("subtree", code="A00.0")
+        finally:
+            heavy_requests.release("127.0.0.1")
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+    def test_is_descendant(self) -> None:
+        """
+        Тестирует проверку отношения «является потомком».
+        """
+        response = self.get("is-descendant", code="A00.01", ancestor="A00")
+        self.assertEqual(response.json(), {"is_descendant": True})
+        response = self.get("is-descendant", code="A00", ancestor="A00.01")
+        self.assertEqual(response.json(), {"is_descendant": False})
+        response = self.get("is-descendant", code="A00")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_index_follows_parent_changes(self) -> None:
+        """
+        Тестирует перестроение индекса при переносе и удалении элементов.
+        """
+        element = HandbookElement.objects.get(version_id=2, code="A00.0")
+        element.parent_code = "B01"
+        element.save()
+        response = self.get("subtree", code="B01")
+        self.assertEqual(len(response.json()["elements"]), 3)
+        self.assert_index_consistent()
+
+        element.delete()
+        response = self.get("ancestors", code="A00.01")
+        self.assertEqual(response.json()["elements"], [])
+        self.assert_index_consistent()
+
+    def test_single_writes_update_only_affected_subtrees(self) -> None:
+        """
+        Тестирует обновление индекса по затронутым поддеревьям без перестроения
+        индекса всей версии: появление родителя у ранее корневых элементов,
+        смену кода родителя и удаление вложенных элементов через QuerySet.
+        """
+        with mock.patch("handbook.tree.rebuild_tree_index") as rebuild:
+            HandbookElement.objects.create(
+                version_id=2, code="D01.1", value="Лист", parent_code="D01"
+            )
+            HandbookElement.objects.create(version_id=2, code="D01", value="Корень")
+            self.assert_index_consistent()
+            self.assertEqual(
+                HandbookElement.objects.get(version_id=2, code="D01.1").depth, 1
+            )
+
+            element = HandbookElement.objects.get(version_id=2, code="A00")
+            element.code = "A99"
+            element.save()
+            self.assert_index_consistent()
+
+            element.parent_code = "D01.1"
+            element.save()
+            self.assert_index_consistent()
+
+            HandbookElement.objects.filter(
+                version_id=2, code__in=["D01", "D01.1"]
+            ).delete()
+            self.assert_index_consistent()
+        rebuild.assert_not_called()
+
+    def test_build_paths_breaks_cycles(self) -> None:
+        """
+        Тестирует, что ссылки на несуществующих родителей и циклы
+        не приводят к зацикливанию.
+        """
+        paths = build_paths([(1, "a", "b"), (2, "b", "a"), (3, "c", "missing")])
+        self.assertEqual(paths["c"], ("/3/", 0))
+        self.assertEqual({paths["a"][1], paths["b"][1]}, {0, 1})
@@ -0,0 +1,52 @@
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from ..models import HandbookElement, HandbookVersion
+from ..validation import VersionMatcher, check_element, compile_version
+
+
+class ElementValidationTests(TestCase):
+    """
+    Тест-кейсы для проверки элементов по скомпилированным версиям.
+    """
+
+    fixtures = ["test_data.json"]
+
+    def setUp(self) -> None:
+        """
+        Очищает кэш скомпилированных версий.
+        """
+        compile_version.cache_clear()
+        self.client = APIClient()
+
+    def test_matcher_ignores_case_and_spaces(self) -> None:
+        """
+        Тестирует сравнение кода и значения без учёта регистра и лишних пробелов.
+        """
+        matcher = VersionMatcher.from_rows([("A00", "Холера  (обновлено)")])
+        self.assertTrue(matcher.check("a00", "ХОЛЕРА"))
+        self.assertTrue(matcher.check("A00", "холера (обновлено)", exact=True))
+        self.assertFalse(matcher.check("A00", "холера", exact=True))
+        self.assertFalse(matcher.check("B01", "холера"))
+
+    def test_recompiled_after_change(self) -> None:
+        """
+        Тестирует, что изменение элементов версии учитывается при проверке.
+        """
+        version = HandbookVersion.objects.get(pk=2)
+        self.assertFalse(check_element(version, "Z99", "Новый"))
+        HandbookElement.objects.create(version=version, code="Z99", value="Новый")
+        version.refresh_from_db()
+        self.assertTrue(check_element(version, "z99", "новый"))
+
+    def test_check_element_exact_over_http(self) -> None:
+        """
+        Тестирует параметр exact в запросе проверки элемента.
+        """
+        url = reverse("refbook-check-element", args=[1])
+        params = {"code": "a00", "value": "холера (обновлено)", "exact": "true"}
+        response = self.client.get(url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json(), {"exists": True})
@@ -1,8 +1,14 @@
+import gzip
+import json
+
+from django.core.cache import cache
 from django.test import TestCase
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APIClient
 
+from ..throttling import heavy_requests
+
 
 class HandbookViewSetTests(TestCase):
     """
@@ -41,6 +47,17 @@ class HandbookViewSetTests(TestCase):
         self.assertIn("refbooks", response.data)
         self.assertEqual(len(response.data["refbooks"]), 1)
 
+    def test_filter_handbooks_by_date_without_duplicates(self) -> None:
+        """
+        Тестирует, что справочник с несколькими подходящими версиями
+        возвращается один раз.
+        Ожидается 2 справочника для даты '2024-01-01', у каждого по 2 версии.
+        """
+        url = reverse("refbook-list")
+        response = self.client.get(url, data={"date": "2024-01-01"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data["refbooks"]), 2)
+
     def test_filter_handbooks_by_invalid_date_format(self) -> None:
         """
         Тестирует фильтрацию по дате с некорректным форматом даты.
@@ -75,9 +92,10 @@ class HandbookViewSetTests(TestCase):
         url = reverse("refbook-elements", args=[1])
         response = self.client.get(url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertIn("elements", response.data)
-        self.assertEqual(len(response.data["elements"]), 3)
-        self.assertEqual(response.data["elements"][0]["code"], "A00")
+        data = response.json()
+        self.assertIn("elements", data)
+        self.assertEqual(len(data["elements"]), 3)
+        self.assertEqual(data["elements"][0]["code"], "A00")
 
     def test_get_handbook_elements_for_specific_version(self) -> None:
         """
@@ -88,9 +106,10 @@ class HandbookViewSetTests(TestCase):
         params = {"version": "2022"}
         response = self.client.get(url, data=params)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertIn("elements", response.data)
-        self.assertEqual(len(response.data["elements"]), 3)
-        self.assertEqual(response.data["elements"][0]["value"], "Холера")
+        data = response.json()
+        self.assertIn("elements", data)
+        self.assertEqual(len(data["elements"]), 3)
+        self.assertEqual(data["elements"][0]["value"], "Холера")
 
     def test_check_element_exists(self) -> None:
         """
@@ -166,3 +185,98 @@ class HandbookViewSetTests(TestCase):
         self.assertEqual(response_1.status_code, status.HTTP_400_BAD_REQUEST)
         self.assertIn("code", response_1.data)
         self.assertEqual(response_1.data["code"], ["Обязательное поле."])
+
+    def test_elements_are_compressed_and_cached(self) -> None:
+        """
+        Тестирует сжатие элементов при поддержке gzip клиентом,
+        отдельный ETag для сжатого представления и ответ 304 при совпадении ETag.
+        """
+        cache.clear()
+        url = reverse("refbook-elements", args=[1])
+        response = self.client.get(url, HTTP_ACCEPT_ENCODING="gzip")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertIn("Accept-Encoding", response["Vary"])
+        data = json.loads(gzip.decompress(response.content))
+        self.assertEqual(len(data["elements"]), 3)
+        gzip_etag = response["ETag"]
+
+        response = self.client.get(
+            url, HTTP_ACCEPT_ENCODING="gzip", HTTP_IF_NONE_MATCH=gzip_etag
+        )
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=gzip_etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn("Content-Encoding", response)
+        self.assertNotEqual(response["ETag"], gzip_etag)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_get_handbook_elements_in_compact_formats(self) -> None:
+        """
+        Тестирует получение элементов в форматах NDJSON и колоночного JSON.
+        """
+        url = reverse("refbook-elements", args=[1])
+        response = self.client.get(url, HTTP_ACCEPT="application/x-ndjson")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response["Content-Type"].startswith("application/x-ndjson"))
+        lines = response.content.decode().splitlines()
+        self.assertEqual(len(lines), 3)
+        self.assertEqual(json.loads(lines[0])["code"], "A00")
+
+        response = self.client.get(url, data={"format": "columnar"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        data = json.loads(response.content)
+        self.assertEqual(data["codes"][0], "A00")
+        self.assertEqual(len(data["values"]), 3)
+
+        response = self.client.get(
+            reverse("refbook-elements", args=[999]), data={"format": "columnar"}
+        )
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(json.loads(response.content)["error"], "Handbook not found.")
+
+    def test_list_handbooks_with_current_elements(self) -> None:
+        """
+        Тестирует список справочников с элементами текущих версий:
+        три запроса к базе на весь список (справочники, количество элементов
+        и элементы) и освобождение места тяжёлой выгрузки.
+        """
+        url = reverse("refbook-list")
+        with self.assertNumQueries(3):
+            response = self.client.get(url, {"include": "current_elements"})
+            data = json.loads(b"".join(response.streaming_content))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(dict(heavy_requests.active), {})
+        first, second = data["refbooks"]
+        self.assertEqual(first["code"], "ICD10")
+        self.assertEqual(
+            first["current_version"],
+            {"version": "2023", "start_date": "2023-01-01", "element_count": 3},
+        )
+        self.assertEqual(
+            [element["code"] for element in first["elements"]], ["A00", "B01", "C34"]
+        )
+        self.assertEqual(
+            second["elements"],
+            [
+                {"code": "PARA", "value": "Парацетамол 1000 мг"},
+                {"code": "AMOX", "value": "Амоксициллин 875 мг"},
+            ],
+        )
+
+    def test_list_handbooks_include_limits(self) -> None:
+        """
+        Тестирует отказ при неизвестном значении include
+        и при превышении лимита количества элементов, в том числе
+        если статистика версий не пересчитывалась.
+        """
+        url = reverse("refbook-list")
+        response = self.client.get(url, {"include": "versions"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data, {"error": "Invalid 'include' parameter."})
+        with self.settings(HANDBOOK_INCLUDE_MAX_ELEMENTS=2):
+            response = self.client.get(url, {"include": "current_elements"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("Too many elements to include (5 > 2)", response.data["error"])
@@ -0,0 +1,117 @@
+"""
+Ограничение одновременных тяжёлых запросов к API.
+
+Лимиты частоты запросов задаются через ScopedRateThrottle (см. REST_FRAMEWORK),
+а этот модуль ограничивает количество одновременно выполняемых тяжёлых
+выгрузок в процессе, чтобы несколько клиентов не заняли все потоки воркера
+и дешёвые запросы обслуживались с предсказуемой задержкой.
+
+Оба ограничения действуют в пределах одного процесса: счётчики одновременных
+выгрузок хранятся в памяти процесса, а счётчики частоты — в кэше default,
+который по умолчанию (LocMemCache) тоже свой у каждого процесса. При N
+воркерах клиент получает до N лимитов. Общими для всех процессов лимиты
+частоты становятся, если default указывает на общий кэш (Redis, Memcached
+или DatabaseCache).
+"""
+
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from typing import Callable, Iterator
+
+from django.conf import settings
+from rest_framework.exceptions import Throttled
+from rest_framework.request import Request
+from rest_framework.throttling import BaseThrottle
+
+
+def get_client_ident(request: Request) -> str:
+    """
+    Получить идентификатор клиента: пользователя или IP-адрес.
+
+    :param request: Объект запроса.
+    :return: Идентификатор клиента.
+    """
+    user = getattr(request, "user", None)
+    if user is not None and user.is_authenticated:
+        return f"user:{user.pk}"
+    return BaseThrottle().get_ident(request)
+
+
+class ConcurrencyLimiter:
+    """
+    Счётчик одновременных запросов в процессе с общим лимитом
+    и лимитом на одного клиента.
+    Лимиты читаются из настроек при каждом запросе.
+    """
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.active = Counter()
+
+    def acquire(self, client: str) -> bool:
+        """
+        Занимает место для запроса клиента, если лимиты не превышены.
+
+        :param client: Идентификатор клиента.
+        :return: True, если место занято.
+        """
+        with self.lock:
+            if (
+                sum(self.active.values()) >= settings.HANDBOOK_HEAVY_MAX_CONCURRENCY
+                or self.active[client] >= settings.HANDBOOK_HEAVY_MAX_PER_CLIENT
+            ):
+                return False
+            self.active[client] += 1
+            return True
+
+    def release(self, client: str) -> None:
+        """
+        Освобождает место, занятое запросом клиента.
+
+        :param client: Идентификатор клиента.
+        """
+        with self.lock:
+            self.active[client] -= 1
+            if self.active[client] <= 0:
+                del self.active[client]
+
+    def hold(self, request: Request) -> Callable[[], None]:
+        """
+        Занимает место для запроса до вызова возвращённой функции.
+        Нужен потоковым ответам, которые формируются уже после выхода
+        из представления. Повторные вызовы функции ничего не делают.
+
+        :param request: Объект запроса.
+        :return: Функция, освобождающая место.
+        :raises Throttled: Если лимиты одновременных запросов превышены.
+        """
+        client = get_client_ident(request)
+        if not self.acquire(client):
+            raise Throttled(wait=settings.HANDBOOK_HEAVY_RETRY_AFTER)
+        released = threading.Event()
+
+        def release() -> None:
+            if not released.is_set():
+                released.set()
+                self.release(client)
+
+        return release
+
+    @contextmanager
+    def slot(self, request: Request) -> Iterator[None]:
+        """
+        Контекст, занимающий место на время обработки запроса.
+
+        :param request: Объект запроса.
+        :raises Throttled: Если лимиты одновременных запросов превышены.
+        """
+        release = self.hold(request)
+        try:
+            yield
+        finally:
+            release()
+
+
+# Лимитер тяжёлых выгрузок элементов версий.
+heavy_requests = ConcurrencyLimiter()
@@ -0,0 +1,144 @@
+"""
+Расписание вступления в силу версий справочника, хранимое в памяти процесса.
+
+Для каждого справочника один раз загружаются его опубликованные версии,
+отсортированные по дате начала действия. Текущая версия или версия на дату
+затем определяется двоичным поиском без запроса к базе.
+
+Ключ кэша — (идентификатор справочника, время его изменения). Время изменения
+справочника обновляется модулем stats при любой записи его версий и элементов,
+поэтому после изменений расписание загружается заново.
+"""
+
+import threading
+from bisect import bisect_right
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Dict, List, Optional, Tuple
+
+from django.db import router
+from django.utils import timezone
+
+from .models import Handbook, HandbookVersion
+
+# Количество справочников, расписания которых хранятся в процессе.
+TIMELINE_CACHE_SIZE = 1024
+
+# Поля версии, из которых восстанавливаются объекты HandbookVersion.
+VERSION_FIELDS = (
+    "id",
+    "handbook_id",
+    "version",
+    "start_date",
+    "status",
+    "element_count",
+    "content_hash",
+    "stats_valid",
+    "modified_at",
+)
+
+TimelineKey = Tuple[int, Optional[datetime]]
+
+
+@dataclass(frozen=True)
+class VersionTimeline:
+    """
+    Опубликованные версии справочника, отсортированные по дате начала действия.
+    """
+
+    db: str
+    start_dates: Tuple[date, ...]
+    rows: Tuple[tuple, ...]
+    labels: Dict[str, int]
+
+    def _build(self, index: int) -> HandbookVersion:
+        """
+        Восстанавливает объект версии без запроса к базе.
+        Каждый вызов возвращает новый объект.
+        """
+        return HandbookVersion.from_db(self.db, VERSION_FIELDS, self.rows[index])
+
+    def as_of(self, day: date) -> Optional[HandbookVersion]:
+        """
+        Получить версию, действующую на указанную дату.
+
+        :param day: Дата.
+        :return: Объект HandbookVersion или None.
+        """
+        index = bisect_right(self.start_dates, day)
+        return self._build(index - 1) if index else None
+
+    def current(self) -> Optional[HandbookVersion]:
+        """
+        Получить версию, действующую сегодня по часовому поясу TIME_ZONE.
+        """
+        return self.as_of(timezone.localdate())
+
+    def get(self, label: str) -> Optional[HandbookVersion]:
+        """
+        Получить версию по её номеру.
+
+        :param label: Номер версии.
+        :return: Объект HandbookVersion или None.
+        """
+        index = self.labels.get(label)
+        return None if index is None else self._build(index)
+
+
+_lock = threading.Lock()
+_timelines: "OrderedDict[TimelineKey, VersionTimeline]" = OrderedDict()
+
+
+def load_timeline(handbook_id: int) -> VersionTimeline:
+    """
+    Загружает опубликованные версии справочника из базы.
+
+    :param handbook_id: Идентификатор справочника.
+    :return: Расписание версий.
+    """
+    db = router.db_for_read(HandbookVersion)
+    rows: List[tuple] = list(
+        HandbookVersion.objects.using(db)
+        .published()
+        .filter(handbook_id=handbook_id)
+        .order_by("start_date")
+        .values_list(*VERSION_FIELDS)
+    )
+    start_date = VERSION_FIELDS.index("start_date")
+    label = VERSION_FIELDS.index("version")
+    return VersionTimeline(
+        db=db,
+        start_dates=tuple(row[start_date] for row in rows),
+        rows=tuple(rows),
+        labels={row[label]: index for index, row in enumerate(rows)},
+    )
+
+
+def get_timeline(handbook: Handbook) -> VersionTimeline:
+    """
+    Получить расписание версий справочника из кэша или загрузить его.
+
+    :param handbook: Объект справочника.
+    :return: Расписание версий.
+    """
+    key = (handbook.pk, handbook.modified_at)
+    with _lock:
+        timeline = _timelines.get(key)
+        if timeline is not None:
+            _timelines.move_to_end(key)
+            return timeline
+    timeline = load_timeline(handbook.pk)
+    with _lock:
+        _timelines[key] = timeline
+        while len(_timelines) > TIMELINE_CACHE_SIZE:
+            _timelines.popitem(last=False)
+    return timeline
+
+
+def clear_timelines() -> None:
+    """
+    Очищает кэш расписаний версий.
+    """
+    with _lock:
+        _timelines.clear()
@@ -0,0 +1,250 @@
+"""
+Индекс иерархии элементов версии справочника (материализованный путь).
+
+Иерархия задаётся кодом родительского элемента (parent_code) в той же версии.
+Для каждого элемента хранится путь из идентификаторов его предков и его самого,
+например "/12/40/57/", и глубина. Поэтому поддерево элемента выбирается одним
+запросом по префиксу пути с индексом (version, path), предки — одним запросом
+по первичным ключам из пути, а проверка «является ли потомком» сводится
+к сравнению путей.
+
+Индекс строится целиком при публикации версии, загруженной через API,
+и командой rebuild_tree_index. При изменении или удалении отдельных элементов
+через ORM пересчитываются только затронутые поддеревья: пути элемента
+и всех его потомков меняются одним запросом UPDATE по префиксу пути.
+"""
+
+from typing import Dict, List, Optional, Tuple
+
+from django.db.models import CharField, F, QuerySet, Value
+from django.db.models.functions import Concat, Substr
+
+from .models import HandbookElement, HandbookVersion
+
+PATH_SEPARATOR = "/"
+
+
+def is_hierarchical(version_id: int) -> bool:
+    """
+    Проверяет, есть ли в версии элементы с родителем.
+
+    :param version_id: Идентификатор версии.
+    """
+    return (
+        HandbookElement.objects.filter(version_id=version_id)
+        .exclude(parent_code="")
+        .exists()
+    )
+
+
+def build_paths(rows: List[Tuple[int, str, str]]) -> Dict[str, Tuple[str, int]]:
+    """
+    Вычисляет пути и глубины элементов по ссылкам на родителей.
+    Элементы с несуществующим родителем считаются корневыми,
+    а цикл разрывается на элементе, с которого начался его обход.
+
+    :param rows: Кортежи (идентификатор, код, код родителя).
+    :return: Словарь {код: (путь, глубина)}.
+    """
+    by_code = {code: (pk, parent_code) for pk, code, parent_code in rows}
+    paths: Dict[str, Tuple[str, int]] = {}
+    for code in by_code:
+        chain: List[str] = []
+        current = code
+        while current not in paths and current not in chain:
+            chain.append(current)
+            parent_code = by_code[current][1]
+            if not parent_code or parent_code not in by_code:
+                break
+            current = parent_code
+        if current in paths:
+            path, depth = paths[current]
+        else:
+            path, depth = PATH_SEPARATOR, -1
+        for chain_code in reversed(chain):
+            path = f"{path}{by_code[chain_code][0]}{PATH_SEPARATOR}"
+            depth += 1
+            paths[chain_code] = (path, depth)
+    return paths
+
+
+def rebuild_tree_index(version_id: int) -> int:
+    """
+    Перестраивает пути и глубины всех элементов версии.
+    Записываются только изменившиеся элементы.
+
+    :param version_id: Идентификатор версии.
+    :return: Количество обновлённых элементов.
+    """
+    rows = list(
+        HandbookElement.objects.filter(version_id=version_id).values_list(
+            "pk", "code", "parent_code", "path", "depth"
+        )
+    )
+    paths = build_paths([(pk, code, parent_code) for pk, code, parent_code, *_ in rows])
+    changed = [
+        HandbookElement(pk=pk, path=paths[code][0], depth=paths[code][1])
+        for pk, code, _, path, depth in rows
+        if paths[code] != (path, depth)
+    ]
+    HandbookElement.objects.bulk_update(changed, ["path", "depth"], batch_size=1000)
+    return len(changed)
+
+
+def get_depth(path: str) -> int:
+    """
+    Получить глубину элемента по его пути.
+    """
+    return path.count(PATH_SEPARATOR) - 2
+
+
+def move_subtree(version_id: int, old_path: str, new_path: str) -> None:
+    """
+    Переносит элемент с путём old_path и всех его потомков под путь new_path,
+    заменяя префикс путей одним запросом по индексу (version, path).
+
+    :param version_id: Идентификатор версии.
+    :param old_path: Текущий путь корня поддерева.
+    :param new_path: Новый путь корня поддерева.
+    """
+    HandbookElement.objects.filter(
+        version_id=version_id, path__startswith=old_path
+    ).update(
+        path=Concat(
+            Value(new_path), Substr("path", len(old_path) + 1), output_field=CharField()
+        ),
+        depth=F("depth") + get_depth(new_path) - get_depth(old_path),
+    )
+
+
+def detach_children(version_id: int, path: str) -> None:
+    """
+    Делает дочерние элементы элемента с путём path корневыми вместе
+    с их поддеревьями, например после удаления элемента или смены его кода.
+
+    :param version_id: Идентификатор версии.
+    :param path: Путь элемента.
+    """
+    HandbookElement.objects.filter(
+        version_id=version_id, path__startswith=path
+    ).exclude(path=path).update(
+        path=Concat(
+            Value(PATH_SEPARATOR),
+            Substr("path", len(path) + 1),
+            output_field=CharField(),
+        ),
+        depth=F("depth") - get_depth(path) - 1,
+    )
+
+
+def attach_orphans(version_id: int, code: str, parent_path: str) -> bool:
+    """
+    Переносит под элемент с кодом code корневые элементы, которые ссылаются
+    на этот код: до появления родителя они считались корневыми.
+
+    :param version_id: Идентификатор версии.
+    :param code: Код родительского элемента.
+    :param parent_path: Путь родительского элемента.
+    :return: False, если перенос образовал бы цикл.
+    """
+    roots = list(
+        HandbookElement.objects.filter(
+            version_id=version_id, parent_code=code, depth=0
+        ).values_list("path", flat=True)
+    )
+    if any(parent_path.startswith(root) for root in roots):
+        return False
+    for root in roots:
+        move_subtree(version_id, root, f"{parent_path[:-1]}{root}")
+    return True
+
+
+def update_element_path(
+    element: HandbookElement,
+    previous_link: Optional[Tuple[int, str, str]] = None,
+    previous_path: str = "",
+) -> None:
+    """
+    Обновляет индекс после создания или изменения одного элемента.
+    Пересчитываются только пути самого элемента, его поддерева и элементов,
+    которые ссылались на его прежний или новый код. Весь индекс версии
+    перестраивается, только если он ещё не построен или изменение
+    образует цикл.
+
+    :param element: Сохранённый элемент справочника.
+    :param previous_link: Прежние версия, код и код родителя элемента
+        (None для нового элемента).
+    :param previous_path: Путь элемента до изменения.
+    """
+    version_id = element.version_id
+    if previous_link is not None and not previous_path:
+        rebuild_tree_index(version_id)
+        return
+    keeps_code = previous_link is not None and previous_link[:2] == (
+        version_id,
+        element.code,
+    )
+    if previous_link is not None and not keeps_code:
+        # Дочерние элементы ссылаются на прежний код и становятся корневыми.
+        detach_children(previous_link[0], previous_path)
+
+    parent_path = PATH_SEPARATOR
+    if element.parent_code and element.parent_code != element.code:
+        path = (
+            HandbookElement.objects.filter(
+                version_id=version_id, code=element.parent_code
+            )
+            .values_list("path", flat=True)
+            .first()
+        )
+        if path == "" or (keeps_code and path and path.startswith(previous_path)):
+            rebuild_tree_index(version_id)
+            return
+        parent_path = path or PATH_SEPARATOR
+    new_path = f"{parent_path}{element.pk}{PATH_SEPARATOR}"
+
+    if keeps_code:
+        move_subtree(version_id, previous_path, new_path)
+    HandbookElement.objects.filter(pk=element.pk).update(
+        path=new_path, depth=get_depth(new_path)
+    )
+    element.path, element.depth = new_path, get_depth(new_path)
+    if not keeps_code and not attach_orphans(version_id, element.code, new_path):
+        rebuild_tree_index(version_id)
+
+
+def get_subtree(
+    version: HandbookVersion, element: HandbookElement
+) -> QuerySet[HandbookElement]:
+    """
+    Получить элемент и всех его потомков в порядке обхода в глубину.
+
+    :param version: Объект версии справочника.
+    :param element: Корень поддерева.
+    :return: QuerySet элементов поддерева.
+    """
+    return version.elements.filter(path__startswith=element.path).order_by("path")
+
+
+def get_ancestors(
+    version: HandbookVersion, element: HandbookElement
+) -> QuerySet[HandbookElement]:
+    """
+    Получить предков элемента от корня к непосредственному родителю.
+
+    :param version: Объект версии справочника.
+    :param element: Объект элемента справочника.
+    :return: QuerySet элементов-предков.
+    """
+    ids = [int(pk) for pk in element.path.strip(PATH_SEPARATOR).split(PATH_SEPARATOR)]
+    return version.elements.filter(pk__in=ids[:-1]).order_by("depth")
+
+
+def is_descendant(element: HandbookElement, ancestor: HandbookElement) -> bool:
+    """
+    Проверяет, что элемент является потомком другого элемента.
+
+    :param element: Проверяемый элемент.
+    :param ancestor: Предполагаемый предок.
+    """
+    return element.pk != ancestor.pk and element.path.startswith(ancestor.path)
@@ -1,17 +1,23 @@
+from django.apps import apps
 from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 
-from .schema import schema_view
-from .views import HandbookViewSet
+from .views import HandbookChangeViewSet, HandbookJobViewSet, HandbookViewSet
 
 router = DefaultRouter()
 router.register(r"refbooks", HandbookViewSet, basename="refbook")
+router.register(r"changes", HandbookChangeViewSet, basename="change")
+router.register(r"jobs", HandbookJobViewSet, basename="job")
 
 urlpatterns = [
     path("", include(router.urls)),
-    path(
-        "docs/",
-        schema_view.with_ui("swagger", cache_timeout=0),
-        name="schema-swagger-ui",
-    ),
 ]
+
+# В профиле только с API (API_ONLY) документация Swagger не подключается.
+if apps.is_installed("drf_yasg"):
+    from .docs import openapi_view, swagger_view
+
+    urlpatterns += [
+        path("docs/", swagger_view, name="schema-swagger-ui"),
+        path("docs/openapi.json", openapi_view, name="schema-openapi"),
+    ]
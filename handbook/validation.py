@@ -0,0 +1,111 @@
+"""
+Проверка элементов справочника по скомпилированным версиям.
+
+Версия один раз загружается из базы и компилируется в словарь
+{код без учёта регистра: нормализованные значения}, после чего проверка
+элемента сводится к поиску в словаре. Скомпилированные версии хранятся
+в LRU-кэше процесса по ключу (идентификатор версии, хеш содержимого),
+поэтому после изменения элементов версия компилируется заново.
+
+Модуль можно использовать напрямую из кода других приложений Django:
+
+    from handbook.validation import check_element
+    check_element(version, "A00", "холера")
+"""
+
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, Iterable, Tuple
+
+from .models import HandbookElement, HandbookVersion
+
+# Количество скомпилированных версий, хранимых в процессе.
+MATCHER_CACHE_SIZE = 64
+
+
+def normalize(text: str) -> str:
+    """
+    Приводит строку к виду для сравнения без учёта регистра и лишних пробелов.
+    """
+    return " ".join(text.casefold().split())
+
+
+@dataclass(frozen=True)
+class VersionMatcher:
+    """
+    Скомпилированная версия справочника.
+    Коды отличаются только регистром редко, поэтому значения
+    по одному коду хранятся кортежем.
+    """
+
+    values: Dict[str, Tuple[str, ...]]
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Tuple[str, str]]) -> "VersionMatcher":
+        """
+        Компилирует версию из пар (код, значение).
+        """
+        values: Dict[str, Tuple[str, ...]] = {}
+        for code, value in rows:
+            key = code.casefold()
+            values[key] = values.get(key, ()) + (normalize(value),)
+        return cls(values)
+
+    def check(self, code: str, value: str, exact: bool = False) -> bool:
+        """
+        Проверяет наличие элемента.
+
+        :param code: Код элемента (без учёта регистра).
+        :param value: Значение или часть значения элемента.
+        :param exact: Сравнивать значение целиком, а не искать подстроку.
+        :return: True, если элемент найден.
+        """
+        candidates = self.values.get(code.casefold())
+        if candidates is None:
+            return False
+        needle = normalize(value)
+        if exact:
+            return needle in candidates
+        return any(needle in candidate for candidate in candidates)
+
+
+@lru_cache(maxsize=MATCHER_CACHE_SIZE)
+def compile_version(version_id: int, content_hash: str) -> VersionMatcher:
+    """
+    Загружает элементы версии и компилирует их.
+    Хеш содержимого входит в ключ кэша, чтобы изменённая версия
+    компилировалась заново.
+
+    :param version_id: Идентификатор версии.
+    :param content_hash: Хеш содержимого версии.
+    :return: Скомпилированная версия.
+    """
+    rows = HandbookElement.objects.filter(version_id=version_id).values_list(
+        "code", "value"
+    )
+    return VersionMatcher.from_rows(rows.iterator(chunk_size=10000))
+
+
+def get_matcher(version: HandbookVersion) -> VersionMatcher:
+    """
+    Получить скомпилированную версию справочника.
+
+    :param version: Объект версии справочника.
+    :return: Скомпилированная версия.
+    """
+    return compile_version(version.pk, version.content_hash)
+
+
+def check_element(
+    version: HandbookVersion, code: str, value: str, exact: bool = False
+) -> bool:
+    """
+    Проверяет наличие элемента с кодом и значением в версии справочника.
+
+    :param version: Объект версии справочника.
+    :param code: Код элемента (без учёта регистра).
+    :param value: Значение или часть значения элемента (без учёта регистра).
+    :param exact: Сравнивать значение целиком, а не искать подстроку.
+    :return: True, если элемент найден.
+    """
+    return get_matcher(version).check(code, value, exact)
@@ -1,50 +1,158 @@
-from typing import Optional
+from typing import Optional, Set
 
+from django.conf import settings
 from django.core.exceptions import ValidationError as DjangoValidationError
-from django.db.models import QuerySet
+from django.db import IntegrityError, transaction
+from django.http import StreamingHttpResponse
+from django.utils import translation
+from django.utils.cache import patch_vary_headers
 from django_filters.rest_framework import DjangoFilterBackend
-from drf_yasg.utils import swagger_auto_schema
-from rest_framework import status, viewsets
+from rest_framework import mixins, status, viewsets
 from rest_framework.decorators import action
 from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import LimitOffsetPagination
+from rest_framework.permissions import IsAdminUser
 from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.throttling import ScopedRateThrottle
 
-from .filters import HandbookElementFilter, HandbookFilter
-from .mixins import HandbookMixin
-from .models import Handbook, HandbookElement
-from .schema import (
-    check_element_schema,
-    get_handbook_elements_schema,
-    list_handbooks_schema,
+from . import jobs, validation
+from .bulk import publish_version, remove_elements, upsert_elements
+from .changes import read_changes
+from .diff import diff_versions
+from .docs import lazy_swagger_auto_schema
+from .filters import HandbookFilter
+from .mixins import HandbookMixin, ReadReplicaMixin, RequestAnalyticsMixin
+from .models import Handbook, HandbookChange, HandbookJob, HandbookVersion
+from .payloads import (
+    get_element_rows,
+    get_elements_payload,
+    is_cacheable,
+    payload_response,
 )
-from .serializers import HandbookElementSerializer, HandbookSerializer
+from .renderers import ColumnarJSONRenderer, NDJSONRenderer
+from .serializers import (
+    CheckElementSerializer,
+    HandbookChangeSerializer,
+    HandbookElementChunkSerializer,
+    HandbookElementSerializer,
+    HandbookJobSerializer,
+    HandbookSerializer,
+    HandbookTreeElementSerializer,
+    HandbookVersionSerializer,
+)
+from .streaming import ReleasingStream, count_current_elements, stream_current_elements
+from .throttling import heavy_requests
+from .tree import get_ancestors, get_subtree, is_descendant
 
 
-class HandbookViewSet(HandbookMixin, viewsets.ReadOnlyModelViewSet):
+class HandbookViewSet(
+    RequestAnalyticsMixin,
+    ReadReplicaMixin,
+    HandbookMixin,
+    viewsets.ReadOnlyModelViewSet,
+):
     """
     ViewSet для работы со справочниками.
     Позволяет получать список справочников,
     а также работать с элементами справочников по версиям.
+    Администраторы могут загружать новые версии: черновик версии
+    заполняется пакетами элементов и затем публикуется.
+    Читающие запросы обрабатываются на реплике базы данных, если она настроена.
     """
 
-    queryset = Handbook.objects.prefetch_related("versions").distinct()
+    # Загружаются только поля, которые выводит сериализатор.
+    queryset = Handbook.objects.only(*HandbookSerializer.Meta.fields)
     serializer_class = HandbookSerializer
     filter_backends = (DjangoFilterBackend,)
     filterset_class = HandbookFilter
+    # Выгрузка элементов ограничивается отдельным лимитом handbook_heavy.
+    throttle_classes = [ScopedRateThrottle]
+    throttle_scope = "handbook_cheap"
 
-    @swagger_auto_schema(**list_handbooks_schema)
-    def list(self, request, *args, **kwargs) -> Response:
+    # Значения параметра include списка справочников.
+    list_includes = {"current_elements"}
+
+    def initial(self, request, *args, **kwargs) -> None:
+        """
+        Относит список справочников с элементами к тяжёлым запросам
+        до проверки лимитов. Запрос с неизвестным значением include остаётся
+        дешёвым: он отклоняется при обработке и не тратит лимит выгрузок.
+        """
+        if self.action == "list":
+            try:
+                includes = self.get_list_includes(request)
+            except ValidationError:
+                includes = set()
+            if includes:
+                self.throttle_scope = "handbook_heavy"
+        super().initial(request, *args, **kwargs)
+
+    @lazy_swagger_auto_schema("list_handbooks_schema")
+    def list(self, request, *args, **kwargs):
         """
         Возвращает список справочников с поддержкой фильтрации.
+        С параметром include=current_elements к каждому справочнику добавляются
+        текущая версия и её элементы.
         """
         try:
             queryset = self.filter_queryset(self.get_queryset())
+            if "current_elements" in self.get_list_includes(request):
+                return self.list_with_elements(request, queryset)
             serializer = self.get_serializer(queryset, many=True)
+            self.note_analytics(elements=len(serializer.data))
             return Response({"refbooks": serializer.data})
         except DjangoValidationError as e:
             raise ValidationError({"error": e.message})
 
-    @swagger_auto_schema(auto_schema=None)
+    def get_list_includes(self, request) -> Set[str]:
+        """
+        Получает значения параметра include (через запятую).
+
+        :return: Множество значений.
+        :raises ValidationError: Если указано неизвестное значение.
+        """
+        param = request.query_params.get("include", "")
+        includes = {value.strip() for value in param.split(",") if value.strip()}
+        if not includes <= self.list_includes:
+            raise ValidationError({"error": "Invalid 'include' parameter."})
+        return includes
+
+    def list_with_elements(self, request, queryset) -> StreamingHttpResponse:
+        """
+        Возвращает список справочников с текущими версиями и их элементами
+        потоковым ответом. Общее количество элементов, посчитанное одним
+        запросом COUNT, ограничено настройкой HANDBOOK_INCLUDE_MAX_ELEMENTS,
+        а сам ответ занимает место
+        тяжёлой выгрузки до конца передачи.
+
+        :param queryset: Отфильтрованный QuerySet справочников.
+        :return: Потоковый ответ в JSON.
+        :raises ValidationError: Если элементов больше допустимого.
+        """
+        handbooks = list(queryset.with_current_version())
+        total = count_current_elements(handbooks)
+        limit = settings.HANDBOOK_INCLUDE_MAX_ELEMENTS
+        if total > limit:
+            raise ValidationError(
+                {
+                    "error": f"Too many elements to include ({total} > {limit}). "
+                    "Request elements of each handbook separately."
+                }
+            )
+        self.note_analytics(elements=total)
+        release = heavy_requests.hold(request)
+        language = translation.get_language_from_request(request)
+        chunks = stream_current_elements(
+            handbooks, lambda handbook: self.get_serializer(handbook).data, language
+        )
+        response = StreamingHttpResponse(
+            ReleasingStream(chunks, release), content_type="application/json"
+        )
+        patch_vary_headers(response, ("Accept-Language",))
+        return response
+
+    @lazy_swagger_auto_schema("exclude_schema")
     def retrieve(self, request, *args, **kwargs):
         """
         Метод извлечения конкретного справочника.
@@ -52,47 +160,422 @@ class HandbookViewSet(HandbookMixin, viewsets.ReadOnlyModelViewSet):
         """
         return super().retrieve(request, *args, **kwargs)
 
-    @swagger_auto_schema(**get_handbook_elements_schema)
-    @action(detail=True, methods=["get"], url_path="elements")
+    @lazy_swagger_auto_schema("get_handbook_elements_schema")
+    @action(
+        detail=True,
+        methods=["get"],
+        url_path="elements",
+        renderer_classes=[
+            *api_settings.DEFAULT_RENDERER_CLASSES,
+            NDJSONRenderer,
+            ColumnarJSONRenderer,
+        ],
+        throttle_scope="handbook_heavy",
+    )
     def elements(self, request, pk=None) -> Response:
         """
         Возвращает элементы справочника по указанной или текущей версии.
+        Кроме JSON поддерживаются форматы NDJSON и колоночный JSON
+        (через заголовок Accept или параметр format).
+        Значения элементов возвращаются на языке из заголовка Accept-Language.
+        Ответ отдаётся из кэша готовых (в том числе сжатых) тел ответов.
+        Количество одновременных выгрузок ограничено на процесс и на клиента.
 
         :param pk: Идентификатор справочника.
         :return: Ответ в JSON с элементами справочника.
         """
-        elements = self.get_elements_by_version(request, pk)
-        serializer = HandbookElementSerializer(elements, many=True)
-        return Response({"elements": serializer.data})
+        with heavy_requests.slot(request):
+            version = self.get_requested_version(request, pk)
+            language = translation.get_language_from_request(request)
+            if is_cacheable(request.accepted_renderer):
+                payload = get_elements_payload(
+                    version, request.accepted_renderer, language
+                )
+                self.note_analytics(elements=payload.element_count)
+                return payload_response(request, payload)
+            elements = [
+                {"code": code, "value": value}
+                for code, value in get_element_rows(version, language)
+            ]
+            self.note_analytics(elements=len(elements))
+            serializer = HandbookElementSerializer(elements, many=True)
+            return Response({"elements": serializer.data})
 
-    @swagger_auto_schema(**check_element_schema)
+    @lazy_swagger_auto_schema("check_element_schema")
     @action(detail=True, methods=["get"], url_path="check_element")
     def check_element(self, request, pk=None) -> Response:
         """
         Проверяет наличие элемента с указанным кодом и значением в указанной версии.
+        Код сравнивается без учёта регистра, значение ищется как подстрока
+        (или сравнивается целиком при exact=true) без учёта регистра и лишних пробелов.
+        Проверка выполняется по скомпилированной версии из модуля validation.
 
         :param pk: Идентификатор справочника.
         :return: Ответ в JSON с ключом "exists", указывающим на наличие элемента.
         """
-        elements = self.get_elements_by_version(request, pk)
-        filterset = HandbookElementFilter(request.GET, queryset=elements)
+        params = CheckElementSerializer(data=request.query_params)
+        if not params.is_valid():
+            return Response(params.errors, status=status.HTTP_400_BAD_REQUEST)
 
-        if not filterset.is_valid():
-            return Response(filterset.errors, status=status.HTTP_400_BAD_REQUEST)
-
-        exists = filterset.qs.exists()
+        version = self.get_requested_version(request, pk)
+        exists = validation.check_element(
+            version,
+            params.validated_data["code"],
+            params.validated_data["value"],
+            exact=params.validated_data["exact"],
+        )
+        self.note_analytics(elements=0)
         return Response({"exists": exists}, status=status.HTTP_200_OK)
 
-    def get_elements_by_version(
-        self, request, pk: Optional[int]
-    ) -> QuerySet[HandbookElement]:
+    @lazy_swagger_auto_schema("subtree_schema")
+    @action(
+        detail=True,
+        methods=["get"],
+        url_path="subtree",
+        throttle_scope="handbook_heavy",
+    )
+    def subtree(self, request, pk=None) -> Response:
+        """
+        Возвращает элемент с указанным кодом и всех его потомков
+        в указанной или текущей версии. Запрос считается тяжёлой выгрузкой,
+        а количество элементов ограничено настройкой
+        HANDBOOK_SUBTREE_MAX_ELEMENTS.
+
+        :param pk: Идентификатор справочника.
+        :return: Ответ в JSON с элементами поддерева в порядке обхода в глубину.
+        :raises ValidationError: Если элементов больше допустимого.
+        """
+        with heavy_requests.slot(request):
+            version = self.get_requested_version(request, pk)
+            element = self.get_element_or_404(version)
+            limit = settings.HANDBOOK_SUBTREE_MAX_ELEMENTS
+            elements = list(get_subtree(version, element)[: limit + 1])
+            if len(elements) > limit:
+                raise ValidationError(
+                    {
+                        "error": f"Too many elements in the subtree (> {limit}). "
+                        "Request subtrees of its children separately."
+                    }
+                )
+            serializer = HandbookTreeElementSerializer(elements, many=True)
+            self.note_analytics(elements=len(serializer.data))
+            return Response({"elements": serializer.data})
+
+    @lazy_swagger_auto_schema("ancestors_schema")
+    @action(detail=True, methods=["get"], url_path="ancestors")
+    def ancestors(self, request, pk=None) -> Response:
+        """
+        Возвращает предков элемента с указанным кодом от корня иерархии.
+
+        :param pk: Идентификатор справочника.
+        :return: Ответ в JSON с элементами-предками.
+        """
+        version = self.get_requested_version(request, pk)
+        element = self.get_element_or_404(version)
+        serializer = HandbookTreeElementSerializer(
+            get_ancestors(version, element), many=True
+        )
+        self.note_analytics(elements=len(serializer.data))
+        return Response({"elements": serializer.data})
+
+    @lazy_swagger_auto_schema("is_descendant_schema")
+    @action(detail=True, methods=["get"], url_path="is_descendant")
+    def is_descendant(self, request, pk=None) -> Response:
+        """
+        Проверяет, является ли элемент с кодом code потомком элемента
+        с кодом ancestor в указанной или текущей версии.
+
+        :param pk: Идентификатор справочника.
+        :return: Ответ в JSON с ключом "is_descendant".
+        """
+        version = self.get_requested_version(request, pk)
+        element = self.get_element_or_404(version)
+        ancestor = self.get_element_or_404(version, "ancestor")
+        self.note_analytics(elements=0)
+        return Response({"is_descendant": is_descendant(element, ancestor)})
+
+    @lazy_swagger_auto_schema("diff_schema")
+    @action(
+        detail=True,
+        methods=["get"],
+        url_path="diff",
+        throttle_scope="handbook_heavy",
+    )
+    def diff(self, request, pk=None) -> Response:
+        """
+        Сравнивает две опубликованные версии справочника.
+        Версии с одинаковым хешем содержимого считаются совпадающими
+        без чтения элементов.
+
+        :param pk: Идентификатор справочника.
+        :return: Ответ в JSON с добавленными, удалёнными и изменёнными элементами.
+        """
+        base_param = request.query_params.get("from")
+        if not base_param:
+            raise ValidationError({"error": "Parameter 'from' is required."})
+        handbook = self.get_handbook_or_404(pk)
+        base = self.get_version_or_404(handbook, base_param)
+        target = self.get_version_or_404(handbook, request.query_params.get("to"))
+        with heavy_requests.slot(request):
+            diff = diff_versions(base, target)
+        return Response(
+            {
+                "from": base.version,
+                "to": target.version,
+                "identical": diff.identical,
+                "added": [{"code": code, "value": value} for code, value in diff.added],
+                "removed": [
+                    {"code": code, "value": value} for code, value in diff.removed
+                ],
+                "changed": [
+                    {
+                        "code": code,
+                        "previous_value": previous,
+                        "value": value,
+                        "previous_parent_code": previous_parent,
+                        "parent_code": parent,
+                    }
+                    for code, previous, value, previous_parent, parent in diff.changed
+                ],
+            }
+        )
+
+    @lazy_swagger_auto_schema("create_version_schema")
+    @action(
+        detail=True,
+        methods=["post"],
+        url_path="versions",
+        permission_classes=[IsAdminUser],
+    )
+    def create_version(self, request, pk=None) -> Response:
+        """
+        Создаёт черновик версии справочника.
+        Черновик не виден читателям до публикации.
+        Если указана базовая версия (base_version), её элементы копируются
+        в черновик фоновой задачей copy_elements, идентификатор которой
+        возвращается в поле job. До завершения задачи загрузка элементов
+        и публикация черновика отклоняются.
+
+        :param pk: Идентификатор справочника.
+        :return: Ответ в JSON с созданной версией.
+        """
+        handbook = self.get_handbook_or_404(pk)
+        serializer = HandbookVersionSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        base_version = serializer.validated_data.pop("base_version", None)
+        base = self.get_version_or_404(handbook, base_version) if base_version else None
+        job = None
+        try:
+            with transaction.atomic():
+                draft = serializer.save(
+                    handbook=handbook, status=HandbookVersion.Status.DRAFT
+                )
+                if base is not None:
+                    job = jobs.enqueue_job(
+                        "copy_elements",
+                        {"version_id": draft.pk, "base_version_id": base.pk},
+                        handbook=handbook,
+                        user=request.user,
+                    )
+        except IntegrityError:
+            raise ValidationError(
+                {"error": "Version with this number or start date already exists."}
+            )
+        data = dict(serializer.data)
+        if job is not None:
+            data["job"] = job.pk
+        return Response(data, status=status.HTTP_201_CREATED)
+
+    @lazy_swagger_auto_schema("upload_elements_schema")
+    @action(
+        detail=True,
+        methods=["post"],
+        url_path=r"versions/(?P<version>[^/]+)/elements",
+        permission_classes=[IsAdminUser],
+    )
+    def upload_elements(self, request, pk=None, version=None) -> Response:
+        """
+        Загружает пакет элементов в черновик версии.
+        Существующие элементы с теми же кодами обновляются.
+        Для элемента можно указать код родителя (parent_code).
+        Элементы с кодами из списка removed удаляются из черновика
+        до загрузки элементов пакета в той же транзакции.
+
+        :param pk: Идентификатор справочника.
+        :param version: Версия справочника.
+        :return: Ответ в JSON с количеством элементов в версии.
+        """
+        draft = self.get_draft_version_or_404(self.get_handbook_or_404(pk), version)
+        serializer = HandbookElementChunkSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        removed = serializer.validated_data.get("removed")
+        elements = serializer.validated_data.get("elements")
+        with transaction.atomic():
+            if removed:
+                remove_elements(draft, removed)
+            if elements:
+                values = {element["code"]: element["value"] for element in elements}
+                parents = {
+                    element["code"]: element.get("parent_code", "")
+                    for element in elements
+                }
+                upsert_elements(draft, values, parents)
+        draft.refresh_from_db(fields=["element_count"])
+        return Response({"element_count": draft.element_count})
+
+    @lazy_swagger_auto_schema("publish_version_schema")
+    @action(
+        detail=True,
+        methods=["post"],
+        url_path=r"versions/(?P<version>[^/]+)/publish",
+        permission_classes=[IsAdminUser],
+    )
+    def publish(self, request, pk=None, version=None) -> Response:
+        """
+        Публикует черновик версии, после чего она становится видна читателям.
+
+        :param pk: Идентификатор справочника.
+        :param version: Версия справочника.
+        :return: Ответ в JSON с опубликованной версией.
+        """
+        draft = self.get_draft_version_or_404(self.get_handbook_or_404(pk), version)
+        if not publish_version(draft):
+            raise ValidationError(
+                {"error": f"Version '{version}' is already published."}
+            )
+        return Response(HandbookVersionSerializer(draft).data)
+
+    def get_requested_version(self, request, pk: Optional[int]) -> HandbookVersion:
         """
-        Получает элементы справочника для указанной или текущей версии.
+        Получает указанную в запросе или текущую версию справочника.
+        Количество возвращённых элементов записывает в журнал аналитики
+        само действие.
 
         :param pk: Идентификатор справочника.
-        :return: QuerySet элементов справочника.
+        :return: Объект HandbookVersion.
         """
         version_param = request.query_params.get("version")
         handbook = self.get_handbook_or_404(pk)
         version = self.get_version_or_404(handbook, version_param)
-        return version.elements.all()
+        self.note_analytics(
+            handbook_id=handbook.pk,
+            handbook_code=handbook.code,
+            version=version.version,
+        )
+        return version
+
+
+class HandbookChangeViewSet(viewsets.GenericViewSet):
+    """
+    ViewSet для журнала изменений справочников.
+    Позволяет репликам получать только изменения,
+    произошедшие после последней синхронизации.
+    """
+
+    queryset = HandbookChange.objects.all()
+    serializer_class = HandbookChangeSerializer
+    default_limit = 1000
+    max_limit = 10000
+
+    @lazy_swagger_auto_schema("list_changes_schema")
+    def list(self, request, *args, **kwargs) -> Response:
+        """
+        Возвращает пакет изменений после указанного токена.
+        Изменения после пропуска в токенах, который может означать
+        незафиксированную транзакцию, выдаются после её фиксации (модуль changes).
+
+        :return: Ответ в JSON с изменениями, токеном для следующего запроса
+            и признаком наличия следующих изменений.
+        """
+        since = self.get_int_param(request, "since", 0)
+        limit = min(
+            self.get_int_param(request, "limit", self.default_limit, minimum=1),
+            self.max_limit,
+        )
+        changes, next_token, has_more = read_changes(since, limit)
+        serializer = self.get_serializer(changes, many=True)
+        return Response(
+            {
+                "changes": serializer.data,
+                "next_token": str(next_token),
+                "has_more": has_more,
+            }
+        )
+
+    @staticmethod
+    def get_int_param(request, name: str, default: int, minimum: int = 0) -> int:
+        """
+        Получает целочисленный параметр запроса не меньше минимального значения.
+
+        :param name: Имя параметра.
+        :param default: Значение по умолчанию.
+        :param minimum: Минимальное допустимое значение.
+        :return: Значение параметра.
+        :raises ValidationError: Если параметр не является числом
+            или меньше минимального значения.
+        """
+        value = request.query_params.get(name)
+        if value in [None, ""]:
+            return default
+        if not value.isdigit() or int(value) < minimum:
+            raise ValidationError({"error": f"Invalid '{name}' parameter."})
+        return int(value)
+
+
+class HandbookJobPagination(LimitOffsetPagination):
+    """
+    Пагинация списка фоновых задач.
+    """
+
+    default_limit = 100
+    max_limit = 1000
+
+
+class HandbookJobViewSet(mixins.CreateModelMixin, viewsets.ReadOnlyModelViewSet):
+    """
+    ViewSet для фоновых задач справочников.
+    Позволяет администраторам ставить долгие операции в очередь
+    и следить за их выполнением. Задачи выполняет команда run_handbook_worker.
+    """
+
+    queryset = HandbookJob.objects.all()
+    serializer_class = HandbookJobSerializer
+    permission_classes = [IsAdminUser]
+    pagination_class = HandbookJobPagination
+
+    @lazy_swagger_auto_schema("list_jobs_schema")
+    def list(self, request, *args, **kwargs) -> Response:
+        """
+        Возвращает список задач, начиная с последних.
+        Задачи можно отфильтровать по статусу параметром status.
+        """
+        queryset = self.get_queryset()
+        status_param = request.query_params.get("status")
+        if status_param:
+            queryset = queryset.filter(status=status_param)
+        page = self.paginate_queryset(queryset)
+        return self.get_paginated_response(self.get_serializer(page, many=True).data)
+
+    @lazy_swagger_auto_schema("retrieve_job_schema")
+    def retrieve(self, request, *args, **kwargs) -> Response:
+        """
+        Возвращает статус, ход выполнения и результат задачи.
+        """
+        return super().retrieve(request, *args, **kwargs)
+
+    @lazy_swagger_auto_schema("create_job_schema")
+    def create(self, request, *args, **kwargs) -> Response:
+        """
+        Ставит задачу в очередь.
+
+        :return: Ответ в JSON с созданной задачей.
+        :raises ValidationError: Если тип задачи неизвестен
+            или не хватает параметров.
+        """
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        try:
+            job = jobs.enqueue_job(user=request.user, **serializer.validated_data)
+        except ValueError as e:
+            raise ValidationError({"error": str(e)})
+        return Response(self.get_serializer(job).data, status=status.HTTP_201_CREATED)
@@ -31,6 +31,11 @@ DEBUG = True
 ALLOWED_HOSTS = ["*"]
 
 
+# Профиль развёртывания только с API: без админки, статики и Swagger UI.
+# Включается переменной окружения API_ONLY=1 на воркерах, обслуживающих только API.
+API_ONLY = os.environ.get("API_ONLY", "").lower() in ("1", "true", "yes")
+
+
 # Application definition
 
 INSTALLED_APPS = [
@@ -49,6 +54,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "django.middleware.gzip.GZipMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -56,10 +62,32 @@ MIDDLEWARE = [
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
-    "django.middleware.locale.LocaleMiddleware",
+    "handbook.middleware.LocaleMiddleware",
     "handbook.middleware.ForceDefaultLanguageMiddleware",
 ]
 
+if API_ONLY:
+    API_ONLY_EXCLUDED_APPS = {
+        "django.contrib.admin",
+        "django.contrib.sessions",
+        "django.contrib.messages",
+        "django.contrib.staticfiles",
+        "drf_yasg",
+    }
+    API_ONLY_EXCLUDED_MIDDLEWARE = {
+        "django.contrib.sessions.middleware.SessionMiddleware",
+        "django.contrib.auth.middleware.AuthenticationMiddleware",
+        "django.contrib.messages.middleware.MessageMiddleware",
+    }
+    INSTALLED_APPS = [
+        app for app in INSTALLED_APPS if app not in API_ONLY_EXCLUDED_APPS
+    ]
+    MIDDLEWARE = [
+        middleware
+        for middleware in MIDDLEWARE
+        if middleware not in API_ONLY_EXCLUDED_MIDDLEWARE
+    ]
+
 ROOT_URLCONF = "terminology_api.urls"
 
 TEMPLATES = [
@@ -91,9 +119,87 @@ DATABASES = {
         "TEST": {
             "NAME": BASE_DIR / "test_db.sqlite3",
         },
+    },
+    # Локальная реплика для чтения, заполняется командой sync_replica.
+    "replica": {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": BASE_DIR / "db_replica.sqlite3",
+        "TEST": {
+            "MIRROR": "default",
+        },
+    },
+}
+
+DATABASE_ROUTERS = ["handbook.routers.ReadReplicaRouter"]
+
+# Реплики, на которые направляется чтение API (через запятую, например "replica").
+HANDBOOK_READ_REPLICAS = [
+    alias for alias in os.environ.get("HANDBOOK_READ_REPLICAS", "").split(",") if alias
+]
+# Допустимое отставание реплики в записях журнала изменений.
+HANDBOOK_REPLICA_MAX_LAG = 0
+# Как часто проверять отставание реплики (в секундах).
+HANDBOOK_REPLICA_CHECK_INTERVAL = 5
+# Через сколько секунд пропуск в токенах журнала изменений считается откатом
+# транзакции, а не незафиксированной записью. Должно превышать время самой
+# долгой транзакции, которая пишет в журнал.
+HANDBOOK_CHANGE_FEED_SETTLE_TIME = 60
+
+# Cache
+# https://docs.djangoproject.com/en/5.1/topics/cache/
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "terminology-api",
     }
 }
 
+# Время хранения готовых тел ответов с элементами версий (в секундах).
+HANDBOOK_PAYLOAD_CACHE_TIMEOUT = 60 * 60 * 24
+
+# REST framework
+# https://www.django-rest-framework.org/api-guide/throttling/
+
+# Отдельные лимиты для дешёвых запросов (список, проверка элемента)
+# и тяжёлых выгрузок всех элементов версии. Счётчики хранятся в кэше default;
+# LocMemCache у каждого процесса свой, поэтому с ним лимиты действуют
+# на процесс, а общими для всех воркеров их делает общий кэш (например, Redis).
+REST_FRAMEWORK = {
+    "DEFAULT_THROTTLE_RATES": {
+        "handbook_cheap": "1200/min",
+        "handbook_heavy": "120/min",
+    },
+}
+
+# Максимум одновременных тяжёлых выгрузок на процесс и на одного клиента.
+HANDBOOK_HEAVY_MAX_CONCURRENCY = 4
+HANDBOOK_HEAVY_MAX_PER_CLIENT = 2
+# Через сколько секунд клиенту предлагается повторить отклонённую выгрузку.
+HANDBOOK_HEAVY_RETRY_AFTER = 1
+# Максимум элементов в списке справочников с include=current_elements.
+HANDBOOK_INCLUDE_MAX_ELEMENTS = 100000
+# Максимум элементов в ответе с поддеревом элемента.
+HANDBOOK_SUBTREE_MAX_ELEMENTS = 10000
+
+# Доля запросов к API справочников, записываемых в журнал аналитики (0 — выключено),
+# и путь к журналу в формате JSON Lines (см. команду hot_handbooks).
+HANDBOOK_ANALYTICS_SAMPLE_RATE = float(
+    os.environ.get("HANDBOOK_ANALYTICS_SAMPLE_RATE", "0")
+)
+HANDBOOK_ANALYTICS_LOG = os.environ.get(
+    "HANDBOOK_ANALYTICS_LOG", BASE_DIR / "logs" / "handbook_analytics.jsonl"
+)
+
+# Фоновые задачи (команда run_handbook_worker): число процессов пула
+# (по умолчанию — число ядер), период опроса очереди в секундах
+# и время без отклика, после которого задача возвращается в очередь.
+HANDBOOK_JOB_PROCESSES = int(os.environ.get("HANDBOOK_JOB_PROCESSES", "0")) or None
+HANDBOOK_JOB_POLL_INTERVAL = 1
+HANDBOOK_JOB_STALE_AFTER = 5 * 60
+# Каталог файлов CSV, которые можно импортировать задачей import_elements.
+HANDBOOK_IMPORT_DIR = os.environ.get("HANDBOOK_IMPORT_DIR", BASE_DIR / "imports")
+
 FIXTURE_DIRS = [BASE_DIR / "handbook" / "tests" / "fixtures"]
 
 # Password validation
@@ -126,6 +232,9 @@ LANGUAGES = [
 LOCALE_PATHS = [
     BASE_DIR / "locale",
 ]
+# Пути, для которых язык не активируется: сообщения API остаются на языке
+# по умолчанию, а язык значений элементов выбирается самим представлением
+SKIP_LANGUAGE_ACTIVATION_PATHS = ["/api/"]
 
 TIME_ZONE = "Europe/Moscow"
 USE_L10N = True
@@ -163,8 +272,16 @@ SWAGGER_SETTINGS = {
     "SHOW_EXTENSIONS": True,
     "DISPLAY_OPERATION_ID": False,
     "SHOW_REQUEST_RESPONSE_HEADERS": True,
+    # Swagger UI загружает готовый документ вместо генерации схемы на каждый запрос.
+    "SPEC_URL": ("schema-openapi", {}),
 }
 
+# Готовый документ OpenAPI, создаваемый командой generate_openapi.
+OPENAPI_SCHEMA_PATH = BASE_DIR / "openapi.json"
+
+# Время кэширования документа схемы OpenAPI (в секундах).
+SWAGGER_CACHE_TIMEOUT = 60 * 60
+
 DEFAULT_SCHEMA_CLASS = "rest_framework.schemas.openapi.AutoSchema"
 
 SWAGGER_UI_SETTINGS = {
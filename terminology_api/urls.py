@@ -15,13 +15,19 @@ Including another URLconf
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
 
+from django.apps import apps
 from django.conf.urls.i18n import i18n_patterns
-from django.contrib import admin
 from django.urls import include, path
 
-urlpatterns = i18n_patterns(
-    path("admin/", admin.site.urls), prefix_default_language=False
-)
+urlpatterns = []
+
+# В профиле только с API (API_ONLY) админка не подключается.
+if apps.is_installed("django.contrib.admin"):
+    from django.contrib import admin
+
+    urlpatterns += i18n_patterns(
+        path("admin/", admin.site.urls), prefix_default_language=False
+    )
 
 urlpatterns += [
     path("api/", include("handbook.urls")),